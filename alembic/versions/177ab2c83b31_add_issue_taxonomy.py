@@ -0,0 +1,155 @@
+"""Add issue taxonomy with aliases and canonical issue_id on stances
+
+Revision ID: 177ab2c83b31
+Revises: 263c88adbcf7
+Create Date: 2025-05-02 11:03:27.194512
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '177ab2c83b31'
+down_revision: Union[str, None] = '263c88adbcf7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of issues.ISSUE_TAXONOMY as of this revision, so later edits to
+# the app's taxonomy do not change what this migration seeds. Changes to the
+# taxonomy after this need a migration of their own.
+ISSUE_TAXONOMY = {
+    "abortion": ("Abortion", [
+        "abortion", "abortion access", "abortion rights", "reproductive rights", "reproductive health",
+        "reproductive freedom", "right to life", "pro life", "pro choice", "roe v wade",
+    ]),
+    "immigration": ("Immigration", [
+        "immigration", "immigration reform", "border", "border security", "the border", "asylum",
+        "illegal immigration", "daca",
+    ]),
+    "economy": ("Economy", [
+        "economy", "the economy", "jobs", "economic growth", "economic development", "inflation",
+        "cost of living", "small business", "small businesses",
+    ]),
+    "taxes": ("Taxes", ["taxes", "tax", "tax policy", "tax reform", "taxation", "tax cuts", "property taxes"]),
+    "healthcare": ("Healthcare", [
+        "healthcare", "health care", "health", "medicare", "medicaid", "affordable care act", "obamacare",
+        "prescription drugs", "prescription drug prices", "mental health",
+    ]),
+    "education": ("Education", [
+        "education", "schools", "public education", "public schools", "school choice", "student loans",
+        "student debt", "higher education",
+    ]),
+    "climate": ("Climate & Environment", [
+        "climate", "climate change", "environment", "the environment", "clean energy", "renewable energy",
+        "conservation", "clean water",
+    ]),
+    "energy": ("Energy", ["energy", "energy policy", "energy independence", "oil and gas"]),
+    "guns": ("Gun Policy", [
+        "gun control", "gun rights", "gun policy", "gun safety", "gun violence", "guns", "firearms",
+        "second amendment", "2nd amendment",
+    ]),
+    "criminal-justice": ("Criminal Justice & Public Safety", [
+        "criminal justice", "criminal justice reform", "public safety", "crime", "policing", "police",
+        "law enforcement",
+    ]),
+    "social-security": ("Social Security", ["social security", "retirement", "retirement security"]),
+    "veterans": ("Veterans", ["veterans", "veterans affairs", "veteran affairs", "military families"]),
+    "foreign-policy": ("Foreign Policy & Defense", [
+        "foreign policy", "national security", "national defense", "defense", "military", "ukraine", "israel",
+        "china",
+    ]),
+    "elections": ("Voting & Elections", [
+        "voting rights", "voting", "elections", "election integrity", "election security", "voter id",
+        "campaign finance",
+    ]),
+    "infrastructure": ("Infrastructure", ["infrastructure", "transportation", "roads", "broadband"]),
+    "housing": ("Housing", ["housing", "affordable housing", "homelessness", "housing affordability"]),
+    "agriculture": ("Agriculture", ["agriculture", "farming", "farmers", "rural development"]),
+    "labor": ("Labor & Wages", ["labor", "workers", "workers rights", "minimum wage", "unions", "organized labor"]),
+    "lgbtq-rights": ("LGBTQ+ Rights", [
+        "lgbtq rights", "lgbtq", "lgbt rights", "same sex marriage", "marriage equality", "transgender rights",
+    ]),
+    "government-spending": ("Government Spending", [
+        "government spending", "spending", "national debt", "debt", "deficit", "federal budget", "budget",
+        "fiscal responsibility",
+    ]),
+    "trade": ("Trade", ["trade", "tariffs", "trade policy"]),
+    "technology": ("Technology & Privacy", [
+        "technology", "big tech", "privacy", "data privacy", "artificial intelligence", "ai",
+    ]),
+    "civil-rights": ("Civil Rights", ["civil rights", "racial justice", "equality", "equal rights", "civil liberties"]),
+    "drugs": ("Drug Policy", [
+        "drug policy", "opioids", "opioid crisis", "fentanyl", "marijuana", "cannabis", "marijuana legalization",
+    ]),
+}
+
+
+# Frozen copy of issues.normalize_issue
+def normalize_issue(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+# Same normalization in SQL, for the backfill
+NORMALIZED_ISSUE = "trim(regexp_replace(lower(s.issue), '[^a-z0-9]+', ' ', 'g'))"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    issues_table = op.create_table('issues',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('label', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    aliases_table = op.create_table('issue_aliases',
+    sa.Column('alias', sa.String(), nullable=False),
+    sa.Column('issue_id', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['issue_id'], ['issues.id'], ),
+    sa.PrimaryKeyConstraint('alias')
+    )
+    op.create_index(op.f('ix_issue_aliases_issue_id'), 'issue_aliases', ['issue_id'], unique=False)
+
+    op.bulk_insert(issues_table, [{'id': issue_id, 'label': label} for issue_id, (label, _) in ISSUE_TAXONOMY.items()])
+    op.bulk_insert(aliases_table, [
+        {'alias': normalize_issue(alias), 'issue_id': issue_id}
+        for issue_id, (_, aliases) in ISSUE_TAXONOMY.items()
+        for alias in aliases
+    ])
+
+    op.add_column('stances', sa.Column('issue_id', sa.String(), nullable=True))
+    op.create_foreign_key('stances_issue_id_fkey', 'stances', 'issues', ['issue_id'], ['id'])
+
+    # Backfill like issues.resolve_issue: exact alias first, then the longest
+    # alias appearing as a whole phrase in the issue text
+    op.execute(f"""
+        UPDATE stances s
+        SET issue_id = a.issue_id
+        FROM issue_aliases a
+        WHERE a.alias = {NORMALIZED_ISSUE}
+    """)
+    op.execute(f"""
+        UPDATE stances t
+        SET issue_id = m.issue_id
+        FROM (
+            SELECT DISTINCT ON (s.id) s.id, a.issue_id
+            FROM stances s
+            JOIN issue_aliases a ON ' ' || {NORMALIZED_ISSUE} || ' ' LIKE '% ' || a.alias || ' %'
+            WHERE s.issue_id IS NULL
+            ORDER BY s.id, length(a.alias) DESC
+        ) m
+        WHERE t.id = m.id
+    """)
+
+    op.create_index('ix_stances_issue_id_candidate_id', 'stances', ['issue_id', 'candidate_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_stances_issue_id_candidate_id', table_name='stances')
+    op.drop_constraint('stances_issue_id_fkey', 'stances', type_='foreignkey')
+    op.drop_column('stances', 'issue_id')
+    op.drop_index(op.f('ix_issue_aliases_issue_id'), table_name='issue_aliases')
+    op.drop_table('issue_aliases')
+    op.drop_table('issues')
@@ -0,0 +1,45 @@
+"""Add generated tsvector columns and GIN indexes for full-text search
+
+Revision ID: 263c88adbcf7
+Revises: 6f8a48834d0c
+Create Date: 2025-04-30 14:12:08.512330
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '263c88adbcf7'
+down_revision: Union[str, None] = '6f8a48834d0c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Adding a stored generated column rewrites the table once, computing the
+    # vector for every existing row
+    op.add_column('candidates', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(office, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(bio_text->>'value', '')), 'C')",
+        persisted=True,
+    ), nullable=True))
+    op.add_column('stances', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(
+        "setweight(to_tsvector('english', coalesce(issue, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(position, '')), 'B')",
+        persisted=True,
+    ), nullable=True))
+    op.create_index('ix_candidates_search_vector', 'candidates', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_stances_search_vector', 'stances', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_stances_search_vector', table_name='stances', postgresql_using='gin')
+    op.drop_index('ix_candidates_search_vector', table_name='candidates', postgresql_using='gin')
+    op.drop_column('stances', 'search_vector')
+    op.drop_column('candidates', 'search_vector')
@@ -0,0 +1,38 @@
+"""Add indexes for paginated, filtered candidate listing
+
+Revision ID: 5202d1fa4b36
+Revises: 80aaf377b0f9
+Create Date: 2025-04-21 10:02:37.114520
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5202d1fa4b36'
+down_revision: Union[str, None] = '80aaf377b0f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_candidates_created_at_id', 'candidates', ['created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_candidates_state'), 'candidates', ['state'], unique=False)
+    op.create_index(op.f('ix_candidates_office'), 'candidates', ['office'], unique=False)
+    op.create_index(op.f('ix_candidates_district'), 'candidates', ['district'], unique=False)
+    op.create_index(op.f('ix_candidates_is_incumbent'), 'candidates', ['is_incumbent'], unique=False)
+    op.create_index(op.f('ix_stances_candidate_id'), 'stances', ['candidate_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_stances_candidate_id'), table_name='stances')
+    op.drop_index(op.f('ix_candidates_is_incumbent'), table_name='candidates')
+    op.drop_index(op.f('ix_candidates_district'), table_name='candidates')
+    op.drop_index(op.f('ix_candidates_office'), table_name='candidates')
+    op.drop_index(op.f('ix_candidates_state'), table_name='candidates')
+    op.drop_index('ix_candidates_created_at_id', table_name='candidates')
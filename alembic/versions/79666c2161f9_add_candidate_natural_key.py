@@ -0,0 +1,55 @@
+"""Add unique natural key to candidates for idempotent upserts
+
+Revision ID: 79666c2161f9
+Revises: 5202d1fa4b36
+Create Date: 2025-04-23 16:27:05.402931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '79666c2161f9'
+down_revision: Union[str, None] = '5202d1fa4b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def normalized(column: str) -> str:
+    # Same normalization as routes.candidates.natural_key
+    return f"trim(lower(regexp_replace(coalesce({column}, ''), '[^a-zA-Z0-9]+', ' ', 'g')))"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('candidates', sa.Column('natural_key', sa.String(), nullable=True))
+
+    op.execute(f"""
+        UPDATE candidates
+        SET natural_key = {normalized('name')} || '|' || {normalized('office')} || '|' || {normalized('state')}
+    """)
+
+    # Existing duplicates keep their rows, but only the most recent one
+    # claims the key; older copies are left unkeyed for manual cleanup.
+    op.execute("""
+        UPDATE candidates c
+        SET natural_key = NULL
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY natural_key ORDER BY created_at DESC, id DESC
+            ) AS rn
+            FROM candidates
+        ) ranked
+        WHERE c.id = ranked.id AND ranked.rn > 1
+    """)
+
+    op.create_index(op.f('ix_candidates_natural_key'), 'candidates', ['natural_key'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_candidates_natural_key'), table_name='candidates')
+    op.drop_column('candidates', 'natural_key')
@@ -0,0 +1,28 @@
+"""Add (state, office) index for race lookups
+
+Revision ID: afabe45199c6
+Revises: 177ab2c83b31
+Create Date: 2025-05-05 09:41:12.508831
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'afabe45199c6'
+down_revision: Union[str, None] = '177ab2c83b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_candidates_state_office', 'candidates', ['state', 'office'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_candidates_state_office', table_name='candidates')
@@ -0,0 +1,44 @@
+"""Number stance versions per candidate and mark keyframes
+
+Revision ID: b875bb0119c4
+Revises: afabe45199c6
+Create Date: 2025-05-08 14:22:51.730164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b875bb0119c4'
+down_revision: Union[str, None] = 'afabe45199c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('versions', sa.Column('version', sa.Integer(), nullable=True))
+    op.add_column('versions', sa.Column('is_keyframe', sa.Boolean(), nullable=False, server_default=sa.true()))
+
+    # Any snapshot written before this revision holds a full stance list
+    op.execute("""
+        UPDATE versions SET version = numbered.version
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY candidate_id ORDER BY created_at, id) AS version
+            FROM versions
+        ) AS numbered
+        WHERE versions.id = numbered.id
+    """)
+    op.alter_column('versions', 'version', nullable=False)
+    op.alter_column('versions', 'is_keyframe', server_default=None)
+    op.create_index('ix_versions_candidate_id_version', 'versions', ['candidate_id', 'version'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_versions_candidate_id_version', table_name='versions')
+    op.drop_column('versions', 'is_keyframe')
+    op.drop_column('versions', 'version')
@@ -0,0 +1,44 @@
+"""Track fingerprinted sources per candidate and flag stale stances
+
+Revision ID: e8923d66eb01
+Revises: b875bb0119c4
+Create Date: 2025-05-12 16:05:09.318842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8923d66eb01'
+down_revision: Union[str, None] = 'b875bb0119c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'candidate_sources',
+        sa.Column('natural_key', sa.String(), nullable=False),
+        sa.Column('url', sa.Text(), nullable=False),
+        sa.Column('label', sa.String(), nullable=False),
+        sa.Column('fingerprint', sa.String(), nullable=True),
+        sa.Column('extraction', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('first_seen_at', sa.DateTime(), nullable=True),
+        sa.Column('last_seen_at', sa.DateTime(), nullable=True),
+        sa.Column('changed_at', sa.DateTime(), nullable=True),
+        sa.Column('missing_since', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('natural_key', 'url'),
+    )
+    op.add_column('stances', sa.Column('is_stale', sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.alter_column('stances', 'is_stale', server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('stances', 'is_stale')
+    op.drop_table('candidate_sources')
@@ -0,0 +1,78 @@
+# Throughput and output parity of the text_extract engines over saved pages.
+#
+#   python benchmarks/extract_bench.py --page-cache tools/.page_cache/pages.sqlite3 --save corpus/
+#   python benchmarks/extract_bench.py --corpus corpus/
+#
+# The corpus is either a directory of .html files or the scraper's page cache;
+# --save exports the cache so later runs compare against a fixed set of pages.
+
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "tools"))
+
+from text_extract import parse_page_bs4, parse_page_lxml
+
+def load_corpus(args) -> list[str]:
+    if args.corpus:
+        return [p.read_text(errors="replace") for p in sorted(Path(args.corpus).glob("*.html"))]
+    db = sqlite3.connect(args.page_cache)
+    rows = db.execute("SELECT key, body FROM pages WHERE content_type IS NULL OR content_type LIKE '%html%'").fetchall()
+    if args.save:
+        out = Path(args.save)
+        out.mkdir(parents=True, exist_ok=True)
+        for key, body in rows:
+            (out / f"{key[:16]}.html").write_text(body)
+        print(f"💾 Saved {len(rows)} pages to {out}")
+    return [body for _, body in rows]
+
+def bench(name: str, extract, pages: list[str], repeat: int, **kwargs) -> list[str]:
+    size = sum(len(p.encode()) for p in pages) * repeat
+    started = time.perf_counter()
+    for _ in range(repeat):
+        outputs = [extract(page, **kwargs)[0] for page in pages]
+    elapsed = time.perf_counter() - started
+    print(f"{name:<28} {len(pages) * repeat / elapsed:>9.1f} pages/s {size / elapsed / 1e6:>8.2f} MB/s")
+    return outputs
+
+def jaccard(a: str, b: str) -> float:
+    a_lines, b_lines = set(a.splitlines()), set(b.splitlines())
+    if not a_lines and not b_lines:
+        return 1.0
+    return len(a_lines & b_lines) / len(a_lines | b_lines)
+
+def parity(name: str, reference: list[str], outputs: list[str]):
+    exact = sum(r == o for r, o in zip(reference, outputs))
+    overlap = sum(jaccard(r, o) for r, o in zip(reference, outputs)) / len(reference)
+    print(f"{name:<28} {exact}/{len(reference)} identical, mean line overlap {overlap:.3f}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", help="Directory of .html files")
+    parser.add_argument("--page-cache", default=".page_cache/pages.sqlite3", help="Page cache to read when --corpus is not given")
+    parser.add_argument("--save", help="Export the page cache corpus to this directory")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_corpus(args)
+    if not pages:
+        print("❌ Empty corpus")
+        return
+    print(f"📚 {len(pages)} pages, {sum(len(p.encode()) for p in pages) / 1e6:.1f} MB\n")
+
+    print("⏱️ Throughput")
+    reference = bench("bs4 (text + links)", parse_page_bs4, pages, args.repeat)
+    bench("lxml (text + links)", parse_page_lxml, pages, args.repeat, strip_boilerplate=False)
+    bench("bs4 (text only)", parse_page_bs4, pages, args.repeat, want_links=False)
+    same_rules = bench("lxml (text only)", parse_page_lxml, pages, args.repeat, want_links=False, strip_boilerplate=False)
+    stripped = bench("lxml (text only, stripped)", parse_page_lxml, pages, args.repeat, want_links=False)
+
+    print("\n🔍 Parity against bs4")
+    parity("lxml, same rules", reference, same_rules)
+    parity("lxml, boilerplate stripped", reference, stripped)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# Concurrent read load against running API servers: requests/sec and latency
+# percentiles per concurrency level.
+#
+#   uvicorn main:app --port 8000
+#   python benchmarks/load_test.py --base-url http://127.0.0.1:8000
+#
+# To compare two builds (e.g. before and after a change), start one server
+# per build and list both; each gets the same schedule in turn:
+#
+#   python benchmarks/load_test.py --base-url sync=http://127.0.0.1:8001,async=http://127.0.0.1:8002
+#
+# Start the servers with RESPONSE_CACHE_MAX_ENTRIES=0, or every request after
+# the first is a cache hit and the database is never measured.
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import httpx
+
+DEFAULT_PATHS = "/candidates/{id},/candidates/?limit=20"
+
+async def candidate_ids(client: httpx.AsyncClient, base_url: str) -> list[str]:
+    response = await client.get(f"{base_url}/candidates/", params={"fields": "id", "limit": 500})
+    response.raise_for_status()
+    return [item["id"] for item in response.json()["items"]]
+
+async def worker(client: httpx.AsyncClient, urls: list[str], deadline: float, latencies: list[float], errors: list[int]):
+    while time.perf_counter() < deadline:
+        url = random.choice(urls)
+        started = time.perf_counter()
+        try:
+            response = await client.get(url)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors.append(1)
+
+def percentile(values: list[float], p: float) -> float:
+    return statistics.quantiles(values, n=100)[int(p) - 1] if len(values) > 1 else (values[0] if values else 0.0)
+
+async def run_level(base_url: str, urls: list[str], concurrency: int, duration: float) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        # Warm the pools so connection setup is not counted
+        await asyncio.gather(*(client.get(random.choice(urls)) for _ in range(concurrency)), return_exceptions=True)
+        latencies: list[float] = []
+        errors: list[int] = []
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client, urls, started + duration, latencies, errors) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": percentile(latencies, 50) * 1000,
+        "p95": percentile(latencies, 95) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+        "errors": len(errors),
+    }
+
+def parse_targets(value: str) -> list[tuple[str, str]]:
+    targets = []
+    for part in value.split(","):
+        label, _, url = part.rpartition("=")
+        targets.append((label or url, url.rstrip("/")))
+    return targets
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="Server URL, or label=url,label=url to compare")
+    parser.add_argument("--paths", default=DEFAULT_PATHS, help="Comma-separated paths; {id} is a random candidate id")
+    parser.add_argument("--concurrency", default="1,8,32,64", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per level")
+    args = parser.parse_args()
+
+    levels = [int(c) for c in args.concurrency.split(",")]
+    results = {}
+    for label, base_url in parse_targets(args.base_url):
+        async with httpx.AsyncClient(timeout=30) as client:
+            ids = await candidate_ids(client, base_url)
+        if not ids:
+            print(f"❌ {label}: no candidates to read")
+            return
+        # Fixed URL set per target so every level draws from the same mix
+        urls = [base_url + path.format(id=random.choice(ids)) for path in args.paths.split(",") for _ in range(200)]
+        print(f"🚀 {label} ({base_url}), {len(ids)} candidates")
+        for concurrency in levels:
+            result = await run_level(base_url, urls, concurrency, args.duration)
+            results[label, concurrency] = result
+            print(
+                f"  c={concurrency:<4} {result['rps']:>8.1f} req/s  p50 {result['p50']:>7.1f} ms"
+                f"  p95 {result['p95']:>7.1f} ms  p99 {result['p99']:>7.1f} ms  errors {result['errors']}"
+            )
+
+    labels = list(dict.fromkeys(label for label, _ in results))
+    if len(labels) > 1:
+        base = labels[0]
+        print(f"\n📊 Requests/sec relative to {base}")
+        for label in labels[1:]:
+            print(f"  {label}: " + ", ".join(
+                f"c={c} {results[label, c]['rps'] / results[base, c]['rps']:.2f}x" for c in levels
+            ))
+
+if __name__ == "__main__":
+    asyncio.run(main())
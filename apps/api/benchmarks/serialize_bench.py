@@ -0,0 +1,140 @@
+# Per-candidate cost of turning ORM candidates into a GET /candidates/ JSON
+# body, before and after the from_attributes schemas.
+#
+#   python benchmarks/serialize_bench.py
+#   python benchmarks/serialize_bench.py --counts 1000,10000 --stances 12
+#
+# "before" is the old path: copy every attribute into CandidateResponse and
+# StanceResponse by hand, then let FastAPI validate the page against
+# response_model again, run jsonable_encoder and json.dumps it. "after"
+# validates the ORM rows once and lets pydantic-core write the bytes. No
+# database is needed; the candidates are built in memory.
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Union
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+import models
+import schemas
+from routes.candidates import dump_json
+
+def make_candidates(count: int, stances: int) -> list[models.Candidate]:
+    now = datetime(2025, 5, 1)
+    candidates = []
+    for i in range(count):
+        candidate = models.Candidate(
+            id=uuid.uuid4(),
+            name=f"Candidate {i}",
+            office="U.S. House",
+            party={"value": "Independent", "source_url": "https://ballotpedia.org/"},
+            bio_text={"value": "Lifelong resident and small business owner. " * 8, "source_url": "https://example.com/about"},
+            past_positions=[{"value": "City Council", "source_url": "https://example.com/about"}],
+            district=str(i % 8 + 1),
+            state="WI",
+            is_incumbent=i % 5 == 0,
+            photo_url="https://example.com/photo.jpg",
+            social_links=["https://x.com/example", "https://facebook.com/example"],
+            age=40 + i % 30,
+            created_at=now + timedelta(seconds=i),
+            last_updated=now + timedelta(seconds=i),
+        )
+        candidate.stances = [
+            models.Stance(
+                id=uuid.uuid4(),
+                issue=f"Issue {j}",
+                issue_id=None,
+                position="Supports expanding access while keeping costs down for working families. " * 3,
+                source_url="https://example.com/issues",
+                is_stale=False,
+                created_at=now,
+            )
+            for j in range(stances)
+        ]
+        candidates.append(candidate)
+    return candidates
+
+# The hand-written copy get_candidate_response used to do
+def legacy_candidate_response(candidate: models.Candidate) -> schemas.CandidateResponse:
+    return schemas.CandidateResponse(
+        id=candidate.id,
+        name=candidate.name,
+        office=candidate.office,
+        party=candidate.party,
+        bio_text=candidate.bio_text,
+        past_positions=candidate.past_positions,
+        district=candidate.district,
+        state=candidate.state,
+        is_incumbent=candidate.is_incumbent,
+        photo_url=candidate.photo_url,
+        social_links=candidate.social_links,
+        age=candidate.age,
+        gender=candidate.gender,
+        race=candidate.race,
+        marital_status=candidate.marital_status,
+        created_at=candidate.created_at,
+        last_updated=candidate.last_updated,
+        stance_summary=[
+            schemas.StanceResponse(
+                issue=s.issue,
+                issue_id=s.issue_id,
+                position=s.position,
+                source_url=s.source_url,
+                created_at=s.created_at,
+            )
+            for s in candidate.stances
+        ],
+    )
+
+RESPONSE_FIELD = create_model_field(
+    name="Response_get_all_candidates",
+    type_=Union[schemas.CandidatePage, schemas.CandidateFieldsPage],
+    mode="serialization",
+)
+
+def before(candidates: list[models.Candidate]) -> bytes:
+    page = schemas.CandidatePage(items=[legacy_candidate_response(c) for c in candidates], next_cursor=None)
+    content = asyncio.run(serialize_response(field=RESPONSE_FIELD, response_content=page))
+    return JSONResponse(content).body
+
+def after(candidates: list[models.Candidate]) -> bytes:
+    return dump_json(schemas.CandidatePage.model_validate({"items": candidates, "next_cursor": None}))
+
+def bench(name: str, serialize, candidates: list[models.Candidate], repeat: int) -> tuple[float, bytes]:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = serialize(candidates)
+        best = min(best, time.perf_counter() - started)
+    per_candidate = best / len(candidates) * 1e6
+    print(f"  {name:<8} {best * 1000:>9.1f} ms total {per_candidate:>8.1f} µs/candidate {len(body) / 1e6:>7.2f} MB")
+    return best, body
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counts", default="1000,10000", help="Comma-separated page sizes")
+    parser.add_argument("--stances", type=int, default=8, help="Stances per candidate")
+    parser.add_argument("--repeat", type=int, default=3, help="Best of this many runs")
+    args = parser.parse_args()
+
+    for count in [int(c) for c in args.counts.split(",")]:
+        candidates = make_candidates(count, args.stances)
+        print(f"📦 {count} candidates, {args.stances} stances each")
+        old, old_body = bench("before", before, candidates, args.repeat)
+        new, new_body = bench("after", after, candidates, args.repeat)
+        same = json.loads(old_body) == json.loads(new_body)
+        print(f"  {'speedup':<8} {old / new:>9.1f}x, identical JSON: {'yes' if same else 'NO'}\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# apps/api/issues.py
+
+import re
+import threading
+from typing import Optional
+from sqlalchemy.orm import Session
+
+import models
+
+# Canonical issues and the free-text labels that map onto them. The alias
+# table in the database was seeded from a copy of this in the
+# add_issue_taxonomy migration, so changes here need a new migration to reach
+# the database; aliases are compared after normalize_issue.
+ISSUE_TAXONOMY = {
+    "abortion": ("Abortion", [
+        "abortion", "abortion access", "abortion rights", "reproductive rights", "reproductive health",
+        "reproductive freedom", "right to life", "pro life", "pro choice", "roe v wade",
+    ]),
+    "immigration": ("Immigration", [
+        "immigration", "immigration reform", "border", "border security", "the border", "asylum",
+        "illegal immigration", "daca",
+    ]),
+    "economy": ("Economy", [
+        "economy", "the economy", "jobs", "economic growth", "economic development", "inflation",
+        "cost of living", "small business", "small businesses",
+    ]),
+    "taxes": ("Taxes", ["taxes", "tax", "tax policy", "tax reform", "taxation", "tax cuts", "property taxes"]),
+    "healthcare": ("Healthcare", [
+        "healthcare", "health care", "health", "medicare", "medicaid", "affordable care act", "obamacare",
+        "prescription drugs", "prescription drug prices", "mental health",
+    ]),
+    "education": ("Education", [
+        "education", "schools", "public education", "public schools", "school choice", "student loans",
+        "student debt", "higher education",
+    ]),
+    "climate": ("Climate & Environment", [
+        "climate", "climate change", "environment", "the environment", "clean energy", "renewable energy",
+        "conservation", "clean water",
+    ]),
+    "energy": ("Energy", ["energy", "energy policy", "energy independence", "oil and gas"]),
+    "guns": ("Gun Policy", [
+        "gun control", "gun rights", "gun policy", "gun safety", "gun violence", "guns", "firearms",
+        "second amendment", "2nd amendment",
+    ]),
+    "criminal-justice": ("Criminal Justice & Public Safety", [
+        "criminal justice", "criminal justice reform", "public safety", "crime", "policing", "police",
+        "law enforcement",
+    ]),
+    "social-security": ("Social Security", ["social security", "retirement", "retirement security"]),
+    "veterans": ("Veterans", ["veterans", "veterans affairs", "veteran affairs", "military families"]),
+    "foreign-policy": ("Foreign Policy & Defense", [
+        "foreign policy", "national security", "national defense", "defense", "military", "ukraine", "israel",
+        "china",
+    ]),
+    "elections": ("Voting & Elections", [
+        "voting rights", "voting", "elections", "election integrity", "election security", "voter id",
+        "campaign finance",
+    ]),
+    "infrastructure": ("Infrastructure", ["infrastructure", "transportation", "roads", "broadband"]),
+    "housing": ("Housing", ["housing", "affordable housing", "homelessness", "housing affordability"]),
+    "agriculture": ("Agriculture", ["agriculture", "farming", "farmers", "rural development"]),
+    "labor": ("Labor & Wages", ["labor", "workers", "workers rights", "minimum wage", "unions", "organized labor"]),
+    "lgbtq-rights": ("LGBTQ+ Rights", [
+        "lgbtq rights", "lgbtq", "lgbt rights", "same sex marriage", "marriage equality", "transgender rights",
+    ]),
+    "government-spending": ("Government Spending", [
+        "government spending", "spending", "national debt", "debt", "deficit", "federal budget", "budget",
+        "fiscal responsibility",
+    ]),
+    "trade": ("Trade", ["trade", "tariffs", "trade policy"]),
+    "technology": ("Technology & Privacy", [
+        "technology", "big tech", "privacy", "data privacy", "artificial intelligence", "ai",
+    ]),
+    "civil-rights": ("Civil Rights", ["civil rights", "racial justice", "equality", "equal rights", "civil liberties"]),
+    "drugs": ("Drug Policy", [
+        "drug policy", "opioids", "opioid crisis", "fentanyl", "marijuana", "cannabis", "marijuana legalization",
+    ]),
+}
+
+# Same normalization as the SQL backfill in the add_issue_taxonomy migration
+def normalize_issue(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+# alias -> issue id, loaded once per process from issue_aliases (which only
+# migrations change, so a restart picks up new aliases). The query
+# runs outside the lock: async routes call this through run_sync, and a
+# coroutine holding the lock across that await would block the event loop
+# thread for every other caller.
+_alias_map: Optional[dict[str, str]] = None
+_alias_lock = threading.Lock()
+
+def alias_map(db: Session) -> dict[str, str]:
+    global _alias_map
+    aliases = _alias_map
+    if aliases is None:
+        aliases = dict(db.query(models.IssueAlias.alias, models.IssueAlias.issue_id).all())
+        with _alias_lock:
+            if _alias_map is None:
+                _alias_map = aliases
+            aliases = _alias_map
+    return aliases
+
+# Canonical issue id for a free-text issue label: an exact alias match, else
+# the longest alias found as a whole phrase inside it ("Protecting abortion
+# access" -> abortion). None when nothing matches.
+def resolve_issue(text: str, aliases: dict[str, str]) -> Optional[str]:
+    normalized = normalize_issue(text)
+    if normalized in aliases:
+        return aliases[normalized]
+    padded = f" {normalized} "
+    matches = [alias for alias in aliases if f" {alias} " in padded]
+    if not matches:
+        return None
+    return aliases[max(matches, key=len)]
+
+# Accepts a canonical id or any alias, e.g. /issues/reproductive-rights/stances
+def lookup_issue(db: Session, issue: str) -> Optional[models.Issue]:
+    found = db.get(models.Issue, issue)
+    if found is not None:
+        return found
+    issue_id = resolve_issue(issue.replace("-", " "), alias_map(db))
+    return db.get(models.Issue, issue_id) if issue_id else None
@@ -0,0 +1,225 @@
+# apps/api/llm_gateway.py
+#
+# Single entry point for LLM calls from both the API and the scraper tools:
+# one pooled client, a token-bucket rate limiter sized to the provider quota,
+# jittered retries on 429/5xx, and per-call usage metering.
+
+import contextvars
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Optional
+
+import httpx
+from dotenv import load_dotenv
+from openai import APIConnectionError, APIStatusError, APITimeoutError, OpenAI
+
+# Explicit path so the tools, which run from apps/api/tools, pick up the same .env
+load_dotenv(dotenv_path=Path(__file__).resolve().parent / ".env")
+
+DEFAULT_MODEL = os.getenv("LLM_MODEL", "meta/llama-3.3-70b-instruct")
+TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+# Longest wait between retries, including a server's Retry-After
+MAX_BACKOFF_SECONDS = 30.0
+MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "16"))
+# Provider quota; 0 disables that limit
+REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+
+logger = logging.getLogger("llm_gateway")
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    # Blocks until `amount` is available. Requests larger than the bucket are
+    # clamped so they wait for a full bucket instead of forever.
+    def acquire(self, amount: float = 1):
+        if self.rate <= 0:
+            return
+        amount = min(amount, self.capacity)
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+    # Settle the difference once the real cost is known; may go negative
+    def adjust(self, amount: float):
+        if self.rate <= 0:
+            return
+        with self.lock:
+            self._refill()
+            self.tokens -= amount
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+class Usage:
+    def __init__(self, tags: dict):
+        self.tags = tags
+        self.calls = 0
+        self.cache_hits = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, record: dict):
+        with self.lock:
+            if record["cache_hit"]:
+                self.cache_hits += 1
+                return
+            self.calls += 1
+            self.errors += 0 if record["ok"] else 1
+            self.prompt_tokens += record["prompt_tokens"]
+            self.completion_tokens += record["completion_tokens"]
+            self.latency += record["latency"]
+
+    def as_dict(self) -> dict:
+        return {
+            **self.tags,
+            "calls": self.calls,
+            "cache_hits": self.cache_hits,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency": round(self.latency, 3),
+        }
+
+# Usage scopes active in the current context, innermost last. Thread pools
+# must run work via contextvars.copy_context().run for scopes to follow.
+_scopes: contextvars.ContextVar[tuple] = contextvars.ContextVar("llm_usage_scopes", default=())
+
+# Every call and cache hit inside the block is added to the yielded Usage,
+# e.g. with metered(candidate=name) as usage: ...
+@contextmanager
+def metered(**tags):
+    usage = Usage(tags)
+    token = _scopes.set(_scopes.get() + (usage,))
+    try:
+        yield usage
+    finally:
+        _scopes.reset(token)
+
+def current_tags() -> dict:
+    tags = {}
+    for usage in _scopes.get():
+        tags.update(usage.tags)
+    return tags
+
+class LLMGateway:
+    def __init__(self):
+        self._client: Optional[OpenAI] = None
+        self._client_lock = threading.Lock()
+        self.request_bucket = TokenBucket(REQUESTS_PER_MINUTE)
+        self.token_bucket = TokenBucket(TOKENS_PER_MINUTE)
+        self.totals = Usage({})
+        # Called with every per-call record (e.g. to feed /metrics)
+        self.listeners: list[Callable[[dict], None]] = []
+
+    @property
+    def client(self) -> OpenAI:
+        # Built lazily so importing this module never needs credentials
+        with self._client_lock:
+            if self._client is None:
+                self._client = OpenAI(
+                    base_url=os.getenv("OPENAI_BASE_URL"),
+                    api_key=os.getenv("OPENAI_API_KEY"),
+                    timeout=TIMEOUT_SECONDS,
+                    max_retries=0,  # retries are handled here, with the rate limiter in the loop
+                    http_client=httpx.Client(
+                        limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+                        timeout=TIMEOUT_SECONDS,
+                    ),
+                )
+            return self._client
+
+    def chat(self, messages: list[dict], model: str = DEFAULT_MODEL, temperature: float = 0.4, max_tokens: Optional[int] = None) -> str:
+        # Rough pre-charge (~4 chars per token); settled against real usage below
+        estimate = sum(len(m["content"]) for m in messages) // 4 + (max_tokens or 500)
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            self.request_bucket.acquire()
+            self.token_bucket.acquire(estimate)
+            try:
+                completion = self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    **({"max_tokens": max_tokens} if max_tokens else {}),
+                )
+                break
+            except (APIConnectionError, APITimeoutError, APIStatusError) as e:
+                status = getattr(e, "status_code", None)
+                retryable = status is None or status == 429 or status >= 500
+                if not retryable or attempt > MAX_RETRIES:
+                    self._record(model, attempt, started, ok=False)
+                    raise
+                time.sleep(self._backoff(attempt, e))
+
+        usage = completion.usage
+        prompt_tokens = usage.prompt_tokens if usage else 0
+        completion_tokens = usage.completion_tokens if usage else 0
+        if usage:
+            self.token_bucket.adjust(prompt_tokens + completion_tokens - estimate)
+        self._record(model, attempt, started, ok=True, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        return completion.choices[0].message.content.strip()
+
+    # Record an LLM call that was answered from a cache instead
+    def record_cache_hit(self, kind: str):
+        self._emit({"kind": kind, "cache_hit": True, "ok": True, "prompt_tokens": 0, "completion_tokens": 0, "latency": 0.0})
+
+    @staticmethod
+    def _backoff(attempt: int, error: Exception) -> float:
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(max(float(retry_after), 0.0), MAX_BACKOFF_SECONDS)
+            except ValueError:
+                pass
+        # Full jitter: uniform over an exponentially growing window
+        return random.uniform(0, min(MAX_BACKOFF_SECONDS, 0.5 * 2 ** attempt))
+
+    def _record(self, model: str, attempts: int, started: float, ok: bool, prompt_tokens: int = 0, completion_tokens: int = 0):
+        self._emit({
+            "kind": "chat",
+            "model": model,
+            "cache_hit": False,
+            "ok": ok,
+            "attempts": attempts,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "latency": time.perf_counter() - started,
+        })
+
+    def _emit(self, record: dict):
+        # Tags never override the gateway's own fields
+        record = {**current_tags(), **record}
+        self.totals.add(record)
+        for usage in _scopes.get():
+            usage.add(record)
+        for listener in self.listeners:
+            listener(record)
+        logger.info(json.dumps(record))
+
+gateway = LLMGateway()
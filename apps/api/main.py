@@ -2,7 +2,8 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routes import candidates, generate_summary
+from metrics import MetricsMiddleware
+from routes import candidates, compare, export, generate_summary, issues, metrics, search
 
 app = FastAPI()
 
@@ -13,6 +14,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added last so it is outermost and times everything, CORS included
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(candidates.router)
-app.include_router(generate_summary.router)
\ No newline at end of file
+app.include_router(compare.router)
+app.include_router(export.router)
+app.include_router(generate_summary.router)
+app.include_router(issues.router)
+app.include_router(metrics.router)
+app.include_router(search.router)
\ No newline at end of file
@@ -0,0 +1,219 @@
+# apps/api/metrics.py
+
+import bisect
+import contextvars
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from starlette.routing import Match
+
+from db import async_engine, engine
+from llm_gateway import gateway
+
+# Request, database and LLM metrics, served in the Prometheus text format by
+# GET /metrics (routes/metrics.py).
+#
+# MetricsMiddleware times every HTTP request by route template (so
+# /candidates/{candidate_id}, not each id), counts responses by status and
+# tracks requests in flight. Queries on either engine are counted and timed
+# against the request that ran them; db_queries_per_request is where N+1s
+# show up. LLM calls arrive through the gateway's listeners.
+#
+# Values are per process: with several uvicorn workers, each one's /metrics
+# covers only the requests it served; sum across workers when querying.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: dict[tuple, object] = {}
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.extend(self.samples(key, value))
+        return lines
+
+    def label_text(self, key: tuple, extra: str = "") -> str:
+        pairs = [f'{label}="{escape(value)}"' for label, value in zip(self.labels, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *key, amount: float = 1):
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self, key: tuple, value) -> list[str]:
+        return [f"{self.name}{self.label_text(key)} {format_value(value)}"]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *key):
+        self.inc(*key, amount=-1)
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+
+    def observe(self, *key, value: float):
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                # Per-bucket counts (the last is +Inf), then sum
+                state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+
+    def samples(self, key: tuple, value) -> list[str]:
+        counts, total = value
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.buckets + (float("inf"),), counts):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else format_value(bound)
+            bucket_label = f'le="{le}"'
+            lines.append(f"{self.name}_bucket{self.label_text(key, bucket_label)} {cumulative}")
+        lines.append(f"{self.name}_sum{self.label_text(key)} {format_value(total)}")
+        lines.append(f"{self.name}_count{self.label_text(key)} {cumulative}")
+        return lines
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+REGISTRY: list[Metric] = []
+
+http_requests = Counter("http_requests_total", "HTTP responses by route and status.", ("method", "route", "status"))
+http_duration = Histogram("http_request_duration_seconds", "HTTP request latency, including streamed bodies.", ("method", "route"))
+http_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being handled.", ("method", "route"))
+
+db_queries = Counter("db_queries_total", "SQL statements executed, by the route that ran them.", ("route",))
+db_query_duration = Histogram("db_query_duration_seconds", "Time per SQL statement.", ("route",), QUERY_BUCKETS)
+db_request_queries = Histogram("db_queries_per_request", "SQL statements per HTTP request.", ("route",), COUNT_BUCKETS)
+db_request_time = Histogram("db_time_per_request_seconds", "Total SQL time per HTTP request.", ("route",))
+
+llm_calls = Counter("llm_calls_total", "LLM calls, by kind, model and outcome.", ("kind", "model", "ok"))
+llm_cache_hits = Counter("llm_cache_hits_total", "LLM calls answered from a cache instead.", ("kind",))
+llm_tokens = Counter("llm_tokens_total", "LLM tokens used.", ("model", "type"))
+llm_duration = Histogram("llm_call_duration_seconds", "LLM call latency, including retries.", ("model",))
+
+def render() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+# Database work done on behalf of one request. Sync routes run in the
+# threadpool with a copy of the request's context, so they share this object.
+class RequestStats:
+    def __init__(self, route: str):
+        self.route = route
+        self.queries = 0
+        self.seconds = 0.0
+
+_request: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("metrics_request", default=None)
+
+# Route template for the request, e.g. /candidates/{candidate_id}. Matched up
+# front so the in-flight gauge has it too; unmatched paths share one label
+# to keep the series count bounded.
+def route_for(scope) -> str:
+    partial = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or "unmatched"
+
+# Pure ASGI rather than BaseHTTPMiddleware, so streamed responses are not
+# buffered and the timing covers the whole body
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_for(scope)
+        stats = RequestStats(route)
+        token = _request.set(stats)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_in_flight.inc(method, route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_duration.observe(method, route, value=time.perf_counter() - started)
+            http_in_flight.dec(method, route)
+            http_requests.inc(method, route, str(status))
+            db_request_queries.observe(route, value=stats.queries)
+            db_request_time.observe(route, value=stats.seconds)
+            _request.reset(token)
+
+# Statement start times are kept on the connection, per the SQLAlchemy
+# recipe; a stack, since a statement may run while another is being timed
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["metrics_query_start"].pop()
+    stats = _request.get()
+    route = stats.route if stats else "background"
+    if stats:
+        stats.queries += 1
+        stats.seconds += elapsed
+    db_queries.inc(route)
+    db_query_duration.observe(route, value=elapsed)
+
+# A failed statement never reaches after_cursor_execute
+def handle_error(context):
+    starts = context.connection.info.get("metrics_query_start") if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+for target in (engine, async_engine.sync_engine):
+    event.listen(target, "before_cursor_execute", before_cursor_execute)
+    event.listen(target, "after_cursor_execute", after_cursor_execute)
+    event.listen(target, "handle_error", handle_error)
+
+def record_llm_call(record: dict):
+    if record["cache_hit"]:
+        llm_cache_hits.inc(record["kind"])
+        return
+    model = record.get("model", "")
+    llm_calls.inc(record["kind"], model, "true" if record["ok"] else "false")
+    llm_tokens.inc(model, "prompt", amount=record["prompt_tokens"])
+    llm_tokens.inc(model, "completion", amount=record["completion_tokens"])
+    llm_duration.observe(model, value=record["latency"])
+
+gateway.listeners.append(record_llm_call)
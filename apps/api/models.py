@@ -1,27 +1,36 @@
 # apps/api/models.py
 
-from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Integer
-from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, String, Text, Boolean, DateTime, ForeignKey, Integer, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 import uuid
 from datetime import datetime
 from db import Base
 
 class Candidate(Base):
     __tablename__ = "candidates"
+    __table_args__ = (
+        # Keyset pagination on GET /candidates/ orders by (created_at, id)
+        Index("ix_candidates_created_at_id", "created_at", "id"),
+        Index("ix_candidates_search_vector", "search_vector", postgresql_using="gin"),
+        # GET /races/{state}/{office}
+        Index("ix_candidates_state_office", "state", "office"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)
-    office = Column(String, nullable=False)
+    office = Column(String, nullable=False, index=True)
+    # Normalized name|office|state, see routes.candidates.natural_key
+    natural_key = Column(String, nullable=True, unique=True, index=True)
 
     # Now JSONB with value + source_url
     party = Column(JSONB, default={"value": "Unknown", "source_url": ""})
     bio_text = Column(JSONB, nullable=True)
     past_positions = Column(JSONB, nullable=True)
 
-    district = Column(String, nullable=True)
-    state = Column(String, nullable=True)
-    is_incumbent = Column(Boolean, default=False)
+    district = Column(String, nullable=True, index=True)
+    state = Column(String, nullable=True, index=True)
+    is_incumbent = Column(Boolean, default=False, index=True)
     age = Column(Integer, nullable=True)
     gender = Column(String, nullable=True)
     race = Column(String, nullable=True)
@@ -32,29 +41,111 @@ class Candidate(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     last_updated = Column(DateTime, default=datetime.utcnow)
 
+    # Maintained by Postgres for GET /search; deferred so normal loads skip it
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(office, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(bio_text->>'value', '')), 'C')",
+        persisted=True,
+    )))
+
     stances = relationship("Stance", back_populates="candidate")
     versions = relationship("VersionSnapshot", back_populates="candidate")
 
 
 class Stance(Base):
     __tablename__ = "stances"
+    __table_args__ = (
+        Index("ix_stances_search_vector", "search_vector", postgresql_using="gin"),
+        # GET /issues/{issue}/stances: all stances on one issue, then their candidates
+        Index("ix_stances_issue_id_candidate_id", "issue_id", "candidate_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    candidate_id = Column(UUID(as_uuid=True), ForeignKey("candidates.id"))
+    candidate_id = Column(UUID(as_uuid=True), ForeignKey("candidates.id"), index=True)
     issue = Column(String, nullable=False)
+    # Canonical issue, assigned from issue_aliases when the stance is written
+    issue_id = Column(String, ForeignKey("issues.id"), nullable=True)
     position = Column(Text, nullable=False)
     source_url = Column(Text, nullable=True)
+    # Every source this stance came from has disappeared from the candidate's
+    # sources; see source_tracking.py
+    is_stale = Column(Boolean, nullable=False, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(issue, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(position, '')), 'B')",
+        persisted=True,
+    )))
+
     candidate = relationship("Candidate", back_populates="stances")
+    canonical_issue = relationship("Issue")
+
+
+class Issue(Base):
+    __tablename__ = "issues"
+
+    id = Column(String, primary_key=True)  # slug, e.g. "abortion"
+    label = Column(String, nullable=False)
+
+    aliases = relationship("IssueAlias", back_populates="issue")
+
+
+class IssueAlias(Base):
+    __tablename__ = "issue_aliases"
+
+    # Normalized free-text label, see issues.normalize_issue
+    alias = Column(String, primary_key=True)
+    issue_id = Column(String, ForeignKey("issues.id"), nullable=False, index=True)
+
+    issue = relationship("Issue", back_populates="aliases")
 
 
 class VersionSnapshot(Base):
     __tablename__ = "versions"
+    __table_args__ = (
+        # Numbered per candidate; reconstruction reads a version range
+        Index("ix_versions_candidate_id_version", "candidate_id", "version", unique=True),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     candidate_id = Column(UUID(as_uuid=True), ForeignKey("candidates.id"))
+    version = Column(Integer, nullable=False)
+    # Keyframes hold the full stance state, other versions a patch against
+    # the previous one; see versioning.py
+    is_keyframe = Column(Boolean, nullable=False, default=False)
     stance_json = Column(JSONB, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     candidate = relationship("Candidate", back_populates="versions")
+
+
+class CandidateSource(Base):
+    __tablename__ = "candidate_sources"
+
+    # Keyed by the candidate's natural key rather than its id: sources are
+    # recorded by POST /generate-summary/refresh, before the candidate is upserted
+    natural_key = Column(String, primary_key=True)
+    url = Column(Text, primary_key=True)
+    label = Column(String, nullable=False)
+    # Hash of the model, prompt version and normalized text; None until an
+    # extraction succeeds, so a failed one is retried on the next refresh
+    fingerprint = Column(String, nullable=True)
+    extraction = Column(JSONB, nullable=True)
+    first_seen_at = Column(DateTime, default=datetime.utcnow)
+    last_seen_at = Column(DateTime, default=datetime.utcnow)
+    changed_at = Column(DateTime, default=datetime.utcnow)
+    missing_since = Column(DateTime, nullable=True)
+
+
+class LLMCache(Base):
+    __tablename__ = "llm_cache"
+
+    # sha256 over model, prompt version and normalized inputs, see summary_cache.py
+    key = Column(String, primary_key=True)
+    kind = Column(String, nullable=False)
+    value = Column(JSONB, nullable=False)
+    hits = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_hit_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -0,0 +1,170 @@
+# apps/api/response_cache.py
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+
+# Serialized JSON responses for the candidate read routes, keyed by route and
+# arguments and stored with their ETag. Entries expire after
+# RESPONSE_CACHE_TTL_SECONDS and are dropped by the write routes as soon as
+# the data changes.
+#
+# The default backend is a per-process LRU. Writes then only invalidate the
+# process that served them, and other workers catch up within the TTL. With
+# RESPONSE_CACHE_URL=redis://... the entries live in a shared redis (install
+# the redis package) and invalidation reaches every worker.
+#
+# List pages are not dropped one by one: their keys carry a generation
+# number, and any write bumps it. DELETE /candidates/ bumps a second
+# generation that every key carries.
+CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2000"))
+CACHE_URL = os.getenv("RESPONSE_CACHE_URL")
+
+# Clients always revalidate; a matching If-None-Match costs a 304 and no body
+CACHE_CONTROL = "no-cache"
+
+class MemoryBackend:
+    blocking = False
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.entries: OrderedDict[str, tuple[float, str, bytes]] = OrderedDict()
+        self.generations: dict[str, int] = {}
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[tuple[str, bytes]]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, etag, body = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return etag, body
+
+    def set(self, key: str, etag: str, body: bytes):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, etag, body)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def generation(self, names: list[str]) -> list[int]:
+        with self.lock:
+            return [self.generations.get(name, 0) for name in names]
+
+    def bump(self, name: str):
+        with self.lock:
+            self.generations[name] = self.generations.get(name, 0) + 1
+            # Nothing can hit the old keys any more, free them now
+            if name == "all":
+                self.entries.clear()
+
+class RedisBackend:
+    PREFIX = "kyc:response:"
+    # Every call is a network round-trip
+    blocking = True
+
+    def __init__(self, url: str, ttl: int):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[tuple[str, bytes]]:
+        etag, body = self.client.hmget(self.PREFIX + key, "etag", "body")
+        if etag is None or body is None:
+            return None
+        return etag.decode(), body
+
+    def set(self, key: str, etag: str, body: bytes):
+        pipe = self.client.pipeline()
+        pipe.hset(self.PREFIX + key, mapping={"etag": etag, "body": body})
+        pipe.expire(self.PREFIX + key, self.ttl)
+        pipe.execute()
+
+    def delete(self, key: str):
+        self.client.delete(self.PREFIX + key)
+
+    def generation(self, names: list[str]) -> list[int]:
+        return [int(v or 0) for v in self.client.mget([self.PREFIX + "gen:" + n for n in names])]
+
+    def bump(self, name: str):
+        self.client.incr(self.PREFIX + "gen:" + name)
+
+def make_backend():
+    if CACHE_URL:
+        return RedisBackend(CACHE_URL, CACHE_TTL_SECONDS)
+    return MemoryBackend(CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS)
+
+backend = make_backend()
+
+# The routes are async: redis calls go to the threadpool so a round-trip
+# does not hold up the event loop; the in-process LRU is called directly
+async def call(method: str, *args):
+    if backend.blocking:
+        return await run_in_threadpool(getattr(backend, method), *args)
+    return getattr(backend, method)(*args)
+
+async def candidate_key(candidate_id) -> str:
+    (gen,) = await call("generation", ["all"])
+    return f"{gen}:candidate:{candidate_id}"
+
+# Key for a GET /candidates/ page: the query string, sorted so parameter
+# order does not matter
+async def list_key(request: Request) -> str:
+    gen, list_gen = await call("generation", ["all", "lists"])
+    return f"{gen}.{list_gen}:list:{sorted(request.query_params.multi_items())}"
+
+# Strong ETag for one candidate; last_updated changes on every write to the
+# candidate or its stances
+def candidate_etag(candidate_id, last_updated) -> str:
+    return '"' + hashlib.sha256(f"{candidate_id}|{last_updated.isoformat()}".encode()).hexdigest()[:32] + '"'
+
+# Strong ETag for a list page; derived from the body since a page spans many rows
+def body_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+async def get(key: str) -> Optional[tuple[str, bytes]]:
+    return await call("get", key)
+
+async def put(key: str, etag: str, body: bytes):
+    await call("set", key, etag, body)
+
+# 304 when the client already has this version, else the JSON body
+def respond(request: Request, etag: str, body: bytes, status: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "X-Cache": status}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL, "X-Cache": "revalidated"})
+
+# Called by the write routes after they commit
+async def invalidate_candidates(*candidate_ids):
+    for candidate_id in candidate_ids:
+        await call("delete", await candidate_key(candidate_id))
+    await call("bump", "lists")
+
+async def invalidate_all():
+    await call("bump", "all")
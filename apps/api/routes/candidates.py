@@ -1,111 +1,485 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+import base64
+import binascii
+import re
+import uuid
+from datetime import datetime, timezone
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import delete, insert, literal_column, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import Any, Dict, List, Optional, Union
 from uuid import UUID
 
-from db import get_db
+from db import async_db_with_timeout, get_async_db
+import issues
 import models
+import response_cache
 import schemas
+import versioning
 
 router = APIRouter()
 
+# Columns that may be requested via GET /candidates/?fields=...
+# "stance_summary" is the only one that requires loading stances.
+CANDIDATE_LIST_FIELDS = {
+    "id", "name", "office", "party", "bio_text", "past_positions", "district",
+    "state", "is_incumbent", "photo_url", "social_links", "age", "gender",
+    "race", "marital_status", "created_at", "last_updated", "stance_summary",
+}
+
+MAX_BULK_ITEMS = 5000
+# A full batch of MAX_BULK_ITEMS can outlast the default statement timeout
+BULK_STATEMENT_TIMEOUT_MS = 60000
+
+# Columns an upsert may overwrite; a conflicting row is only rewritten
+# when at least one of them actually differs.
+UPSERT_COLUMNS = [
+    "name", "office", "party", "bio_text", "past_positions", "district", "state",
+    "is_incumbent", "photo_url", "social_links", "age", "gender", "race", "marital_status",
+]
+
+# The candidate routes run on the async engine. Helpers shared with sync code
+# (issue aliases, stance sync, row inserts) go through AsyncSession.run_sync.
 @router.post("/candidates/", response_model=schemas.CandidateResponse)
-def create_candidate(candidate: schemas.CandidateCreate, db: Session = Depends(get_db)):
-    db_candidate = models.Candidate(
-        name=candidate.name,
-        office=candidate.office,
-        party=candidate.party.dict() if candidate.party else None,
-        bio_text=candidate.bio_text.dict() if candidate.bio_text else None,
-        past_positions=[p.dict() for p in candidate.past_positions] if candidate.past_positions else None,
-        district=candidate.district,
-        state=candidate.state,
-        is_incumbent=candidate.is_incumbent,
-        photo_url=candidate.photo_url,
-        social_links=candidate.social_links,
-        age=candidate.age,
-        gender=candidate.gender,
-        race=candidate.race,
-        marital_status=candidate.marital_status,
-    )
+async def create_candidate(candidate: schemas.CandidateCreate, db: AsyncSession = Depends(get_async_db)):
+    # Client-side id lets the candidate and its stances go out in one commit
+    aliases = await db.run_sync(issues.alias_map)
+    db_candidate = models.Candidate(**candidate_row(candidate, uuid.uuid4(), datetime.utcnow()))
+    # Assigned through the relationship so the response can be built from
+    # these objects without reading them back
+    rows = stance_rows(candidate, db_candidate.id, db_candidate.created_at, aliases)
+    db_candidate.stances = [models.Stance(**row) for row in rows]
     db.add(db_candidate)
-    db.commit()
-    db.refresh(db_candidate)
-
-    # Save stances
-    for stance in candidate.stance_summary:
-        db_stance = models.Stance(
-            candidate_id=db_candidate.id,
-            issue=stance.issue,
-            position=stance.position,
-            source_url=stance.source_url
+    db.add(models.VersionSnapshot(**versioning.keyframe_row(db_candidate.id, stance_state(rows), db_candidate.created_at)))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Candidate already exists; use POST /candidates/upsert")
+    await response_cache.invalidate_candidates(db_candidate.id)
+
+    return json_response(get_candidate_response(db_candidate))
+
+@router.post("/candidates/upsert", response_model=schemas.UpsertResponse)
+async def upsert_candidate(candidate: schemas.CandidateCreate, db: AsyncSession = Depends(get_async_db)):
+    now = datetime.utcnow()
+    row = candidate_row(candidate, uuid.uuid4(), now)
+
+    stmt = pg_insert(models.Candidate).values(**row)
+    table = models.Candidate.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.natural_key],
+        set_={**{c: stmt.excluded[c] for c in UPSERT_COLUMNS}, "last_updated": stmt.excluded.last_updated},
+        where=or_(*[table.c[c].is_distinct_from(stmt.excluded[c]) for c in UPSERT_COLUMNS]),
+    ).returning(table.c.id, literal_column("xmax = 0").label("inserted"))
+    written = (await db.execute(stmt)).first()
+
+    if written is None:
+        # Conflict on an identical row: nothing was written
+        candidate_id = await db.scalar(select(models.Candidate.id).where(models.Candidate.natural_key == row["natural_key"]))
+        status = "unchanged"
+    else:
+        candidate_id = written.id
+        status = "created" if written.inserted else "updated"
+
+    inserted, updated, deleted = await db.run_sync(sync_stances, candidate_id, candidate.stance_summary, now)
+    if status == "unchanged" and (inserted or updated or deleted):
+        await db.execute(update(models.Candidate).where(models.Candidate.id == candidate_id).values(last_updated=now))
+        status = "updated"
+    if status == "created" or inserted or updated or deleted:
+        aliases = await db.run_sync(issues.alias_map)
+        state = stance_state([
+            {**s.model_dump(), "issue_id": issues.resolve_issue(s.issue, aliases)} for s in candidate.stance_summary
+        ])
+        await db.run_sync(versioning.record_version, candidate_id, state, now)
+    await db.commit()
+    if status != "unchanged":
+        await response_cache.invalidate_candidates(candidate_id)
+
+    return schemas.UpsertResponse(
+        id=candidate_id,
+        status=status,
+        stances_inserted=inserted,
+        stances_updated=updated,
+        stances_deleted=deleted,
+    )
+
+# Items are validated one by one so a single bad record is reported
+# in the results instead of rejecting the whole batch with a 422.
+@router.post("/candidates/bulk", response_model=schemas.BulkCreateResponse)
+async def create_candidates_bulk(
+    items: List[Dict[str, Any]] = Body(...),
+    db: AsyncSession = Depends(async_db_with_timeout(BULK_STATEMENT_TIMEOUT_MS)),
+):
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_ITEMS} candidates per request")
+
+    results = [None] * len(items)
+    pending = []
+    now = datetime.utcnow()
+    aliases = await db.run_sync(issues.alias_map)
+    for index, item in enumerate(items):
+        try:
+            candidate = schemas.CandidateCreate.model_validate(item)
+        except ValidationError as e:
+            results[index] = schemas.BulkItemResult(index=index, ok=False, error=format_validation_error(e))
+            continue
+        candidate_id = uuid.uuid4()
+        pending.append((index, candidate_row(candidate, candidate_id, now), stance_rows(candidate, candidate_id, now, aliases)))
+
+    try:
+        await db.run_sync(
+            insert_rows,
+            [row for _, row, _ in pending],
+            [s for _, _, stances in pending for s in stances],
+            [versioning.keyframe_row(row["id"], stance_state(stances), now) for _, row, stances in pending],
+        )
+        await db.commit()
+        for index, row, _ in pending:
+            results[index] = schemas.BulkItemResult(index=index, id=row["id"], ok=True)
+    except SQLAlchemyError:
+        # Something in the batch was rejected by the database; retry each
+        # item under its own savepoint to find out which.
+        await db.rollback()
+        for index, row, stances in pending:
+            try:
+                async with db.begin_nested():
+                    await db.run_sync(insert_rows, [row], stances, [versioning.keyframe_row(row["id"], stance_state(stances), now)])
+                results[index] = schemas.BulkItemResult(index=index, id=row["id"], ok=True)
+            except SQLAlchemyError as e:
+                results[index] = schemas.BulkItemResult(index=index, ok=False, error=str(getattr(e, "orig", None) or e))
+        await db.commit()
+    if any(r.ok for r in results):
+        await response_cache.invalidate_candidates()
+
+    created = sum(r.ok for r in results)
+    return schemas.BulkCreateResponse(created=created, failed=len(results) - created, results=results)
+
+# Pages are served from response_cache until the next write; the ETag is
+# over the serialized page, so an unchanged page revalidates with a 304
+@router.get("/candidates/", response_model=Union[schemas.CandidatePage, schemas.CandidateFieldsPage])
+async def get_all_candidates(
+    request: Request,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    state: Optional[str] = None,
+    office: Optional[str] = None,
+    district: Optional[str] = None,
+    is_incumbent: Optional[bool] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    key = await response_cache.list_key(request)
+    cached = await response_cache.get(key)
+    if cached:
+        return response_cache.respond(request, *cached, "hit")
+
+    page = await list_candidates(db, limit, cursor, state, office, district, is_incumbent, fields)
+    body = dump_json(page)
+    etag = response_cache.body_etag(body)
+    await response_cache.put(key, etag, body)
+    return response_cache.respond(request, etag, body, "miss")
+
+async def list_candidates(
+    db: AsyncSession,
+    limit: int,
+    cursor: Optional[str],
+    state: Optional[str],
+    office: Optional[str],
+    district: Optional[str],
+    is_incumbent: Optional[bool],
+    fields: Optional[str],
+) -> Union[schemas.CandidatePage, schemas.CandidateFieldsPage]:
+    requested = parse_fields(fields)
+
+    if requested is None:
+        query = select(models.Candidate).options(selectinload(models.Candidate.stances))
+    else:
+        # Always select the keyset columns so the next cursor can be built
+        columns = (requested - {"stance_summary"}) | {"id", "created_at"}
+        query = select(*[getattr(models.Candidate, c) for c in sorted(columns)])
+
+    if state is not None:
+        query = query.where(models.Candidate.state == state)
+    if office is not None:
+        query = query.where(models.Candidate.office == office)
+    if district is not None:
+        query = query.where(models.Candidate.district == district)
+    if is_incumbent is not None:
+        query = query.where(models.Candidate.is_incumbent == is_incumbent)
+    if cursor:
+        after_created_at, after_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(models.Candidate.created_at, models.Candidate.id) > (after_created_at, after_id)
         )
-        db.add(db_stance)
-    db.commit()
 
-    db.refresh(db_candidate)
-    return get_candidate_response(db_candidate, db)
+    result = await db.execute(
+        query.order_by(models.Candidate.created_at, models.Candidate.id)
+        .limit(limit + 1)
+    )
+    rows = result.scalars().all() if requested is None else result.all()
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    rows = rows[:limit]
+
+    if requested is None:
+        return schemas.CandidatePage.model_validate({"items": rows, "next_cursor": next_cursor})
 
-@router.get("/candidates/", response_model=list[schemas.CandidateResponse])
-def get_all_candidates(db: Session = Depends(get_db)):
-    candidates = db.query(models.Candidate).options(joinedload(models.Candidate.stances)).all()
-    return [get_candidate_response(c, db) for c in candidates]
+    items = [{c: getattr(row, c) for c in requested if c != "stance_summary"} for row in rows]
+    if "stance_summary" in requested:
+        stances_by_candidate = await load_stances(db, [row.id for row in rows])
+        for item, row in zip(items, rows):
+            item["stance_summary"] = stances_by_candidate.get(row.id, [])
+    return schemas.CandidateFieldsPage(items=items, next_cursor=next_cursor)
 
+# Cached like the list pages, but the ETag comes from last_updated: a client
+# revalidating a candidate that is not cached costs one indexed lookup of
+# that column instead of loading the candidate and its stances
 @router.get("/candidates/{candidate_id}", response_model=schemas.CandidateResponse)
-def get_candidate(candidate_id: UUID, db: Session = Depends(get_db)):
-    candidate = (
-        db.query(models.Candidate)
+async def get_candidate(candidate_id: UUID, request: Request, db: AsyncSession = Depends(get_async_db)):
+    key = await response_cache.candidate_key(candidate_id)
+    cached = await response_cache.get(key)
+    if cached:
+        return response_cache.respond(request, *cached, "hit")
+
+    if request.headers.get("if-none-match"):
+        last_updated = await db.scalar(select(models.Candidate.last_updated).where(models.Candidate.id == candidate_id))
+        if last_updated is not None:
+            etag = response_cache.candidate_etag(candidate_id, last_updated)
+            if response_cache.etag_matches(request, etag):
+                return response_cache.not_modified(etag)
+
+    result = await db.execute(
+        select(models.Candidate)
         .options(joinedload(models.Candidate.stances))
-        .filter(models.Candidate.id == candidate_id)
-        .first()
+        .where(models.Candidate.id == candidate_id)
     )
+    candidate = result.unique().scalar_one_or_none()
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
-    return get_candidate_response(candidate, db)
+
+    body = dump_json(get_candidate_response(candidate))
+    etag = response_cache.candidate_etag(candidate.id, candidate.last_updated)
+    await response_cache.put(key, etag, body)
+    return response_cache.respond(request, etag, body, "miss")
+
+# Without as_of: a newest-first page of versions and what each changed.
+# With as_of: the candidate's stances as they stood at that time, rebuilt
+# from the nearest keyframe and the deltas after it.
+@router.get("/candidates/{candidate_id}/history", response_model=Union[schemas.HistoryPage, schemas.StancesAsOf])
+async def get_candidate_history(
+    candidate_id: UUID,
+    as_of: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if await db.scalar(select(models.Candidate.id).where(models.Candidate.id == candidate_id)) is None:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+
+    if as_of is not None:
+        # Stored timestamps are naive UTC
+        if as_of.tzinfo is not None:
+            as_of = as_of.astimezone(timezone.utc).replace(tzinfo=None)
+        found = await db.run_sync(versioning.state_as_of, candidate_id, as_of)
+        if found is None:
+            raise HTTPException(status_code=404, detail="No stance history at or before as_of")
+        version, state = found
+        return json_response(schemas.StancesAsOf(
+            candidate_id=candidate_id,
+            as_of=as_of,
+            version=version.version,
+            versioned_at=version.created_at,
+            stance_summary=[schemas.StanceVersion(**state[key]) for key in sorted(state)],
+        ))
+
+    entries, has_more = await db.run_sync(versioning.history_page, candidate_id, limit, offset)
+    return json_response(schemas.HistoryPage(
+        candidate_id=candidate_id,
+        items=[
+            schemas.VersionEntry(version=v.version, created_at=v.created_at, is_keyframe=v.is_keyframe, **changes)
+            for v, changes in entries
+        ],
+        next_offset=offset + limit if has_more else None,
+    ))
 
 @router.delete("/candidates/{candidate_id}", response_model=dict)
-def delete_candidate(candidate_id: UUID, db: Session = Depends(get_db)):
-    candidate = db.query(models.Candidate).filter(models.Candidate.id == candidate_id).first()
+async def delete_candidate(candidate_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    candidate = await db.get(models.Candidate, candidate_id)
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
 
-    db.query(models.Stance).filter(models.Stance.candidate_id == candidate_id).delete()
-    db.delete(candidate)
-    db.commit()
+    await db.execute(delete(models.Stance).where(models.Stance.candidate_id == candidate_id))
+    await db.execute(delete(models.VersionSnapshot).where(models.VersionSnapshot.candidate_id == candidate_id))
+    await db.execute(delete(models.CandidateSource).where(models.CandidateSource.natural_key == candidate.natural_key))
+    await db.delete(candidate)
+    await db.commit()
+    await response_cache.invalidate_candidates(candidate_id)
     return {"message": f"Candidate {candidate_id} deleted."}
 
 @router.delete("/candidates/", response_model=dict)
-def delete_all_candidates(db: Session = Depends(get_db)):
-    db.query(models.Stance).delete()
-    db.query(models.Candidate).delete()
-    db.commit()
+async def delete_all_candidates(db: AsyncSession = Depends(get_async_db)):
+    await db.execute(delete(models.Stance))
+    await db.execute(delete(models.VersionSnapshot))
+    await db.execute(delete(models.CandidateSource))
+    await db.execute(delete(models.Candidate))
+    await db.commit()
+    await response_cache.invalidate_all()
     return {"message": "All candidates deleted."}
 
 # Helper function to build CandidateResponse from ORM
-def get_candidate_response(candidate: models.Candidate, db: Session) -> schemas.CandidateResponse:
-    return schemas.CandidateResponse(
-        id=candidate.id,
-        name=candidate.name,
-        office=candidate.office,
-        party=candidate.party,
-        bio_text=candidate.bio_text,
-        past_positions=candidate.past_positions,
-        district=candidate.district,
-        state=candidate.state,
-        is_incumbent=candidate.is_incumbent,
-        photo_url=candidate.photo_url,
-        social_links=candidate.social_links,
-        age=candidate.age,
-        gender=candidate.gender,
-        race=candidate.race,
-        marital_status=candidate.marital_status,
-        created_at=candidate.created_at,
-        last_updated=candidate.last_updated,
-        stance_summary=[
-            schemas.StanceResponse(
-                issue=s.issue,
-                position=s.position,
-                source_url=s.source_url,
-                created_at=s.created_at
-            )
-            for s in candidate.stances
-        ]
-    )
+def get_candidate_response(candidate: models.Candidate) -> schemas.CandidateResponse:
+    return schemas.CandidateResponse.model_validate(candidate)
+
+# pydantic-core writes JSON bytes directly; model_dump_json would decode them
+# to a str first
+def dump_json(model: BaseModel) -> bytes:
+    return model.__pydantic_serializer__.to_json(model)
+
+# Returning a Response skips FastAPI's second validation against
+# response_model and its jsonable_encoder/json.dumps pass, so the model is
+# validated once and serialized once
+def json_response(model: BaseModel, status_code: int = 200) -> Response:
+    return Response(content=dump_json(model), media_type="application/json", status_code=status_code)
+
+# Natural key used to recognise the same candidate across pipeline runs:
+# lowercased, punctuation-insensitive name + office + state. Must match the
+# SQL backfill in the add_candidate_natural_key migration.
+def natural_key(name: str, office: str, state: Optional[str]) -> str:
+    return "|".join(re.sub(r"[^a-z0-9]+", " ", (part or "").lower()).strip() for part in (name, office, state))
+
+def issue_key(issue: str) -> str:
+    return " ".join(issue.lower().split())
+
+# Writes only the stances that differ from what is stored, matching by issue.
+# Returns (inserted, updated, deleted) counts.
+def sync_stances(db: Session, candidate_id: UUID, incoming: list[schemas.StanceInput], now: datetime) -> tuple[int, int, int]:
+    existing = {}
+    duplicates = []
+    for s in db.query(models.Stance).filter(models.Stance.candidate_id == candidate_id):
+        if issue_key(s.issue) in existing:
+            duplicates.append(s)
+        else:
+            existing[issue_key(s.issue)] = s
+    wanted = {issue_key(s.issue): s for s in incoming}
+    aliases = issues.alias_map(db)
+
+    inserted = updated = 0
+    for key, stance in wanted.items():
+        current = existing.get(key)
+        issue_id = issues.resolve_issue(stance.issue, aliases)
+        if current is None:
+            db.add(models.Stance(
+                id=uuid.uuid4(),
+                candidate_id=candidate_id,
+                issue=stance.issue,
+                issue_id=issue_id,
+                position=stance.position,
+                source_url=stance.source_url,
+                is_stale=stance.is_stale,
+                created_at=now,
+            ))
+            inserted += 1
+        elif (current.issue, current.issue_id, current.position, current.source_url, current.is_stale) != (
+            stance.issue, issue_id, stance.position, stance.source_url, stance.is_stale
+        ):
+            # issue_id also catches stances written before a new alias was added
+            current.issue = stance.issue
+            current.issue_id = issue_id
+            current.position = stance.position
+            current.source_url = stance.source_url
+            current.is_stale = stance.is_stale
+            updated += 1
+
+    removed = duplicates + [s for key, s in existing.items() if key not in wanted]
+    for stance in removed:
+        db.delete(stance)
+    return inserted, updated, len(removed)
+
+def candidate_row(candidate: schemas.CandidateCreate, candidate_id: UUID, now: datetime) -> dict:
+    return {
+        "id": candidate_id,
+        "natural_key": natural_key(candidate.name, candidate.office, candidate.state),
+        "name": candidate.name,
+        "office": candidate.office,
+        "party": candidate.party.model_dump() if candidate.party else None,
+        "bio_text": candidate.bio_text.model_dump() if candidate.bio_text else None,
+        "past_positions": [p.model_dump() for p in candidate.past_positions] if candidate.past_positions else None,
+        "district": candidate.district,
+        "state": candidate.state,
+        "is_incumbent": candidate.is_incumbent,
+        "photo_url": candidate.photo_url,
+        "social_links": candidate.social_links,
+        "age": candidate.age,
+        "gender": candidate.gender,
+        "race": candidate.race,
+        "marital_status": candidate.marital_status,
+        "created_at": now,
+        "last_updated": now,
+    }
+
+def stance_rows(candidate: schemas.CandidateCreate, candidate_id: UUID, now: datetime, aliases: dict[str, str]) -> list[dict]:
+    return [
+        {
+            "id": uuid.uuid4(),
+            "candidate_id": candidate_id,
+            "issue": stance.issue,
+            "issue_id": issues.resolve_issue(stance.issue, aliases),
+            "position": stance.position,
+            "source_url": stance.source_url,
+            "is_stale": stance.is_stale,
+            "created_at": now,
+        }
+        for stance in candidate.stance_summary
+    ]
+
+# executemany-style inserts are batched by SQLAlchemy into multi-row
+# INSERT ... VALUES statements (insertmanyvalues)
+def insert_rows(db: Session, candidates: list[dict], stances: list[dict], versions: list[dict]):
+    if candidates:
+        db.execute(insert(models.Candidate), candidates)
+    if stances:
+        db.execute(insert(models.Stance), stances)
+    if versions:
+        db.execute(insert(models.VersionSnapshot), versions)
+
+# Stance rows (or dicts shaped like them) as a versioning state, keyed the
+# way sync_stances matches stances
+def stance_state(stances: list[dict]) -> dict:
+    return {issue_key(s["issue"]): {field: s.get(field) for field in versioning.STANCE_FIELDS} for s in stances}
+
+def format_validation_error(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+
+def parse_fields(fields: Optional[str]) -> Optional[set[str]]:
+    if not fields:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - CANDIDATE_LIST_FIELDS
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested
+
+async def load_stances(db: AsyncSession, candidate_ids: list) -> dict:
+    stances_by_candidate = {}
+    if not candidate_ids:
+        return stances_by_candidate
+    stances = await db.scalars(select(models.Stance).where(models.Stance.candidate_id.in_(candidate_ids)))
+    for s in stances:
+        stances_by_candidate.setdefault(s.candidate_id, []).append(schemas.StanceResponse.model_validate(s))
+    return stances_by_candidate
+
+# Cursors are opaque to clients: base64 of "<created_at iso>|<id>"
+def encode_cursor(row) -> str:
+    raw = f"{row.created_at.isoformat()}|{row.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, candidate_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(candidate_id)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
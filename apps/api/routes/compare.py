@@ -0,0 +1,115 @@
+# apps/api/routes/compare.py
+
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session, selectinload
+from typing import Optional
+from uuid import UUID
+
+from db import get_db
+from routes.candidates import issue_key, json_response
+import models
+import schemas
+
+router = APIRouter()
+
+MAX_COMPARE = 10
+
+# Candidates plus their stances (and each stance's canonical issue label) in
+# one SELECT for the candidates and one selectin SELECT for the stances,
+# however many candidates there are
+def comparison_query(db: Session):
+    return db.query(models.Candidate).options(
+        selectinload(models.Candidate.stances).joinedload(models.Stance.canonical_issue)
+    )
+
+@router.get("/compare", response_model=schemas.ComparisonResponse)
+def compare_candidates(ids: str = Query(..., description="Comma-separated candidate ids"), db: Session = Depends(get_db)):
+    candidate_ids = parse_ids(ids)
+    found = {c.id: c for c in comparison_query(db).filter(models.Candidate.id.in_(candidate_ids))}
+    missing = [str(i) for i in candidate_ids if i not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Candidates not found: {', '.join(missing)}")
+    return json_response(build_comparison([found[i] for i in candidate_ids]))
+
+# Everyone running for one office in one state, incumbents first
+@router.get("/races/{state}/{office}", response_model=schemas.ComparisonResponse)
+def get_race(
+    state: str,
+    office: str,
+    district: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    query = comparison_query(db).filter(models.Candidate.state == state, models.Candidate.office == office)
+    if district is not None:
+        query = query.filter(models.Candidate.district == district)
+    candidates = (
+        query.order_by(models.Candidate.is_incumbent.desc().nulls_last(), models.Candidate.name, models.Candidate.id)
+        .limit(limit)
+        .all()
+    )
+    if not candidates:
+        raise HTTPException(status_code=404, detail="No candidates found for this race")
+    return json_response(build_comparison(candidates))
+
+# Unique ids in the order given, so the response columns follow the request
+def parse_ids(ids: str) -> list[UUID]:
+    parsed = []
+    for raw in ids.split(","):
+        if not raw.strip():
+            continue
+        try:
+            candidate_id = UUID(raw.strip())
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid candidate id: {raw.strip()}")
+        if candidate_id not in parsed:
+            parsed.append(candidate_id)
+    if not parsed:
+        raise HTTPException(status_code=400, detail="ids must list at least one candidate")
+    if len(parsed) > MAX_COMPARE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_COMPARE} candidates can be compared")
+    return parsed
+
+# Aligns stances into one row per issue. Stances share a row when they map to
+# the same canonical issue, or, without one, when their issue text matches
+# (ignoring case and spacing). A candidate's second stance on a canonical
+# issue keeps a row of its own rather than being dropped. Issues most of the
+# candidates speak to come first.
+#
+# Stances are visited newest first, so when a candidate has two stances with
+# the same issue text (rows from before upserts deduplicated them), the
+# newest one is shown and the older one is left out.
+def build_comparison(candidates: list[models.Candidate]) -> schemas.ComparisonResponse:
+    rows: dict[tuple, schemas.ComparisonIssue] = {}
+    for column, candidate in enumerate(candidates):
+        newest_first = sorted(
+            candidate.stances,
+            key=lambda s: (s.created_at or datetime.min, s.issue, str(s.id)),
+            reverse=True,
+        )
+        for stance in newest_first:
+            key = ("issue", stance.issue_id) if stance.issue_id else ("text", issue_key(stance.issue))
+            row = rows.get(key)
+            if row is not None and row.positions[column] is not None:
+                key = ("text", issue_key(stance.issue))
+                row = rows.get(key)
+            if row is None:
+                row = rows[key] = schemas.ComparisonIssue(
+                    issue_id=key[1] if key[0] == "issue" else None,
+                    label=stance.canonical_issue.label if key[0] == "issue" else stance.issue,
+                    positions=[None] * len(candidates),
+                )
+            if row.positions[column] is None:
+                row.positions[column] = schemas.ComparisonPosition(
+                    issue=stance.issue,
+                    position=stance.position,
+                    source_url=stance.source_url,
+                    is_stale=stance.is_stale,
+                )
+
+    issues = sorted(rows.values(), key=lambda r: (-sum(p is not None for p in r.positions), r.label.lower()))
+    return schemas.ComparisonResponse(
+        candidates=[schemas.ComparisonCandidate.model_validate(c) for c in candidates],
+        issues=issues,
+    )
@@ -0,0 +1,94 @@
+# apps/api/routes/export.py
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Literal
+from uuid import UUID
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from db import SessionLocal
+import models
+
+router = APIRouter()
+
+# Rows fetched per round-trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_TABLES = {
+    "candidates": models.Candidate.__table__,
+    "stances": models.Stance.__table__,
+}
+
+# Generated columns (the search tsvectors) are derived data, not exported
+def export_columns(table) -> list:
+    return [c for c in table.columns if c.computed is None]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+@router.get("/export/{table}")
+def export_table(table: Literal["candidates", "stances"], format: Literal["ndjson", "csv"] = "ndjson"):
+    writer = write_ndjson if format == "ndjson" else write_csv
+    return StreamingResponse(
+        writer(EXPORT_TABLES[table]),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'},
+    )
+
+def stream_batches(table):
+    # Open the session here rather than through get_db: dependency cleanup
+    # runs before a StreamingResponse body is sent.
+    db = SessionLocal()
+    try:
+        # No ORDER BY: a plain sequential scan starts returning rows
+        # immediately, where a sort would have to read the whole table first.
+        result = db.execute(
+            select(*export_columns(table)),
+            execution_options={"yield_per": EXPORT_BATCH_SIZE},
+        )
+        for batch in result.mappings().partitions():
+            yield batch
+    finally:
+        db.close()
+
+def write_ndjson(table):
+    for batch in stream_batches(table):
+        yield "".join(json.dumps(dict(row), default=encode_value) + "\n" for row in batch)
+
+def write_csv(table):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    columns = [c.name for c in export_columns(table)]
+
+    writer.writerow(columns)
+    yield pop_buffer(buffer)
+
+    for batch in stream_batches(table):
+        writer.writerows([[csv_value(row[c]) for c in columns] for row in batch])
+        yield pop_buffer(buffer)
+
+def pop_buffer(buffer: io.StringIO) -> str:
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate(0)
+    return data
+
+def encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Cannot export value of type {type(value).__name__}")
+
+def csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return encode_value(value) if isinstance(value, (datetime, UUID)) else value
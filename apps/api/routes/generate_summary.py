@@ -1,21 +1,50 @@
 # apps/api/routes/generate_summary.py
 
+import asyncio
+import contextvars
 import re
 import json
+import logging
 import os
-from fastapi import APIRouter, HTTPException
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Union
-from openai import OpenAI
-from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+from typing import List, Literal, Optional, Dict, Union
 
-load_dotenv()
+from db import SessionLocal, get_db
+from llm_gateway import DEFAULT_MODEL, gateway, metered
+from routes.candidates import natural_key
+import source_tracking
+import summary_cache
+import summary_jobs
 
-client = OpenAI(
-    base_url=os.getenv("OPENAI_BASE_URL"),
-    api_key=os.getenv("OPENAI_API_KEY")
+logger = logging.getLogger("generate_summary")
+
+# LLM_MODEL; also part of every summary cache key, so changing it starts fresh
+SUMMARY_MODEL = DEFAULT_MODEL
+
+# Parallel per-block extractions in map_reduce mode
+MAP_CONCURRENCY = int(os.getenv("SUMMARY_MAP_CONCURRENCY", "8"))
+
+OUTPUT_FORMAT = (
+    "{\n"
+    '  "party": {"value": "...", "source_url": "..."},\n'
+    '  "past_positions": [{"value": "...", "source_url": "..."}],\n'
+    '  "stance_summary": [{"value": {"issue": "...", "position": "..."}, "source_url": "..."}]\n'
+    "}"
 )
 
+JOB_EVENT_POLL_SECONDS = 0.25
+
+EMPTY_SUMMARY = {
+    "party": {"value": "Unknown", "source_url": ""},
+    "past_positions": [],
+    "stance_summary": []
+}
+
 router = APIRouter()
 
 class IssueStance(BaseModel):
@@ -25,6 +54,8 @@ class IssueStance(BaseModel):
 class SourcedStance(BaseModel):
     value: IssueStance
     source_url: str
+    # Only found in sources that have since disappeared (refresh only)
+    stale: bool = False
 
 class SourcedStr(BaseModel):
     value: str
@@ -37,6 +68,8 @@ class SourceBlock(BaseModel):
 class CandidateRequest(BaseModel):
     name: str
     office: str
+    # Only used by /generate-summary/refresh, to identify the candidate
+    state: Optional[str] = None
     sources: Dict[str, Union[SourceBlock, List[SourceBlock]]]
 
 class SummaryResponse(BaseModel):
@@ -44,8 +77,161 @@ class SummaryResponse(BaseModel):
     past_positions: List[SourcedStr]
     stance_summary: List[SourcedStance]
 
+class JobStatus(BaseModel):
+    id: str
+    status: Literal["queued", "running", "done", "failed"]
+    done_blocks: int
+    total_blocks: int
+    result: Optional[SummaryResponse] = None
+    error: Optional[Union[str, dict]] = None
+
+# mode=incremental feeds blocks one at a time through a single growing
+# conversation. mode=map_reduce extracts each block independently and in
+# parallel, then merges the results by issue: tokens grow linearly with the
+# number of blocks and wall time stays close to one round-trip.
 @router.post("/generate-summary", response_model=SummaryResponse)
-def generate_summary(req: CandidateRequest):
+def generate_summary(
+    req: CandidateRequest,
+    response: Response,
+    mode: Literal["incremental", "map_reduce"] = "incremental",
+    no_cache: bool = False,
+    x_pipeline_run: Optional[str] = Header(default=None),
+    db: Session = Depends(get_db),
+):
+    # Callers tag requests with X-Pipeline-Run so gateway usage can be
+    # aggregated per run; this request's own usage is echoed back in headers.
+    with metered(candidate=req.name, run=x_pipeline_run) as usage:
+        parsed, cache_hit = build_summary(req, mode, no_cache, db)
+    response.headers["X-Summary-Cache"] = "hit" if cache_hit else "miss"
+    set_usage_headers(response, usage)
+    return parsed
+
+# Stateful map_reduce for scheduled refreshes of a known candidate (matched
+# by name, office and state). Only sources that are new or whose text changed
+# since the previous refresh go to the model; see refresh_summary_sources.
+# X-Sources-New/-Changed/-Unchanged/-Gone report the comparison.
+@router.post("/generate-summary/refresh", response_model=SummaryResponse)
+def refresh_summary(
+    req: CandidateRequest,
+    response: Response,
+    x_pipeline_run: Optional[str] = Header(default=None),
+    db: Session = Depends(get_db),
+):
+    with metered(candidate=req.name, run=x_pipeline_run) as usage:
+        parsed, counts = refresh_summary_sources(req, db)
+    for kind, count in counts.items():
+        response.headers[f"X-Sources-{kind.capitalize()}"] = str(count)
+    set_usage_headers(response, usage)
+    return parsed
+
+def set_usage_headers(response: Response, usage):
+    response.headers["X-LLM-Calls"] = str(usage.calls)
+    response.headers["X-LLM-Cache-Hits"] = str(usage.cache_hits)
+    response.headers["X-LLM-Prompt-Tokens"] = str(usage.prompt_tokens)
+    response.headers["X-LLM-Completion-Tokens"] = str(usage.completion_tokens)
+
+# Job mode: the summary runs on the summary_jobs worker pool. Poll
+# GET /generate-summary/jobs/{id} or stream its /events for per-block progress.
+@router.post("/generate-summary/jobs", response_model=JobStatus, status_code=202)
+def submit_summary_job(
+    req: CandidateRequest,
+    mode: Literal["incremental", "map_reduce"] = "incremental",
+    no_cache: bool = False,
+):
+    def work(job: summary_jobs.SummaryJob) -> dict:
+        db = SessionLocal()
+        try:
+            with metered(candidate=req.name, job=job.id):
+                parsed, _ = build_summary(req, mode, no_cache, db, on_progress=job.emit)
+            return parsed
+        finally:
+            db.close()
+
+    try:
+        job = summary_jobs.queue.submit(work)
+    except summary_jobs.QueueFull:
+        raise HTTPException(status_code=503, detail="Summary queue is full, retry later")
+    return job_status(job)
+
+@router.get("/generate-summary/jobs/{job_id}", response_model=JobStatus)
+def get_summary_job(job_id: str):
+    return job_status(get_job_or_404(job_id))
+
+# Resume after a dropped connection from the event after the last one the
+# client saw; a missing, malformed or negative Last-Event-ID starts over
+def resume_index(last_event_id: Optional[str]) -> int:
+    try:
+        return max(int(last_event_id) + 1, 0) if last_event_id is not None else 0
+    except ValueError:
+        return 0
+
+@router.get("/generate-summary/jobs/{job_id}/events")
+async def stream_summary_job(job_id: str, request: Request):
+    job = get_job_or_404(job_id)
+    start = resume_index(request.headers.get("Last-Event-ID"))
+
+    async def event_stream():
+        index = start
+        while True:
+            for event in job.events_since(index):
+                yield f"id: {index}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                index += 1
+            if job.finished and index >= len(job.events):
+                return
+            if await request.is_disconnected():
+                return
+            await asyncio.sleep(JOB_EVENT_POLL_SECONDS)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+def get_job_or_404(job_id: str) -> summary_jobs.SummaryJob:
+    job = summary_jobs.queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def job_status(job: summary_jobs.SummaryJob) -> JobStatus:
+    return JobStatus(
+        id=job.id,
+        status=job.status,
+        done_blocks=job.done_blocks,
+        total_blocks=job.total_blocks,
+        result=job.result,
+        error=job.error,
+    )
+
+# Returns (summary, served_from_cache). on_progress, if given, receives a
+# {"type": "block", ...} event as each source block is processed.
+def build_summary(req: CandidateRequest, mode: str, no_cache: bool, db: Session, on_progress=None) -> tuple[dict, bool]:
+    on_progress = on_progress or (lambda event: None)
+    labeled_blocks = flatten_blocks(req)
+    block_keys = [(label, block.url, block.text) for label, block in labeled_blocks]
+    base = summary_cache.base_key(SUMMARY_MODEL, req.name, req.office)
+    key = summary_cache.summary_key(base, block_keys, mode)
+
+    # no_cache skips lookups but still refreshes the cache with the new result
+    if not no_cache:
+        cached = summary_cache.get(db, key)
+        if cached is not None:
+            gateway.record_cache_hit("summary")
+            return cached, True
+
+    if mode == "map_reduce":
+        parsed, complete = summarize_map_reduce(req, labeled_blocks, base, no_cache, db, on_progress)
+    else:
+        parsed, complete = summarize_incremental(req, labeled_blocks, base, no_cache, db, on_progress), True
+
+    # A summary missing a failed block is returned but not cached, so the
+    # next request retries that block instead of reusing the gap
+    if complete:
+        summary_cache.put(db, key, "summary", parsed)
+    summary_cache.prune(db)
+    return parsed, False
+
+def progress_event(label: str, block: SourceBlock, done: int, total: int, cached: bool) -> dict:
+    return {"type": "block", "label": label, "url": block.url, "done": done, "total": total, "cached": cached}
+
+def summarize_incremental(req: CandidateRequest, labeled_blocks: list, base: str, no_cache: bool, db: Session, on_progress) -> dict:
     messages = [
         {
             "role": "system",
@@ -59,11 +245,7 @@ def generate_summary(req: CandidateRequest):
                 "Only use information explicitly found in the source. "
                 "If no info is found, return the prior state unchanged. "
                 "Each time, return ONLY valid JSON with this format:\n"
-                "{\n"
-                '  "party": {"value": "...", "source_url": "..."},\n'
-                '  "past_positions": [{"value": "...", "source_url": "..."}],\n'
-                '  "stance_summary": [{"value": {"issue": "...", "position": "..."}, "source_url": "..."}]\n'
-                "}"
+                + OUTPUT_FORMAT
             )
         },
         {
@@ -72,47 +254,37 @@ def generate_summary(req: CandidateRequest):
         },
         {
             "role": "assistant",
-            "content": json.dumps({
-                "party": {"value": "Unknown", "source_url": ""},
-                "past_positions": [],
-                "stance_summary": []
-            })
+            "content": json.dumps(EMPTY_SUMMARY)
         }
     ]
 
-    # Flatten all sources into labeled blocks
-    labeled_blocks = []
-    for source_type, entries in req.sources.items():
-        if isinstance(entries, dict):
-            labeled_blocks.append((source_type.upper(), entries))
-        elif isinstance(entries, list):
-            for i, entry in enumerate(entries):
-                labeled_blocks.append((f"{source_type.upper()} {i+1}", entry))
+    # Each turn's reply is cached under a key covering every block so far, so
+    # a request that shares a prefix of blocks with an earlier one replays
+    # those turns from the cache and only calls the model for the rest.
+    keys = summary_cache.turn_keys(base, [(label, block.url, block.text) for label, block in labeled_blocks])
+    cached_turns = {} if no_cache else summary_cache.get_many(db, keys)
+    replaying = True
 
     # Feed each block incrementally
-    for label, block in labeled_blocks:
-        block_text = f"[{label}] ({block.url})\n{block.text}"
-        messages.append({"role": "user", "content": block_text})
-
-        response = client.chat.completions.create(
-            model="meta/llama-3.3-70b-instruct",
-            messages=messages,
-            temperature=0.4
-        )
-        reply = response.choices[0].message.content.strip()
+    for (label, block), turn_key in zip(labeled_blocks, keys):
+        messages.append({"role": "user", "content": block_prompt(label, block)})
+
+        replaying = replaying and turn_key in cached_turns
+        if replaying:
+            reply = cached_turns[turn_key]
+            gateway.record_cache_hit("turn")
+        else:
+            reply = gateway.chat(messages, model=SUMMARY_MODEL, temperature=0.4)
+            summary_cache.put(db, turn_key, "turn", reply)
         messages.append({"role": "assistant", "content": reply})
+        on_progress(progress_event(label, block, len(messages) // 2 - 1, len(labeled_blocks), replaying))
 
 
     # Parse final response
     final_response = messages[-1]["content"]
 
     try:
-        json_text = re.search(r"```(?:json)?\n(.*?)```", final_response, re.DOTALL)
-        if json_text:
-            parsed = json.loads(json_text.group(1))
-        else:
-            parsed = json.loads(final_response)
-        return parsed
+        return parse_summary(final_response)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -123,3 +295,203 @@ def generate_summary(req: CandidateRequest):
             }
         )
 
+# Returns (summary, whether every block was extracted)
+def summarize_map_reduce(req: CandidateRequest, labeled_blocks: list, base: str, no_cache: bool, db: Session, on_progress) -> tuple[dict, bool]:
+    # Block results are keyed on the block itself, not its position, so they
+    # are reused even when sources are added, removed or reordered.
+    keys = [summary_cache.block_key(base, block.url, block.text) for _, block in labeled_blocks]
+    extractions = {} if no_cache else summary_cache.get_many(db, keys)
+
+    done = 0
+    missing = []
+    for i, (label, block) in enumerate(labeled_blocks):
+        if keys[i] in extractions:
+            gateway.record_cache_hit("block")
+            done += 1
+            on_progress(progress_event(label, block, done, len(labeled_blocks), True))
+        else:
+            missing.append(i)
+
+    for i, extraction in extract_concurrently(req, [(i, *labeled_blocks[i]) for i in missing]):
+        if extraction is not None:
+            extractions[keys[i]] = extraction
+            summary_cache.put(db, keys[i], "block", extraction)
+        done += 1
+        on_progress(progress_event(*labeled_blocks[i], done, len(labeled_blocks), False))
+
+    merged = merge_extractions([
+        (label, block, extractions[key])
+        for (label, block), key in zip(labeled_blocks, keys)
+        if key in extractions
+    ])
+    return merged, all(key in extractions for key in keys)
+
+# Runs extract_block for each (index, label, block) on MAP_CONCURRENCY
+# threads and yields (index, extraction) as they finish. The session is not
+# thread-safe: workers only call the model, so callers write the cache back
+# on their own thread. Each worker runs in a copy of this context so gateway
+# usage is still metered to the calling request.
+def extract_concurrently(req: CandidateRequest, items: list[tuple[int, str, SourceBlock]]):
+    if not items:
+        return
+    with ThreadPoolExecutor(max_workers=MAP_CONCURRENCY) as pool:
+        futures = {
+            pool.submit(contextvars.copy_context().run, extract_block, req, label, block): i
+            for i, label, block in items
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+# Returns (summary, counts of new/changed/unchanged/gone sources). Unchanged
+# sources reuse the extraction stored by the previous refresh; new and
+# changed ones are looked up in the block cache, then sent to the model; a
+# changed source that fails to extract falls back to its stored extraction.
+# Stances only found in sources that have disappeared are kept, marked stale.
+def refresh_summary_sources(req: CandidateRequest, db: Session) -> tuple[dict, dict]:
+    labeled_blocks = []
+    seen_urls = set()
+    for label, block in flatten_blocks(req):
+        if block.url not in seen_urls:
+            seen_urls.add(block.url)
+            labeled_blocks.append((label, block))
+
+    base = summary_cache.base_key(SUMMARY_MODEL, req.name, req.office)
+    candidate_key = natural_key(req.name, req.office, req.state)
+    fingerprints = [source_tracking.fingerprint(base, block.text) for _, block in labeled_blocks]
+    stored = source_tracking.load(db, candidate_key)
+    changes = source_tracking.diff(stored, [block.url for _, block in labeled_blocks], fingerprints)
+
+    # Read what is needed from the stored rows before any commit expires them
+    extractions = {i: stored[labeled_blocks[i][1].url].extraction for i in changes.unchanged}
+    previous = {i: stored[labeled_blocks[i][1].url].extraction for i in changes.changed}
+    stale_sources = [(row.label, row.url, row.extraction) for row in changes.gone if row.extraction]
+
+    pending = changes.new + changes.changed
+    keys = {i: summary_cache.block_key(base, labeled_blocks[i][1].url, labeled_blocks[i][1].text) for i in pending}
+    cached = summary_cache.get_many(db, list(keys.values()))
+    fresh = {}
+    for i in pending:
+        if keys[i] in cached:
+            gateway.record_cache_hit("block")
+            fresh[i] = cached[keys[i]]
+    for i, extraction in extract_concurrently(req, [(i, *labeled_blocks[i]) for i in pending if i not in fresh]):
+        fresh[i] = extraction
+        if extraction is not None:
+            summary_cache.put(db, keys[i], "block", extraction)
+    extractions.update(fresh)
+    # A changed source whose re-extraction failed keeps its previous
+    # extraction; dropping it would have the upsert delete its stances
+    for i in changes.changed:
+        if extractions.get(i) is None:
+            extractions[i] = previous[i]
+
+    merged = merge_extractions([
+        (label, block, extractions[i])
+        for i, (label, block) in enumerate(labeled_blocks)
+        if extractions.get(i) is not None
+    ])
+    add_stale_stances(merged, stale_sources)
+    # As in build_summary, nothing is recorded when a block failed: the next
+    # refresh sees the same sources as new or changed and retries them, with
+    # the ones that did succeed served from the block cache
+    if all(extraction is not None for extraction in fresh.values()):
+        source_tracking.save(
+            db, candidate_key, [(label, block.url) for label, block in labeled_blocks], fingerprints, fresh, datetime.utcnow()
+        )
+    return merged, changes.counts()
+
+def extract_block(req: CandidateRequest, label: str, block: SourceBlock) -> Optional[dict]:
+    reply = gateway.chat(
+        model=SUMMARY_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": (
+                    "You are an assistant that extracts political candidate information from a single source. "
+                    f"Candidate: {req.name}, Office: {req.office}. "
+                    "Extract the party affiliation, past positions and issue stances stated in the source, "
+                    f"using {block.url} as the source_url. "
+                    "Only use information explicitly found in the source. "
+                    'If the party is not stated, use "Unknown"; if nothing else is found, use empty lists. '
+                    "Return ONLY valid JSON with this format:\n"
+                    + OUTPUT_FORMAT
+                )
+            },
+            {"role": "user", "content": block_prompt(label, block)}
+        ],
+        temperature=0.2
+    )
+    try:
+        return parse_summary(reply)
+    except Exception as e:
+        # One unparseable block should not sink the whole summary
+        logger.warning("Could not parse extraction for %s: %s", block.url, e)
+        return None
+
+# Official pages outrank Ballotpedia, which outranks news; ties keep source order
+def source_priority(label: str) -> int:
+    if label.startswith("OFFICIAL"):
+        return 0
+    if label.startswith("BALLOTPEDIA"):
+        return 1
+    return 2
+
+# Deterministic reduce step: for each issue (and each past position) keep the
+# entry from the highest-priority source that mentions it.
+def merge_extractions(extractions: list[tuple[str, SourceBlock, dict]]) -> dict:
+    merged = {"party": dict(EMPTY_SUMMARY["party"]), "past_positions": [], "stance_summary": []}
+    seen_positions = set()
+    seen_issues = set()
+
+    ordered = sorted(enumerate(extractions), key=lambda item: (source_priority(item[1][0]), item[0]))
+    for _, (label, block, extraction) in ordered:
+        party = extraction["party"]
+        if merged["party"]["value"] == "Unknown" and party["value"].strip() and party["value"] != "Unknown":
+            merged["party"] = {"value": party["value"], "source_url": party["source_url"] or block.url}
+
+        for position in extraction["past_positions"]:
+            key = " ".join(position["value"].lower().split())
+            if key and key not in seen_positions:
+                seen_positions.add(key)
+                merged["past_positions"].append({"value": position["value"], "source_url": position["source_url"] or block.url})
+
+        for stance in extraction["stance_summary"]:
+            key = " ".join(stance["value"]["issue"].lower().split())
+            if key and key not in seen_issues:
+                seen_issues.add(key)
+                merged["stance_summary"].append({"value": stance["value"], "source_url": stance["source_url"] or block.url, "stale": False})
+
+    return merged
+
+# Appends stances from disappeared sources, given as (label, url, extraction),
+# for issues no current source covers; marked stale, best source first
+def add_stale_stances(merged: dict, stale_sources: list[tuple[str, str, dict]]):
+    seen_issues = {" ".join(s["value"]["issue"].lower().split()) for s in merged["stance_summary"]}
+    for label, url, extraction in sorted(stale_sources, key=lambda source: source_priority(source[0])):
+        for stance in extraction["stance_summary"]:
+            key = " ".join(stance["value"]["issue"].lower().split())
+            if key and key not in seen_issues:
+                seen_issues.add(key)
+                merged["stance_summary"].append({"value": stance["value"], "source_url": stance["source_url"] or url, "stale": True})
+
+def block_prompt(label: str, block: SourceBlock) -> str:
+    return f"[{label}] ({block.url})\n{block.text}"
+
+def parse_summary(text: str) -> dict:
+    json_text = re.search(r"```(?:json)?\n(.*?)```", text, re.DOTALL)
+    if json_text:
+        parsed = json.loads(json_text.group(1))
+    else:
+        parsed = json.loads(text)
+    return SummaryResponse.model_validate(parsed).model_dump()
+
+# Flatten all sources into labeled blocks
+def flatten_blocks(req: CandidateRequest) -> list[tuple[str, SourceBlock]]:
+    labeled_blocks = []
+    for source_type, entries in req.sources.items():
+        if isinstance(entries, SourceBlock):
+            labeled_blocks.append((source_type.upper(), entries))
+        elif isinstance(entries, list):
+            for i, entry in enumerate(entries):
+                labeled_blocks.append((f"{source_type.upper()} {i+1}", entry))
+    return labeled_blocks
@@ -0,0 +1,65 @@
+# apps/api/routes/issues.py
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from db import get_db
+import issues
+import models
+import schemas
+
+router = APIRouter()
+
+@router.get("/issues", response_model=List[schemas.IssueResponse])
+def list_issues(db: Session = Depends(get_db)):
+    return [schemas.IssueResponse(id=i.id, label=i.label) for i in db.query(models.Issue).order_by(models.Issue.label)]
+
+# Every candidate's stance on one canonical issue, in a single query over
+# ix_stances_issue_id_candidate_id. {issue} may be the issue id or any alias.
+@router.get("/issues/{issue}/stances", response_model=schemas.IssueStancesPage)
+def get_issue_stances(
+    issue: str,
+    state: Optional[str] = None,
+    office: Optional[str] = None,
+    district: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    found = issues.lookup_issue(db, issue)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Issue not found")
+
+    query = (
+        db.query(
+            models.Stance.id.label("stance_id"),
+            models.Stance.issue,
+            models.Stance.position,
+            models.Stance.source_url,
+            models.Stance.is_stale,
+            models.Candidate.id.label("candidate_id"),
+            models.Candidate.name,
+            models.Candidate.office,
+            models.Candidate.state,
+            models.Candidate.district,
+            models.Candidate.party,
+            models.Candidate.is_incumbent,
+        )
+        .join(models.Candidate, models.Candidate.id == models.Stance.candidate_id)
+        .filter(models.Stance.issue_id == found.id)
+    )
+    if state:
+        query = query.filter(models.Candidate.state == state)
+    if office:
+        query = query.filter(models.Candidate.office == office)
+    if district:
+        query = query.filter(models.Candidate.district == district)
+
+    rows = query.order_by(models.Candidate.name, models.Stance.id).offset(offset).limit(limit + 1).all()
+    next_offset = offset + limit if len(rows) > limit else None
+    return schemas.IssueStancesPage(
+        issue=schemas.IssueResponse(id=found.id, label=found.label),
+        items=[schemas.IssueStanceItem(**row._mapping) for row in rows[:limit]],
+        next_offset=next_offset,
+    )
@@ -0,0 +1,120 @@
+# apps/api/routes/search.py
+
+import html
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, literal, null, select, union_all
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+from typing import Literal, Optional
+
+from db import get_db
+import models
+import schemas
+
+router = APIRouter()
+
+SEARCH_CONFIG = "english"
+MAX_SEARCH_OFFSET = 10000
+
+# ts_headline wraps matches in these; they are swapped for <mark> after the
+# excerpt has been HTML-escaped, since ts_headline does no escaping itself
+MATCH_START, MATCH_STOP = "{{{", "}}}"
+HEADLINE_OPTIONS = f'StartSel="{MATCH_START}", StopSel="{MATCH_STOP}", MaxWords=35, MinWords=15, MaxFragments=2'
+
+# Ranked full-text search over candidates (name, office, bio) and stances
+# (issue, position), using the generated search_vector columns and their GIN
+# indexes. q accepts web-search syntax: quoted phrases, OR, -excluded.
+@router.get("/search", response_model=schemas.SearchPage)
+def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: Literal["all", "candidates", "stances"] = Query("all", alias="type"),
+    state: Optional[str] = None,
+    office: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=MAX_SEARCH_OFFSET),
+    db: Session = Depends(get_db),
+):
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+
+    ranked = []
+    if kind in ("all", "candidates"):
+        ranked.append(filter_candidates(
+            select(
+                literal("candidate").label("kind"),
+                models.Candidate.id.label("candidate_id"),
+                null().cast(PG_UUID(as_uuid=True)).label("stance_id"),
+                func.ts_rank_cd(models.Candidate.search_vector, tsquery).label("rank"),
+            ).where(models.Candidate.search_vector.op("@@")(tsquery)),
+            state, office,
+        ))
+    if kind in ("all", "stances"):
+        ranked.append(filter_candidates(
+            select(
+                literal("stance").label("kind"),
+                models.Stance.candidate_id,
+                models.Stance.id.label("stance_id"),
+                func.ts_rank_cd(models.Stance.search_vector, tsquery).label("rank"),
+            )
+            .join(models.Candidate, models.Candidate.id == models.Stance.candidate_id)
+            .where(models.Stance.search_vector.op("@@")(tsquery)),
+            state, office,
+        ))
+
+    # Rank and page on ids alone; excerpts are only built for the rows returned
+    hits = union_all(*ranked).subquery() if len(ranked) > 1 else ranked[0].subquery()
+    page = db.execute(
+        select(hits)
+        .order_by(hits.c.rank.desc(), hits.c.candidate_id, hits.c.stance_id)
+        .offset(offset)
+        .limit(limit + 1)
+    ).all()
+    next_offset = offset + limit if len(page) > limit else None
+    page = page[:limit]
+
+    candidates = {
+        row.id: row for row in db.execute(
+            select(
+                models.Candidate.id,
+                models.Candidate.name,
+                models.Candidate.office,
+                models.Candidate.state,
+                headline(func.coalesce(func.nullif(models.Candidate.bio_text["value"].astext, ""), models.Candidate.name), tsquery),
+            ).where(models.Candidate.id.in_({hit.candidate_id for hit in page}))
+        )
+    } if page else {}
+    stances = {
+        row.id: row for row in db.execute(
+            select(models.Stance.id, models.Stance.issue, headline(models.Stance.position, tsquery))
+            .where(models.Stance.id.in_({hit.stance_id for hit in page if hit.stance_id}))
+        )
+    } if any(hit.stance_id for hit in page) else {}
+
+    items = []
+    for hit in page:
+        candidate = candidates[hit.candidate_id]
+        stance = stances.get(hit.stance_id)
+        items.append(schemas.SearchHit(
+            kind=hit.kind,
+            candidate_id=hit.candidate_id,
+            name=candidate.name,
+            office=candidate.office,
+            state=candidate.state,
+            stance_id=hit.stance_id,
+            issue=stance.issue if stance else None,
+            rank=hit.rank,
+            headline=mark_matches(stance.headline if stance else candidate.headline),
+        ))
+    return schemas.SearchPage(items=items, next_offset=next_offset)
+
+def filter_candidates(query, state: Optional[str], office: Optional[str]):
+    if state is not None:
+        query = query.where(models.Candidate.state == state)
+    if office is not None:
+        query = query.where(models.Candidate.office == office)
+    return query
+
+def headline(document, tsquery):
+    return func.ts_headline(SEARCH_CONFIG, document, tsquery, HEADLINE_OPTIONS).label("headline")
+
+def mark_matches(text: str) -> str:
+    return html.escape(text).replace(MATCH_START, "<mark>").replace(MATCH_STOP, "</mark>")
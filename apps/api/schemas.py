@@ -1,20 +1,30 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import AliasChoices, BaseModel, BeforeValidator, ConfigDict, Field
+from typing import Annotated, Optional, List, Dict, Any, Literal
 from uuid import UUID
 import datetime
 
 # ---------- Shared ----------
 class SourcedStr(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     value: str
     source_url: str
 
 # ---------- Stance ----------
+# Stance.is_stale; rows written before the column existed may read as None
+StaleFlag = Annotated[bool, BeforeValidator(lambda value: False if value is None else value)]
+
 class StanceInput(BaseModel):
     issue: str
     position: str
     source_url: Optional[str] = None
+    # Only backed by sources that have since disappeared
+    is_stale: StaleFlag = False
 
 class StanceResponse(StanceInput):
+    model_config = ConfigDict(from_attributes=True)
+
+    issue_id: Optional[str] = None
     created_at: datetime.datetime
 
 # ---------- Candidate ----------
@@ -35,7 +45,11 @@ class CandidateCreate(BaseModel):
     marital_status: Optional[str] = None
     stance_summary: List[StanceInput]
 
+# Validated straight from a models.Candidate (from_attributes), then dumped to
+# JSON bytes by pydantic-core; see routes.candidates.json_response
 class CandidateResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: UUID
     name: str
     office: str
@@ -51,6 +65,133 @@ class CandidateResponse(BaseModel):
     gender: Optional[str]
     race: Optional[str]
     marital_status: Optional[str]
-    stance_summary: List[StanceResponse]
+    # The ORM relationship is Candidate.stances
+    stance_summary: List[StanceResponse] = Field(validation_alias=AliasChoices("stance_summary", "stances"))
     created_at: datetime.datetime
     last_updated: datetime.datetime
+
+class CandidatePage(BaseModel):
+    items: List[CandidateResponse]
+    next_cursor: Optional[str] = None
+
+# Returned when ?fields= narrows each item to a subset of columns
+class CandidateFieldsPage(BaseModel):
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+# ---------- Bulk ----------
+class BulkItemResult(BaseModel):
+    index: int
+    ok: bool
+    id: Optional[UUID] = None
+    error: Optional[str] = None
+
+class BulkCreateResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkItemResult]
+
+class UpsertResponse(BaseModel):
+    id: UUID
+    status: Literal["created", "updated", "unchanged"]
+    stances_inserted: int
+    stances_updated: int
+    stances_deleted: int
+
+# ---------- Search ----------
+class SearchHit(BaseModel):
+    kind: Literal["candidate", "stance"]
+    candidate_id: UUID
+    name: str
+    office: str
+    state: Optional[str] = None
+    stance_id: Optional[UUID] = None
+    issue: Optional[str] = None
+    rank: float
+    # HTML-escaped excerpt with matches wrapped in <mark>
+    headline: str
+
+class SearchPage(BaseModel):
+    items: List[SearchHit]
+    next_offset: Optional[int] = None
+
+# ---------- Issues ----------
+class IssueResponse(BaseModel):
+    id: str
+    label: str
+
+class IssueStanceItem(BaseModel):
+    candidate_id: UUID
+    name: str
+    office: str
+    state: Optional[str] = None
+    district: Optional[str] = None
+    party: Optional[SourcedStr] = None
+    is_incumbent: Optional[bool] = None
+    stance_id: UUID
+    issue: str
+    position: str
+    source_url: Optional[str] = None
+    is_stale: StaleFlag = False
+
+class IssueStancesPage(BaseModel):
+    issue: IssueResponse
+    items: List[IssueStanceItem]
+    next_offset: Optional[int] = None
+
+# ---------- History ----------
+class StanceVersion(StanceInput):
+    issue_id: Optional[str] = None
+
+class VersionEntry(BaseModel):
+    version: int
+    created_at: datetime.datetime
+    is_keyframe: bool
+    # Issue texts, relative to the previous version
+    added: List[str]
+    removed: List[str]
+    changed: List[str]
+
+class HistoryPage(BaseModel):
+    candidate_id: UUID
+    items: List[VersionEntry]
+    next_offset: Optional[int] = None
+
+# GET /candidates/{id}/history?as_of=...
+class StancesAsOf(BaseModel):
+    candidate_id: UUID
+    as_of: datetime.datetime
+    version: int
+    versioned_at: datetime.datetime
+    stance_summary: List[StanceVersion]
+
+# ---------- Compare ----------
+# GET /compare and GET /races/{state}/{office}: candidates side by side, with
+# one row per issue and one position slot per candidate (None when silent)
+class ComparisonCandidate(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    name: str
+    office: str
+    party: Optional[SourcedStr] = None
+    district: Optional[str] = None
+    state: Optional[str] = None
+    is_incumbent: Optional[bool] = None
+    photo_url: Optional[str] = None
+    last_updated: datetime.datetime
+
+class ComparisonPosition(BaseModel):
+    issue: str
+    position: str
+    source_url: Optional[str] = None
+    is_stale: StaleFlag = False
+
+class ComparisonIssue(BaseModel):
+    issue_id: Optional[str] = None
+    label: str
+    positions: List[Optional[ComparisonPosition]]
+
+class ComparisonResponse(BaseModel):
+    candidates: List[ComparisonCandidate]
+    issues: List[ComparisonIssue]
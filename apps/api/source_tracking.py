@@ -0,0 +1,88 @@
+# apps/api/source_tracking.py
+
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+
+import models
+import summary_cache
+
+# Per-candidate record of the sources summarized so far, for incremental
+# refreshes. Each source URL keeps a fingerprint of the text it was extracted
+# from and the extraction itself, so a refresh only sends new or changed
+# sources to the model and reuses the stored extractions for the rest.
+# Sources that stop appearing are kept for SOURCE_RETENTION_DAYS, and their
+# stances are reported stale until then.
+SOURCE_RETENTION = timedelta(days=int(os.getenv("SOURCE_RETENTION_DAYS", "90")))
+
+# base is summary_cache.base_key(...), so a new model or prompt version
+# changes every fingerprint and forces re-extraction
+def fingerprint(base: str, text: str) -> str:
+    return summary_cache.hash_key(base, "source", summary_cache.normalize_text(text))
+
+@dataclass
+class SourceDiff:
+    # Indexes into the request's blocks
+    unchanged: list[int] = field(default_factory=list)
+    changed: list[int] = field(default_factory=list)
+    new: list[int] = field(default_factory=list)
+    # Stored sources absent from this request
+    gone: list[models.CandidateSource] = field(default_factory=list)
+
+    def counts(self) -> dict:
+        return {"new": len(self.new), "changed": len(self.changed), "unchanged": len(self.unchanged), "gone": len(self.gone)}
+
+def load(db: Session, natural_key: str) -> dict[str, models.CandidateSource]:
+    rows = db.query(models.CandidateSource).filter(models.CandidateSource.natural_key == natural_key)
+    return {row.url: row for row in rows}
+
+def diff(stored: dict[str, models.CandidateSource], urls: list[str], fingerprints: list[str]) -> SourceDiff:
+    result = SourceDiff()
+    for i, (url, fp) in enumerate(zip(urls, fingerprints)):
+        row = stored.get(url)
+        if row is None:
+            result.new.append(i)
+        elif row.fingerprint == fp:
+            result.unchanged.append(i)
+        else:
+            result.changed.append(i)
+    present = set(urls)
+    result.gone = [row for url, row in stored.items() if url not in present]
+    return result
+
+# Writes this refresh back. blocks are the request's (label, url) pairs;
+# extractions holds the extraction of each block that was sent to the model
+# (the caller skips saving when any failed). Rows are reloaded here
+# since cache commits during the refresh expire the ones diff() saw.
+def save(
+    db: Session,
+    natural_key: str,
+    blocks: list[tuple[str, str]],
+    fingerprints: list[str],
+    extractions: dict[int, dict],
+    now: datetime,
+):
+    stored = load(db, natural_key)
+    present = {url for _, url in blocks}
+    for i, (label, url) in enumerate(blocks):
+        row = stored.get(url)
+        if row is None:
+            row = models.CandidateSource(natural_key=natural_key, url=url, first_seen_at=now, changed_at=now)
+            db.add(row)
+            stored[url] = row
+        row.label = label
+        row.last_seen_at = now
+        row.missing_since = None
+        if i in extractions:
+            if row.fingerprint != fingerprints[i]:
+                row.changed_at = now
+            row.extraction = extractions[i]
+            row.fingerprint = fingerprints[i]
+
+    for row in [row for url, row in stored.items() if url not in present]:
+        if row.missing_since is None:
+            row.missing_since = now
+        elif row.missing_since <= now - SOURCE_RETENTION:
+            db.delete(row)
+    db.commit()
@@ -0,0 +1,87 @@
+# apps/api/summary_cache.py
+
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+import models
+
+# Bump whenever the summarization prompts change so stale outputs are not reused
+PROMPT_VERSION = "1"
+
+CACHE_TTL = timedelta(days=int(os.getenv("LLM_CACHE_TTL_DAYS", "30")))
+CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+def hash_key(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, separators=(",", ":")).encode()).hexdigest()
+
+def base_key(model: str, name: str, office: str) -> str:
+    return hash_key(model, PROMPT_VERSION, normalize_text(name), normalize_text(office))
+
+# One key per conversation turn: turn i hashes turn i-1 with block i, so a
+# key only matches when every block up to and including i is unchanged.
+def turn_keys(base: str, blocks: list[tuple[str, str, str]]) -> list[str]:
+    keys = []
+    previous = base
+    for label, url, text in blocks:
+        previous = hash_key(previous, label, url, normalize_text(text))
+        keys.append(previous)
+    return keys
+
+def summary_key(base: str, blocks: list[tuple[str, str, str]], mode: str) -> str:
+    return hash_key("summary", mode, turn_keys(base, blocks)[-1] if blocks else base)
+
+# Map-phase extraction of a single block, independent of its position
+def block_key(base: str, url: str, text: str) -> str:
+    return hash_key(base, "block", url, normalize_text(text))
+
+def get(db: Session, key: str):
+    return get_many(db, [key]).get(key)
+
+def get_many(db: Session, keys: list[str]) -> dict:
+    if not keys:
+        return {}
+    rows = db.query(models.LLMCache).filter(
+        models.LLMCache.key.in_(keys),
+        models.LLMCache.last_hit_at > datetime.utcnow() - CACHE_TTL,
+    ).all()
+    if rows:
+        db.execute(
+            update(models.LLMCache)
+            .where(models.LLMCache.key.in_([r.key for r in rows]))
+            .values(hits=models.LLMCache.hits + 1, last_hit_at=datetime.utcnow())
+        )
+        db.commit()
+    return {r.key: r.value for r in rows}
+
+def put(db: Session, key: str, kind: str, value):
+    now = datetime.utcnow()
+    stmt = pg_insert(models.LLMCache).values(key=key, kind=kind, value=value, hits=0, created_at=now, last_hit_at=now)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.LLMCache.key],
+        set_={"value": stmt.excluded.value, "last_hit_at": now},
+    )
+    db.execute(stmt)
+    db.commit()
+
+# Drops expired entries, then the least recently used ones beyond CACHE_MAX_ENTRIES
+def prune(db: Session):
+    db.query(models.LLMCache).filter(models.LLMCache.last_hit_at <= datetime.utcnow() - CACHE_TTL).delete(synchronize_session=False)
+
+    overflow = db.query(func.count(models.LLMCache.key)).scalar() - CACHE_MAX_ENTRIES
+    if overflow > 0:
+        oldest = (
+            db.query(models.LLMCache.key)
+            .order_by(models.LLMCache.last_hit_at)
+            .limit(overflow)
+            .subquery()
+        )
+        db.query(models.LLMCache).filter(models.LLMCache.key.in_(oldest.select())).delete(synchronize_session=False)
+    db.commit()
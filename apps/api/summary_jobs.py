@@ -0,0 +1,90 @@
+# apps/api/summary_jobs.py
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+# Summaries run on this module's own worker threads, not on the request
+# threadpool, so slow LLM conversations can't starve ordinary API reads.
+JOB_CONCURRENCY = int(os.getenv("SUMMARY_JOB_CONCURRENCY", "2"))
+MAX_PENDING_JOBS = int(os.getenv("SUMMARY_JOB_MAX_PENDING", "100"))
+JOB_TTL_SECONDS = int(os.getenv("SUMMARY_JOB_TTL_SECONDS", "3600"))
+
+class QueueFull(Exception):
+    pass
+
+class SummaryJob:
+    def __init__(self):
+        self.id = str(uuid.uuid4())
+        self.status = "queued"
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.done_blocks = 0
+        self.total_blocks = 0
+        self.result: Optional[dict] = None
+        self.error = None
+        self.events: list[dict] = []
+        self.lock = threading.Lock()
+
+    def emit(self, event: dict):
+        with self.lock:
+            if event.get("type") == "block":
+                self.done_blocks = event["done"]
+                self.total_blocks = event["total"]
+            self.events.append(event)
+
+    def events_since(self, index: int) -> list[dict]:
+        with self.lock:
+            return self.events[index:]
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+class JobQueue:
+    def __init__(self, workers: int = JOB_CONCURRENCY, max_pending: int = MAX_PENDING_JOBS, ttl: int = JOB_TTL_SECONDS):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summary-job")
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.jobs: dict[str, SummaryJob] = {}
+        self.lock = threading.Lock()
+
+    # work(job) runs on a worker thread, reporting progress through job.emit
+    # and returning the result; any exception marks the job failed.
+    def submit(self, work: Callable[[SummaryJob], dict]) -> SummaryJob:
+        with self.lock:
+            self._purge()
+            if sum(not j.finished for j in self.jobs.values()) >= self.max_pending:
+                raise QueueFull()
+            job = SummaryJob()
+            self.jobs[job.id] = job
+        self.pool.submit(self._run, job, work)
+        return job
+
+    def get(self, job_id: str) -> Optional[SummaryJob]:
+        return self.jobs.get(job_id)
+
+    def _run(self, job: SummaryJob, work: Callable[[SummaryJob], dict]):
+        job.status = "running"
+        job.emit({"type": "status", "status": "running"})
+        try:
+            job.result = work(job)
+            status, final = "done", {"type": "done", "result": job.result}
+        except Exception as e:
+            job.error = getattr(e, "detail", None) or str(e)
+            status, final = "failed", {"type": "failed", "error": job.error}
+        # The final event goes out before the status flips, so anyone who sees
+        # a finished job is guaranteed to find its last event too.
+        job.emit(final)
+        job.finished_at = time.time()
+        job.status = status
+
+    def _purge(self):
+        cutoff = time.time() - self.ttl
+        for job_id in [j.id for j in self.jobs.values() if j.finished and j.finished_at < cutoff]:
+            del self.jobs[job_id]
+
+queue = JobQueue()
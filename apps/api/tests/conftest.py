@@ -0,0 +1,57 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Tests that need Postgres run against TEST_DATABASE_URL and are skipped
+# without it. They create the tables and delete every candidate, so point it
+# at a throwaway database, never at DATABASE_URL's:
+#
+#   TEST_DATABASE_URL=postgresql://localhost/kyc_test python -m pytest -q tests
+#
+# db.py builds its engines at import time; they only connect when first used,
+# so the pure tests import fine with the placeholder URL.
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL or "postgresql://localhost/kyc_test"
+# Caching would let a read be served from an earlier test's writes
+os.environ["RESPONSE_CACHE_MAX_ENTRIES"] = "0"
+os.environ.pop("RESPONSE_CACHE_URL", None)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+requires_db = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    from db import Base, engine
+    from main import app
+    import models  # noqa: F401  (registers the tables on Base)
+
+    Base.metadata.create_all(engine)
+    # One client for the session: the async engine's pool is bound to the
+    # event loop the TestClient runs, so every request must use the same one
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def api(client):
+    client.delete("/candidates/")
+    yield client
+    client.delete("/candidates/")
+
+def candidate(name: str, office: str = "U.S. Senate", state: str = "WI", stances=(), **fields) -> dict:
+    return {
+        "name": name,
+        "office": office,
+        "state": state,
+        "party": {"value": "Independent", "source_url": "https://example.com"},
+        "bio_text": {"value": f"{name} grew up here", "source_url": "https://example.com/about"},
+        "stance_summary": [
+            {"issue": issue, "position": position, "source_url": "https://example.com/issues"}
+            for issue, position in stances
+        ],
+        **fields,
+    }
@@ -0,0 +1,54 @@
+from conftest import candidate, requires_db
+
+pytestmark = requires_db
+
+def walk(api, path: str, **params) -> list[list[dict]]:
+    pages = []
+    cursor = None
+    while True:
+        response = api.get(path, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        body = response.json()
+        pages.append(body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+def bulk_create(api, payloads: list[dict]) -> list[str]:
+    response = api.post("/candidates/bulk", json=payloads)
+    assert response.json()["failed"] == 0
+    return [result["id"] for result in response.json()["results"]]
+
+def test_pages_cover_every_candidate_once(api):
+    # One bulk insert stamps every row with the same created_at, so the order
+    # and the cursor rest on the id tie-breaker
+    ids = bulk_create(api, [candidate(f"Candidate {i}") for i in range(7)])
+    ids += bulk_create(api, [candidate(f"Later {i}") for i in range(2)])
+
+    pages = walk(api, "/candidates/", limit=2)
+    assert [len(page) for page in pages] == [2, 2, 2, 2, 1]
+    seen = [item["id"] for page in pages for item in page]
+    assert sorted(seen) == sorted(ids)
+    # (created_at, id) order: the first batch, then the second
+    assert seen == sorted(ids[:7]) + sorted(ids[7:])
+
+def test_exact_multiple_of_limit_ends_without_cursor(api):
+    bulk_create(api, [candidate(f"Candidate {i}") for i in range(4)])
+    assert [len(page) for page in walk(api, "/candidates/", limit=2)] == [2, 2]
+
+def test_filters_apply_on_every_page(api):
+    bulk_create(api, [candidate(f"Wisconsin {i}", state="WI") for i in range(3)])
+    bulk_create(api, [candidate(f"Ohio {i}", state="OH") for i in range(3)])
+    names = [item["name"] for page in walk(api, "/candidates/", limit=2, state="OH") for item in page]
+    assert sorted(names) == ["Ohio 0", "Ohio 1", "Ohio 2"]
+
+def test_field_projection_pages_the_same_way(api):
+    bulk_create(api, [candidate(f"Candidate {i}", stances=[("Taxes", f"Plan {i}")]) for i in range(5)])
+    full = [item["id"] for page in walk(api, "/candidates/", limit=2) for item in page]
+    pages = walk(api, "/candidates/", limit=2, fields="id,name,stance_summary")
+    assert [item["id"] for page in pages for item in page] == full
+    assert all(set(item) == {"id", "name", "stance_summary"} for page in pages for item in page)
+    assert all(len(item["stance_summary"]) == 1 for page in pages for item in page)
+
+def test_invalid_cursor_is_rejected(api):
+    assert api.get("/candidates/", params={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,60 @@
+import uuid
+
+from conftest import candidate, requires_db
+from routes import generate_summary
+
+pytestmark = requires_db
+
+# Stands in for the model: one stance per block, its position the block's text
+def extract(req, label, block) -> dict:
+    return {
+        "party": {"value": "Independent", "source_url": block.url},
+        "past_positions": [],
+        "stance_summary": [{"value": {"issue": label, "position": block.text}, "source_url": block.url}],
+    }
+
+def fail(req, label, block):
+    return None
+
+def refresh(api, name: str, official: str, news: str):
+    response = api.post("/generate-summary/refresh", json={
+        "name": name,
+        "office": "U.S. Senate",
+        "state": "WI",
+        "sources": {
+            "official": {"url": "https://example.com/official", "text": official},
+            "news": [{"url": "https://example.com/news", "text": news}],
+        },
+    })
+    assert response.status_code == 200, response.text
+    return response
+
+def stances(summary: dict) -> list[tuple[str, str]]:
+    return sorted((s["value"]["issue"], s["value"]["position"]) for s in summary["stance_summary"])
+
+def test_failed_reextraction_keeps_the_previous_stances(api, monkeypatch):
+    # Block results are cached by text; a fresh name keeps earlier runs out
+    name = f"Ann Alpha {uuid.uuid4().hex[:8]}"
+    monkeypatch.setattr(generate_summary, "extract_block", extract)
+    first = refresh(api, name, "Cut taxes", "Expand care")
+    assert stances(first.json()) == [("NEWS 1", "Expand care"), ("OFFICIAL", "Cut taxes")]
+
+    payload = candidate(name, stances=stances(first.json()))
+    created = api.post("/candidates/upsert", json=payload).json()
+
+    # The official page changes but the model fails on it
+    monkeypatch.setattr(generate_summary, "extract_block", fail)
+    second = refresh(api, name, "Cut taxes further", "Expand care")
+    assert second.headers["X-Sources-Changed"] == "1"
+    assert stances(second.json()) == stances(first.json())
+
+    result = api.post("/candidates/upsert", json=candidate(name, stances=stances(second.json()))).json()
+    assert result["stances_deleted"] == 0
+    kept = api.get(f"/candidates/{created['id']}").json()["stance_summary"]
+    assert sorted((s["issue"], s["position"]) for s in kept) == stances(first.json())
+
+    # Nothing was recorded for the failure, so the next refresh retries it
+    monkeypatch.setattr(generate_summary, "extract_block", extract)
+    third = refresh(api, name, "Cut taxes further", "Expand care")
+    assert third.headers["X-Sources-Changed"] == "1"
+    assert ("OFFICIAL", "Cut taxes further") in stances(third.json())
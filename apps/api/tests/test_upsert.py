@@ -0,0 +1,49 @@
+from conftest import candidate, requires_db
+
+pytestmark = requires_db
+
+def upsert(api, payload: dict) -> dict:
+    response = api.post("/candidates/upsert", json=payload)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_create_rejects_natural_key_duplicate(api):
+    assert api.post("/candidates/", json=candidate("Ann Alpha")).status_code == 200
+    # Same name, office and state, differently spaced and cased
+    response = api.post("/candidates/", json=candidate("  ann   ALPHA "))
+    assert response.status_code == 409
+    assert len(api.get("/candidates/").json()["items"]) == 1
+
+def test_upsert_reports_created_then_unchanged(api):
+    payload = candidate("Ann Alpha", stances=[("Taxes", "Cut them"), ("Healthcare", "Expand it")])
+    first = upsert(api, payload)
+    assert first["status"] == "created"
+    assert (first["stances_inserted"], first["stances_updated"], first["stances_deleted"]) == (2, 0, 0)
+
+    second = upsert(api, payload)
+    assert second == {**first, "status": "unchanged", "stances_inserted": 0}
+
+def test_upsert_updates_candidate_fields_in_place(api):
+    created = upsert(api, candidate("Ann Alpha", district="3"))
+    updated = upsert(api, candidate("Ann Alpha", district="4"))
+    assert updated["status"] == "updated"
+    assert updated["id"] == created["id"]
+    assert api.get(f"/candidates/{created['id']}").json()["district"] == "4"
+
+def test_upsert_writes_only_changed_stances(api):
+    created = upsert(api, candidate("Ann Alpha", stances=[("Taxes", "Cut them"), ("Healthcare", "Expand it")]))
+    result = upsert(api, candidate("Ann Alpha", stances=[("taxes", "Cut them more"), ("Education", "Fund schools")]))
+    assert result["status"] == "updated"
+    assert (result["stances_inserted"], result["stances_updated"], result["stances_deleted"]) == (1, 1, 1)
+
+    stances = api.get(f"/candidates/{created['id']}").json()["stance_summary"]
+    assert sorted((s["issue"], s["position"]) for s in stances) == [
+        ("Education", "Fund schools"),
+        ("taxes", "Cut them more"),
+    ]
+
+def test_upsert_matches_a_candidate_created_by_post(api):
+    created = api.post("/candidates/", json=candidate("Ann Alpha")).json()
+    result = upsert(api, candidate("Ann Alpha"))
+    assert result["id"] == created["id"]
+    assert result["status"] == "unchanged"
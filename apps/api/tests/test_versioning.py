@@ -0,0 +1,132 @@
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import candidate, requires_db
+import models
+import versioning
+
+def stance(issue: str, position: str, issue_id=None, source_url="https://example.com", is_stale=False) -> dict:
+    return {"issue": issue, "issue_id": issue_id, "position": position, "source_url": source_url, "is_stale": is_stale}
+
+STATES = [
+    {},
+    {"taxes": stance("Taxes", "Cut them", "taxes")},
+    {"taxes": stance("Taxes", "Cut them more", "taxes"), "a/b ~c": stance("A/B ~C", "Odd key")},
+    {"a/b ~c": stance("A/B ~C", "Odd key", source_url=None), "health": stance("Health", "Expand")},
+    {"health": stance("Health", "Expand")},
+    {},
+]
+
+def test_diff_then_apply_reproduces_each_state():
+    for old, new in zip(STATES, STATES[1:]):
+        ops = versioning.diff_states(old, new)
+        assert versioning.apply_patch(old, ops) == new
+
+def test_staleness_alone_is_a_change():
+    old = {"taxes": stance("Taxes", "Cut them", "taxes")}
+    new = {"taxes": stance("Taxes", "Cut them", "taxes", is_stale=True)}
+    ops = versioning.diff_states(old, new)
+    assert ops == [{"op": "replace", "path": "/taxes/is_stale", "value": True}]
+    assert versioning.apply_patch(old, ops) == new
+    assert versioning.apply_patch(new, versioning.diff_states(new, old)) == old
+    assert versioning.summarize(old, new)["changed"] == ["Taxes"]
+
+def test_snapshots_without_is_stale_replay_as_not_stale():
+    legacy = {"taxes": {key: value for key, value in stance("Taxes", "Cut them").items() if key != "is_stale"}}
+    rows = [
+        models.VersionSnapshot(version=1, is_keyframe=True, stance_json=legacy),
+        models.VersionSnapshot(version=2, is_keyframe=False, stance_json=[
+            {"op": "add", "path": "/health", "value": legacy["taxes"] | {"issue": "Health"}},
+        ]),
+    ]
+    first, second = versioning.replay(rows)
+    assert first == {"taxes": stance("Taxes", "Cut them")}
+    assert second["health"]["is_stale"] is False
+    # So rewriting the same stances records no new version
+    assert versioning.diff_states(first, {"taxes": stance("Taxes", "Cut them")}) == []
+
+def test_identical_states_diff_to_nothing():
+    assert versioning.diff_states(STATES[2], json.loads(json.dumps(STATES[2]))) == []
+
+def test_apply_patch_leaves_its_input_alone():
+    old = json.loads(json.dumps(STATES[2]))
+    versioning.apply_patch(old, versioning.diff_states(old, STATES[3]))
+    assert old == STATES[2]
+
+def test_pointer_escaping_round_trips():
+    for key in ["plain", "a/b", "~0", "~1/", "a~/b"]:
+        assert versioning.unescape(versioning.escape(key)) == key
+
+def version_rows(states: list[dict], keyframe_every: int) -> list[models.VersionSnapshot]:
+    rows = []
+    previous: dict = {}
+    for number, state in enumerate(states, start=1):
+        is_keyframe = (number - 1) % keyframe_every == 0
+        rows.append(models.VersionSnapshot(
+            version=number,
+            is_keyframe=is_keyframe,
+            stance_json=state if is_keyframe else versioning.diff_states(previous, state),
+        ))
+        previous = state
+    return rows
+
+@pytest.mark.parametrize("keyframe_every", [1, 2, 3, len(STATES)])
+def test_replay_rebuilds_every_version(keyframe_every):
+    rows = version_rows(STATES, keyframe_every)
+    assert versioning.replay(rows) == STATES
+    # Replaying from any keyframe gives the same states from there on
+    for start, row in enumerate(rows):
+        if row.is_keyframe:
+            assert versioning.replay(rows[start:]) == STATES[start:]
+
+def test_summarize_names_added_removed_and_changed_issues():
+    assert versioning.summarize(STATES[2], STATES[3]) == {
+        "added": ["Health"],
+        "removed": ["Taxes"],
+        "changed": ["A/B ~C"],
+    }
+
+@requires_db
+def test_recorded_versions_replay_to_what_was_written(api, monkeypatch):
+    from db import SessionLocal
+
+    monkeypatch.setattr(versioning, "KEYFRAME_INTERVAL", 2)
+    candidate_id = uuid.UUID(api.post("/candidates/", json=candidate("Ann Alpha")).json()["id"])
+    started = datetime(2025, 1, 1)
+    with SessionLocal() as db:
+        # The POST wrote version 1 (an empty keyframe); clear it to number from scratch
+        db.query(models.VersionSnapshot).filter(models.VersionSnapshot.candidate_id == candidate_id).delete()
+        written = []
+        for i, state in enumerate(STATES[1:]):
+            version = versioning.record_version(db, candidate_id, state, started + timedelta(days=i))
+            db.commit()
+            written.append(version)
+        # Writing the latest state again records nothing
+        assert versioning.record_version(db, candidate_id, STATES[-1], started + timedelta(days=99)) is None
+        assert written == list(range(1, len(STATES)))
+
+        for i, state in enumerate(STATES[1:]):
+            row, rebuilt = versioning.state_as_of(db, candidate_id, started + timedelta(days=i, hours=1))
+            assert (row.version, rebuilt) == (i + 1, state)
+            # Keyframes every KEYFRAME_INTERVAL versions bound each chain
+            assert len(versioning.chain_to(db, candidate_id, i + 1)) <= 2
+
+        entries, has_more = versioning.history_page(db, candidate_id, limit=2, offset=1)
+        assert [row.version for row, _ in entries] == [4, 3] and has_more
+        assert entries[1][1] == versioning.summarize(STATES[2], STATES[3])
+
+@requires_db
+def test_marking_a_stance_stale_records_a_version(api):
+    payload = candidate("Ann Alpha", stances=[("Taxes", "Cut them")])
+    created = api.post("/candidates/upsert", json=payload).json()
+    payload["stance_summary"][0]["is_stale"] = True
+    assert api.post("/candidates/upsert", json=payload).json()["status"] == "updated"
+
+    history = api.get(f"/candidates/{created['id']}/history").json()["items"]
+    assert [(entry["version"], entry["changed"]) for entry in history] == [(2, ["Taxes"]), (1, [])]
+    as_of = api.get(f"/candidates/{created['id']}/history", params={"as_of": datetime.utcnow().isoformat()}).json()
+    assert as_of["version"] == 2
+    assert as_of["stance_summary"][0]["is_stale"] is True
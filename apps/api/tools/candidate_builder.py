@@ -1,12 +1,21 @@
 from datetime import datetime
 import us
 
+# State named in the office title ("Wisconsin State Senate"), or None
+def state_from_office(office):
+    for state in us.states.STATES:
+        if state.name.lower() in office.lower():
+            return state.name
+    return None
+
 class CandidateBuilder:
-    def __init__(self, name, office, sources, summary):
+    # state, when known (e.g. from a batch file), wins over the one guessed from the office
+    def __init__(self, name, office, sources, summary, state=None):
         self.name = name
         self.office = office
         self.sources = sources
         self.summary = summary
+        self.state = state
 
     def build(self):
         now = datetime.utcnow().isoformat()
@@ -15,7 +24,7 @@ class CandidateBuilder:
         return {
             "name": self.name,
             "office": self.office,
-            "state": self.extract_state(),
+            "state": self.state or self.extract_state(),
             "is_incumbent": self.detect_incumbency(),
             "party": self.summary.get("party"),
             "bio_text": {
@@ -27,7 +36,8 @@ class CandidateBuilder:
                 {
                     "issue": s["value"]["issue"],
                     "position": s["value"]["position"],
-                    "source_url": s.get("source_url")
+                    "source_url": s.get("source_url"),
+                    "is_stale": s.get("stale", False)
                 }
                 for s in self.summary.get("stance_summary", [])
             ],
@@ -43,10 +53,7 @@ class CandidateBuilder:
         }
 
     def extract_state(self):
-        for state in us.states.STATES:
-            if state.name.lower() in self.office.lower():
-                return state.name
-        return None
+        return state_from_office(self.office)
 
     def detect_incumbency(self):
         texts = []
@@ -1,5 +1,4 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
 from duckduckgo_search import DDGS
 import argparse
 import os
@@ -7,28 +6,42 @@ import json
 import random
 import time
 from dotenv import load_dotenv
-from openai import OpenAI
 from pathlib import Path
 from slugify import slugify
 from urllib.parse import urljoin, urlparse
-from llm import call_llm
+from crawl_frontier import CrawlFrontier, parse_sitemap, path_priority
+from dedup import DedupStats, dedup_sources
+from fetcher import Fetcher, USER_AGENTS
+from instrumentation import count, span
+from page_cache import PageCache
+from text_extract import parse_page
+from official_site import OfficialResolver
 
 # Load .env from parent directory
 env_path = Path(__file__).resolve().parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
-client = None
-if os.getenv("LLAMA_BASE_URL") and os.getenv("LLAMA_API_KEY"):
-    client = OpenAI(base_url=os.getenv("LLAMA_BASE_URL"), api_key=os.getenv("LLAMA_API_KEY"))
+# Prints a preview of every fetched page and why pages were skipped
+DEBUG_SCRAPER = os.getenv("DEBUG_SCRAPER", "false").lower() in ("1", "true", "yes")
 
-DEBUG_SCRAPER = True
+SITEMAP_TYPES = ("application/xml", "text/xml", "application/x-xml", "text/plain")
+MAX_SITEMAPS = 3
 
-USER_AGENTS = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)",
-    "Mozilla/5.0 (X11; Linux x86_64)",
-    "Mozilla/5.0 (iPhone; CPU iPhone OS 15_2 like Mac OS X)"
-]
+_default_fetcher = None
+_default_resolver = None
+
+def get_default_fetcher() -> Fetcher:
+    global _default_fetcher
+    if _default_fetcher is None:
+        _default_fetcher = Fetcher(cache=PageCache())
+    return _default_fetcher
+
+# Single-candidate runs have nothing to batch with, so ask right away
+def get_default_resolver() -> OfficialResolver:
+    global _default_resolver
+    if _default_resolver is None:
+        _default_resolver = OfficialResolver(max_batch=1)
+    return _default_resolver
 
 BANNED_DOMAINS = {"truthtopowerpac.com", "secure.actblue.com", "winred.com"}
 ALWAYS_TRUST_DOMAINS = {"opensecrets.org", "ballotpedia.org", "en.wikipedia.org"}
@@ -41,21 +54,6 @@ def classify_source(url: str) -> str:
     domain_main = domain.replace("www.", "").split(".")[0]
     return domain_main.upper()
 
-def identify_true_official(sources: list[dict], candidate_name: str) -> int:
-    numbered_list = "\n".join([f"{i+1}. {s['label']} - {s['url']}" for i, s in enumerate(sources)])
-    prompt = f"""
-Given the following list of websites about {candidate_name}, which one appears to be the candidate's official campaign website?
-
-Return ONLY the number of the best match.
-
-{numbered_list}
-"""
-    response = call_llm(prompt)
-    try:
-        return int(response.strip()) - 1
-    except:
-        return -1
-
 def deduplicate_urls(results: list[dict]) -> list[dict]:
     seen = set()
     unique = []
@@ -81,63 +79,117 @@ def is_low_value_text(text: str, url: str) -> bool:
     boilerplate = ["sign up", "unsubscribe", "message and data rates", "recurring donation", "join our team"]
     return sum(kw in text.lower() for kw in boilerplate) >= 3
 
-def extract_clean_text(soup: BeautifulSoup) -> str:
-    for tag in soup(["script", "style", "noscript"]):
-        tag.decompose()
-    text = soup.get_text(separator="\n")
-    lines = [line.strip() for line in text.splitlines() if len(line.strip()) > 60]
-    return "\n".join(lines[:20])
-
+# Same host as the site, or one of its subdomains (www. is ignored)
 def is_internal_link(href: str, base_domain: str) -> bool:
     if href.startswith("/"):
         return True
-    try:
-        parsed = urlparse(href)
-        return base_domain in parsed.netloc
-    except:
-        return False
-
-def crawl_site(base_url: str, max_pages=10, max_depth=2):
-    visited = set()
-    queue = [(base_url, 0)]
-    results = []
-
-    parsed_base = urlparse(base_url)
-    base_domain = parsed_base.netloc
+    host = (urlparse(href).hostname or "").lower().removeprefix("www.")
+    base = base_domain.lower().split(":")[0].removeprefix("www.")
+    return host == base or host.endswith("." + base)
+
+def crawl_site(base_url: str, max_pages=10, max_depth=2, fetcher: Fetcher = None):
+    fetcher = fetcher or get_default_fetcher()
+    return fetcher.run(crawl_site_async(fetcher, base_url, max_pages=max_pages, max_depth=max_depth))
+
+# Best-first crawl over a CrawlFrontier: the landing page, then pages whose
+# paths look like issues/platform/about (from links or the sitemap) ahead of
+# the rest. Each round fetches as many pages in parallel as the remaining
+# budget allows. robots.txt is honoured; max_fetches (default 2 * max_pages)
+# caps the pages downloaded in total and per_host_budget (default 1.5 *
+# max_pages) those from any one host or subdomain.
+async def crawl_site_async(fetcher: Fetcher, base_url: str, max_pages=10, max_depth=2, max_fetches=None, per_host_budget=None):
+    with span("crawl", url=base_url):
+        results = await crawl_site_pages(fetcher, base_url, max_pages, max_depth, max_fetches, per_host_budget)
+    count("crawl.pages", len(results))
+    return results
 
-    while queue and len(results) < max_pages:
-        url, depth = queue.pop(0)
-        if url in visited or depth > max_depth:
-            continue
-        visited.add(url)
+async def crawl_site_pages(fetcher: Fetcher, base_url: str, max_pages: int, max_depth: int, max_fetches, per_host_budget) -> list[dict]:
+    base_domain = urlparse(base_url).netloc
+    frontier = CrawlFrontier(per_host_budget=per_host_budget or max_pages + max_pages // 2)
+    frontier.push(base_url, 0, priority=max(path_priority(base_url), 100))
+    for url in await sitemap_urls(fetcher, base_url):
+        if is_internal_link(url, base_domain) and path_priority(url) > 0:
+            frontier.push(url, 1)
 
-        try:
-            response = requests.get(url, timeout=5)
-            response.raise_for_status()
-        except Exception as e:
-            print(f"⚠️ Error fetching {url}: {e}")
-            continue
+    results = []
+    fetches_left = max_fetches or max_pages * 2
+    while len(results) < max_pages and fetches_left > 0:
+        batch = []
+        while len(batch) < min(max_pages - len(results), fetches_left):
+            item = frontier.pop()
+            if item is None:
+                break
+            robots = await fetcher.robots_for(item[0])
+            if robots.can_fetch("*", item[0]):
+                frontier.charge(item[0])
+                batch.append(item)
+        if not batch:
+            break
+        fetches_left -= len(batch)
+        responses = await fetcher.fetch_all([url for url, _ in batch], timeout=5)
+
+        for (url, depth), response in zip(batch, responses):
+            if response is None or not response.is_success:
+                if response is not None:
+                    print(f"⚠️ Error fetching {url}: HTTP {response.status_code}")
+                continue
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        text = extract_clean_text(soup)
-        if not text or len(text.split()) < 50:
+            # Parsing is CPU-bound; keep it off the shared fetcher loop
+            text, links = await asyncio.to_thread(parse_page, response.text)
+            if text and len(text.split()) >= 50:
+                results.append({"url": url, "text": text})
+
+            if depth < max_depth:
+                for href in links:
+                    full_url = urljoin(url, href).split("#")[0]
+                    if is_internal_link(full_url, base_domain):
+                        frontier.push(full_url, depth + 1)
+
+    return results[:max_pages]
+
+# Page URLs from the sitemaps robots.txt lists, or /sitemap.xml; follows up to
+# MAX_SITEMAPS children of a sitemap index
+async def sitemap_urls(fetcher: Fetcher, base_url: str) -> list[str]:
+    parsed = urlparse(base_url)
+    robots = await fetcher.robots_for(base_url)
+    pending = list(robots.site_maps() or [f"{parsed.scheme}://{parsed.netloc}/sitemap.xml"])[:MAX_SITEMAPS]
+    urls = []
+    fetched = 0
+    while pending and fetched < MAX_SITEMAPS:
+        sitemap_url = pending.pop(0)
+        fetched += 1
+        response = await fetcher.fetch(sitemap_url, timeout=5, content_types=SITEMAP_TYPES)
+        if response is None or not response.is_success:
             continue
-
-        results.append({"url": url, "text": text})
-
-        for tag in soup.find_all("a", href=True):
-            href = tag['href']
-            full_url = urljoin(url, href)
-            if is_internal_link(full_url, base_domain):
-                full_url = full_url.split("#")[0]
-                if full_url not in visited:
-                    queue.append((full_url, depth + 1))
-
-    return results
+        pages, children = parse_sitemap(response.text)
+        urls.extend(pages)
+        pending.extend(children)
+    return urls
 
 def scrape_candidate_sources(name: str, use_llm: bool = False, allow_fallback: bool = False, force_refresh: bool = False) -> dict:
     raw_results = search_duckduckgo(name, allow_fallback=allow_fallback, force_refresh=force_refresh)
+    return collect_sources(name, raw_results, use_llm=use_llm)
+
+# Second half of scrape_candidate_sources, split out so batch runs can throttle
+# search, page fetches and LLM calls independently. Page fetches are limited by
+# the fetcher; the official site is picked by the resolver's heuristics, with
+# unsure cases batched into a shared LLM call when use_llm is set. Near-duplicate
+# blocks are dropped before returning, counted in dedup_stats if given.
+def collect_sources(name: str, raw_results: list[dict], use_llm: bool = False, fetcher: Fetcher = None, resolver: OfficialResolver = None, dedup_stats: DedupStats = None) -> dict:
+    fetcher = fetcher or get_default_fetcher()
+    resolver = resolver or get_default_resolver()
+    sources = fetcher.run(collect_sources_async(fetcher, name, raw_results, use_llm=use_llm, resolver=resolver))
+
+    # Each dropped block is one LLM call fewer in /generate-summary
+    blocks = bool(sources["official"]) + bool(sources["ballotpedia"]) + len(sources["news"])
+    sources, dropped = dedup_sources(sources)
+    for d in dropped:
+        print(f"🧹 Near-duplicate dropped: {d['url']} (same as {d['duplicate_of']})")
+    if dedup_stats:
+        dedup_stats.add(blocks, len(dropped))
+    return sources
 
+async def collect_sources_async(fetcher: Fetcher, name: str, raw_results: list[dict], use_llm: bool, resolver: OfficialResolver) -> dict:
     labeled_results = []
     for res in raw_results:
         label = classify_source(res["url"])
@@ -149,15 +201,16 @@ def scrape_candidate_sources(name: str, use_llm: bool = False, allow_fallback: b
         })
 
     official_url = None
-    if use_llm:
-        idx = identify_true_official(labeled_results, name)
-        if 0 <= idx < len(labeled_results):
-            labeled_results[idx]["label"] = "OFFICIAL"
-            official_url = labeled_results[idx]["url"]
-            official_domain = urlparse(official_url).netloc.lower()
-            for r in labeled_results:
-                if urlparse(r["url"]).netloc.lower() == official_domain:
-                    r["label"] = "OFFICIAL"
+    # Blocks while waiting for a batched LLM answer, so keep it off the loop
+    with span("resolve"):
+        idx = await asyncio.to_thread(resolver.resolve, labeled_results, name, use_llm)
+    if 0 <= idx < len(labeled_results):
+        labeled_results[idx]["label"] = "OFFICIAL"
+        official_url = labeled_results[idx]["url"]
+        official_domain = urlparse(official_url).netloc.lower()
+        for r in labeled_results:
+            if urlparse(r["url"]).netloc.lower() == official_domain:
+                r["label"] = "OFFICIAL"
 
     labeled_results = deduplicate_urls(labeled_results)
 
@@ -165,54 +218,80 @@ def scrape_candidate_sources(name: str, use_llm: bool = False, allow_fallback: b
     for r in labeled_results:
         print(f"[{r['label']:<12}] {r['title']}\n→ {r['url']}\n")
 
+    # The first official result is crawled, every other result is a single
+    # page fetch; all of them run concurrently.
+    official = next((r for r in labeled_results if r["label"].lower() == "official"), None)
+    others = [r for r in labeled_results if r is not official]
+
+    if official:
+        print(f"🌐 Crawling official domain: {official['url']}")
+        crawl = crawl_site_async(fetcher, official["url"], max_pages=8, max_depth=2)
+    else:
+        crawl = asyncio.sleep(0, result=[])
+    crawled, pages = await asyncio.gather(crawl, asyncio.gather(*(fetch_source_page(fetcher, r["url"]) for r in others)))
+
     sources = {
         "official": None,
         "ballotpedia": None,
         "news": []
     }
 
+    # Assemble in search-result order, as the sequential version did
+    page_by_url = {r["url"]: page for r, page in zip(others, pages)}
     for result in labeled_results:
         url = result["url"]
         label = result["label"].lower()
 
-        if label == "official" and sources["official"] is None:
-            print(f"🌐 Crawling official domain: {url}")
-            crawled = crawl_site(url, max_pages=8, max_depth=2)
+        if result is official:
             if crawled:
                 sources["official"] = crawled[0]
                 sources["news"].extend(crawled[1:])
             continue
 
-        try:
-            headers = {"User-Agent": random.choice(USER_AGENTS)}
-            response = requests.get(url, timeout=10, headers=headers)
-            soup = BeautifulSoup(response.text, "html.parser")
-            text = extract_clean_text(soup)
+        page = page_by_url.get(url)
+        if page is None:
+            continue
+        if label == "ballotpedia" and sources["ballotpedia"] is None:
+            sources["ballotpedia"] = page
+        else:
+            sources["news"].append(page)
 
-            if DEBUG_SCRAPER:
-                print(f"🔍 Text Preview ({url}):\n{text[:300].replace(chr(10), ' ')}\n")
+    return sources
 
-            if is_low_value_text(text, url):
-                if DEBUG_SCRAPER:
-                    print(f"⚠️ Skipping low-value page: {url}")
-                continue
+async def fetch_source_page(fetcher: Fetcher, url: str):
+    response = await fetcher.fetch(url, timeout=10)
+    if response is None:
+        return None
+    try:
+        text, _ = await asyncio.to_thread(parse_page, response.text, False)
+    except Exception as e:
+        print(f"⚠️ Error processing {url}: {e}")
+        return None
 
-            if label == "ballotpedia" and sources["ballotpedia"] is None:
-                sources["ballotpedia"] = {"url": url, "text": text}
-            else:
-                sources["news"].append({"url": url, "text": text})
-        except Exception as e:
-            print(f"⚠️ Error processing {url}: {e}")
+    if DEBUG_SCRAPER:
+        print(f"🔍 Text Preview ({url}):\n{text[:300].replace(chr(10), ' ')}\n")
 
-    return sources
+    if is_low_value_text(text, url):
+        if DEBUG_SCRAPER:
+            print(f"⚠️ Skipping low-value page: {url}")
+        return None
+
+    return {"url": url, "text": text}
 
 def search_duckduckgo(candidate_name: str, allow_fallback=False, force_refresh=False):
+    with span("search"):
+        results = search_duckduckgo_cached(candidate_name, force_refresh)
+    count("search.results", len(results))
+    return results
+
+def search_duckduckgo_cached(candidate_name: str, force_refresh: bool) -> list[dict]:
     os.makedirs(".search_cache", exist_ok=True)
     cache_file = f".search_cache/{slugify(candidate_name)}.json"
 
     if not force_refresh and os.path.exists(cache_file):
         with open(cache_file, "r") as f:
             print("💾 Loaded search results from cache.")
+            count("search.cache_hits")
             return json.load(f)
 
     print("🌐 Performing live DuckDuckGo search...")
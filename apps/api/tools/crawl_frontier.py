@@ -0,0 +1,95 @@
+import heapq
+import re
+import xml.etree.ElementTree as ET
+from collections import Counter
+from typing import Optional
+from urllib.parse import urlparse
+
+from url_utils import normalize_url
+
+# Path words that usually lead to a candidate's positions, and ones that never do
+PRIORITY_WORDS = {
+    "issues": 5, "issue": 5, "platform": 5, "priorities": 5, "positions": 5, "policy": 4, "policies": 4,
+    "agenda": 4, "plan": 3, "vision": 3, "about": 3, "meet": 3, "bio": 3, "biography": 3,
+    "record": 2, "accomplishments": 2, "news": 1, "press": 1,
+}
+SKIP_WORDS = {
+    "donate", "contribute", "volunteer", "shop", "store", "cart", "checkout", "login", "signin",
+    "signup", "subscribe", "privacy", "terms", "cookie", "cookies", "feed", "wp-admin", "wp-json",
+}
+BINARY_EXTENSIONS = {
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".ico", ".mp3", ".mp4", ".mov",
+    ".avi", ".zip", ".gz", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".css", ".js", ".json",
+    ".xml", ".rss", ".ics",
+}
+
+def path_words(url: str) -> list[str]:
+    return re.split(r"[^a-z0-9]+", urlparse(url).path.lower())
+
+# Cheap pre-download filter on the URL alone
+def is_crawlable(url: str) -> bool:
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https"):
+        return False
+    path = parsed.path.lower()
+    if any(path.endswith(ext) for ext in BINARY_EXTENSIONS):
+        return False
+    return not SKIP_WORDS.intersection(path_words(url))
+
+def path_priority(url: str) -> int:
+    return max((PRIORITY_WORDS.get(word, 0) for word in path_words(url)), default=0)
+
+# Frontier key: the normalized URL without its scheme, so http/https,
+# host case, trailing-slash, query-order and tracking-param variants collapse
+def url_key(url: str) -> str:
+    return normalize_url(url).split("://", 1)[-1]
+
+# Priority-ordered crawl frontier for one site.
+#
+# URLs pop best-first: pages whose path looks like issues/platform/about come
+# before everything else, then shallower before deeper, then discovery order.
+# Each URL is queued at most once, and once a host has been charged
+# per_host_budget fetches its remaining URLs are skipped.
+class CrawlFrontier:
+    def __init__(self, per_host_budget: int):
+        self.heap: list[tuple[int, int, int, str]] = []
+        self.seen: set[str] = set()
+        self.per_host_budget = per_host_budget
+        self.host_fetches: Counter = Counter()
+        self.counter = 0
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def push(self, url: str, depth: int, priority: Optional[int] = None) -> bool:
+        key = url_key(url)
+        if key in self.seen or not is_crawlable(url):
+            return False
+        self.seen.add(key)
+        self.counter += 1
+        heapq.heappush(self.heap, (-(path_priority(url) if priority is None else priority), depth, self.counter, url))
+        return True
+
+    # Best URL whose host still has budget, with its depth; None when exhausted
+    def pop(self) -> Optional[tuple[str, int]]:
+        while self.heap:
+            _, depth, _, url = heapq.heappop(self.heap)
+            if self.host_fetches[urlparse(url).netloc.lower()] < self.per_host_budget:
+                return url, depth
+        return None
+
+    # Count a fetch of url against its host's budget
+    def charge(self, url: str):
+        self.host_fetches[urlparse(url).netloc.lower()] += 1
+
+# <loc> entries of a sitemap and, for sitemap indexes, of the child sitemaps
+# (returned separately so the caller decides how many to follow)
+def parse_sitemap(xml_text: str) -> tuple[list[str], list[str]]:
+    try:
+        root = ET.fromstring(xml_text.encode())
+    except ET.ParseError:
+        return [], []
+    locs = [el.text.strip() for el in root.iter() if el.tag.endswith("loc") and el.text]
+    if root.tag.endswith("sitemapindex"):
+        return [], locs
+    return locs, []
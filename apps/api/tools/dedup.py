@@ -0,0 +1,93 @@
+import hashlib
+import re
+import threading
+from urllib.parse import urlparse
+
+# Content-level dedup of scraped source blocks. Each block gets a 64-bit
+# SimHash over word shingles; blocks within MAX_DISTANCE bits of each other
+# are near-duplicates (syndicated wire copy, a page mirrored on two paths)
+# and only the best-sourced one is kept.
+SHINGLE_WORDS = 3
+MAX_DISTANCE = 6
+WIRE_DOMAINS = {"apnews.com", "reuters.com"}
+
+def shingles(text: str) -> set[str]:
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    if len(words) <= SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+def simhash(text: str) -> int:
+    weights = [0] * 64
+    for shingle in shingles(text):
+        h = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+def distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+def host(url: str) -> str:
+    return urlparse(url).netloc.lower().removeprefix("www.")
+
+# Lower is better: the official page, other crawled pages of the official
+# site, Ballotpedia, wire services (the original of most syndicated copy),
+# then other news; longer text breaks ties
+def source_rank(slot: str, block: dict, official_host: str) -> tuple[int, int]:
+    domain = host(block["url"])
+    if slot == "official":
+        tier = 0
+    elif domain == official_host:
+        tier = 1
+    elif slot == "ballotpedia":
+        tier = 2
+    elif domain in WIRE_DOMAINS or any(domain.endswith("." + d) for d in WIRE_DOMAINS):
+        tier = 3
+    else:
+        tier = 4
+    return tier, -len(block["text"])
+
+class DedupStats:
+    def __init__(self):
+        self.blocks = 0
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+    def add(self, blocks: int, dropped: int):
+        with self.lock:
+            self.blocks += blocks
+            self.dropped += dropped
+
+    def summary(self) -> str:
+        return f"{self.dropped} of {self.blocks} source blocks dropped as near-duplicates"
+
+# Drops news blocks that near-duplicate a better-sourced block. The official
+# and Ballotpedia slots are never dropped. Returns the deduplicated sources
+# and a list of {"url", "duplicate_of"} for what was removed.
+def dedup_sources(sources: dict) -> tuple[dict, list[dict]]:
+    entries = []
+    for slot in ("official", "ballotpedia"):
+        if sources.get(slot):
+            entries.append((slot, sources[slot]))
+    entries += [("news", block) for block in sources.get("news", [])]
+
+    official_host = host(sources["official"]["url"]) if sources.get("official") else None
+    # Best-sourced first, so each block is compared against those it would lose to
+    order = sorted(range(len(entries)), key=lambda i: (source_rank(*entries[i], official_host), i))
+    kept: list[tuple[int, int]] = []
+    dropped = []
+    dropped_ids = set()
+    for i in order:
+        slot, block = entries[i]
+        fingerprint = simhash(block["text"])
+        match = next((j for j, other in kept if distance(fingerprint, other) <= MAX_DISTANCE), None)
+        if match is not None and slot == "news":
+            dropped.append({"url": block["url"], "duplicate_of": entries[match][1]["url"]})
+            dropped_ids.add(id(block))
+            continue
+        kept.append((i, fingerprint))
+
+    deduped = dict(sources)
+    deduped["news"] = [block for block in sources.get("news", []) if id(block) not in dropped_ids]
+    return deduped, dropped
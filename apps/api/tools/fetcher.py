@@ -0,0 +1,193 @@
+import asyncio
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import httpx
+
+from instrumentation import count, span
+from page_cache import PageCache
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)",
+    "Mozilla/5.0 (X11; Linux x86_64)",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 15_2 like Mac OS X)"
+]
+
+# What fetch() accepts by default; anything else is dropped after the headers
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+# Longest robots.txt Crawl-delay honoured, in seconds
+MAX_CRAWL_DELAY = 5.0
+
+# Pooled keep-alive HTTP client for the scraper.
+#
+# The client lives on a private event loop running in a background thread, so
+# plain synchronous code (and every worker thread of a batch run) can share one
+# connection pool and one set of per-host limits:
+#
+#     fetcher = Fetcher()
+#     pages = fetcher.run(some_coroutine(fetcher))
+#
+# Inside coroutines, await fetcher.fetch(url) directly. With a PageCache,
+# fresh pages are served from disk and stale ones revalidated conditionally.
+# Its sqlite calls block, so they run on a thread of their own rather than
+# stalling every other fetch on the loop.
+# Bodies are streamed: responses of the wrong Content-Type are dropped after
+# the headers, and oversized ones as soon as they pass max_bytes.
+class Fetcher:
+    def __init__(self, max_connections: int = 16, per_host: int = 2, politeness_delay: float = 0.2, timeout: float = 10.0, cache: Optional[PageCache] = None):
+        self.cache = cache
+        # One thread: the cache serializes on its own lock anyway
+        self.cache_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="page-cache") if cache else None
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.politeness_delay = politeness_delay
+        self.timeout = timeout
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="fetcher", daemon=True)
+        self.thread.start()
+
+        # Created on the fetcher loop; asyncio primitives bind to the loop they are used on
+        self.client: Optional[httpx.AsyncClient] = None
+        self.gate: Optional[asyncio.Semaphore] = None
+        self.host_gates: dict[str, asyncio.Semaphore] = {}
+        self.host_next_slot: dict[str, float] = {}
+        self.host_delay: dict[str, float] = {}
+        self.robots: dict[str, asyncio.Future] = {}
+        self.run(self._start())
+
+    async def _start(self):
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+            timeout=self.timeout,
+            follow_redirects=True,
+        )
+        self.gate = asyncio.Semaphore(self.max_connections)
+
+    # Run a coroutine on the fetcher loop and block until it finishes
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    # GET a URL under the global and per-host limits. None on network errors
+    # and on bodies that are not one of content_types (None accepts any) or
+    # are larger than max_bytes.
+    async def fetch(self, url: str, timeout: Optional[float] = None, content_types: Optional[tuple] = HTML_TYPES, max_bytes: int = MAX_PAGE_BYTES) -> Optional[httpx.Response]:
+        cached = await self._cache_call(self.cache.get, url) if self.cache else None
+        if cached is not None and self.cache.is_fresh(cached):
+            count("fetch.cache_hits")
+            if not accepts(cached["content_type"], content_types):
+                return None
+            return await self._cache_call(self.cache.hit, cached)
+
+        host = urlparse(url).netloc.lower()
+        host_gate = self.host_gates.setdefault(host, asyncio.Semaphore(self.per_host))
+
+        # Politeness waits only hold the host slot, not a global connection slot
+        async with host_gate:
+            await self._wait_for_slot(host)
+            async with self.gate:
+                headers = self.cache.conditional_headers(cached) if cached is not None else {}
+                # Timed inside the gates, so waits for a slot are not counted
+                with span("fetch", url=url):
+                    response = await self._get(url, timeout, headers, content_types, max_bytes)
+
+        if response is None:
+            count("fetch.dropped")
+        elif response.is_success:
+            count("fetch.pages")
+            count("fetch.bytes", len(response.content))
+        elif response.status_code == 304:
+            count("fetch.revalidated")
+        if response is None or self.cache is None:
+            return response
+        if response.status_code == 304 and cached is not None:
+            return await self._cache_call(self.cache.revalidated, cached)
+        await self._cache_call(self.cache.store, url, response)
+        return response
+
+    async def _cache_call(self, method, *args):
+        return await self.loop.run_in_executor(self.cache_executor, method, *args)
+
+    async def _get(self, url: str, timeout: Optional[float], headers: dict, content_types: Optional[tuple], max_bytes: int) -> Optional[httpx.Response]:
+        try:
+            async with self.client.stream(
+                "GET",
+                url,
+                timeout=timeout or self.timeout,
+                headers={"User-Agent": random.choice(USER_AGENTS), **headers},
+            ) as response:
+                if not response.is_success:
+                    # Callers only look at the status of 304s and errors
+                    return httpx.Response(response.status_code, headers=response.headers, request=response.request)
+                if not accepts(response.headers.get("Content-Type"), content_types):
+                    print(f"⏭️ Skipping {url}: {response.headers.get('Content-Type')}")
+                    return None
+                if int(response.headers.get("Content-Length") or 0) > max_bytes:
+                    print(f"⏭️ Skipping {url}: {response.headers['Content-Length']} bytes")
+                    return None
+
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body += chunk
+                    if len(body) > max_bytes:
+                        print(f"⏭️ Skipping {url}: over {max_bytes} bytes")
+                        return None
+        except httpx.HTTPError as e:
+            print(f"⚠️ Error fetching {url}: {e}")
+            return None
+
+        # The body is already decompressed, so drop the headers describing the wire format
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")}
+        return httpx.Response(response.status_code, headers=headers, content=bytes(body), request=response.request)
+
+    async def fetch_all(self, urls: list[str], timeout: Optional[float] = None) -> list[Optional[httpx.Response]]:
+        return await asyncio.gather(*(self.fetch(url, timeout=timeout) for url in urls))
+
+    # Parsed robots.txt for the URL's host, fetched once per host and shared by
+    # every crawl on this fetcher. A missing or unreadable file allows everything.
+    async def robots_for(self, url: str) -> RobotFileParser:
+        parsed = urlparse(url)
+        host = parsed.netloc.lower()
+        if host not in self.robots:
+            self.robots[host] = self.loop.create_task(self._load_robots(f"{parsed.scheme}://{host}/robots.txt", host))
+        return await self.robots[host]
+
+    async def _load_robots(self, robots_url: str, host: str) -> RobotFileParser:
+        parser = RobotFileParser(robots_url)
+        response = await self.fetch(robots_url, timeout=5, content_types=None, max_bytes=512 * 1024)
+        parser.parse(response.text.splitlines() if response is not None and response.is_success else [])
+        delay = parser.crawl_delay("*")
+        if delay:
+            self.host_delay[host] = min(float(delay), MAX_CRAWL_DELAY)
+        return parser
+
+    async def _wait_for_slot(self, host: str):
+        # Space out request starts to the same host by politeness_delay (or the
+        # host's robots.txt Crawl-delay). There is no await between reading and
+        # reserving the slot, so no lock is needed.
+        now = self.loop.time()
+        slot = max(now, self.host_next_slot.get(host, now))
+        self.host_next_slot[host] = slot + max(self.politeness_delay, self.host_delay.get(host, 0))
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def close(self):
+        self.run(self.client.aclose())
+        if self.cache:
+            self.cache_executor.shutdown()
+            self.cache.close()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+def accepts(content_type: Optional[str], content_types: Optional[tuple]) -> bool:
+    if content_types is None:
+        return True
+    mime_type = (content_type or "").split(";")[0].strip().lower()
+    # Servers that send no Content-Type at all are given the benefit of the doubt
+    return not mime_type or mime_type in content_types
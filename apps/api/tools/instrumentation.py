@@ -0,0 +1,166 @@
+import contextvars
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# Timing spans and counters for the scrape → summarize → store pipeline.
+#
+#     with span("fetch", url=url):
+#         ...
+#     count("fetch.bytes", len(body))
+#
+# Every span is aggregated per stage in `recorder` (count, errors, total and
+# a bounded sample for p50/p95), which is what the end-of-run report prints.
+# When the "pipeline" logger is enabled (see configure_log) each span is also
+# written as one JSON line, like llm_gateway writes each LLM call. With the
+# log off a span costs two perf_counter calls and a short lock, so it is
+# meant to stay on in production runs.
+
+logger = logging.getLogger("pipeline")
+
+# Durations kept per stage for percentiles; beyond this, a uniform sample
+SAMPLE_SIZE = 4096
+
+class StageStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: list[float] = []
+
+    def add(self, seconds: float, ok: bool):
+        self.count += 1
+        self.errors += 0 if ok else 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) < SAMPLE_SIZE:
+            self.samples.append(seconds)
+        else:
+            # Reservoir sampling keeps every span equally likely to be kept
+            slot = random.randrange(self.count)
+            if slot < SAMPLE_SIZE:
+                self.samples[slot] = seconds
+
+    def as_dict(self) -> dict:
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_s": round(self.total, 3),
+            "p50_ms": round(percentile(ordered, 50) * 1000, 1),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 1),
+            "max_ms": round(self.max * 1000, 1),
+        }
+
+# Nearest-rank percentile of an already sorted list
+def percentile(ordered: list[float], p: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+class Recorder:
+    def __init__(self):
+        self.stages: dict[str, StageStats] = {}
+        self.counters: dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float, ok: bool = True):
+        with self.lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats()
+            stats.add(seconds, ok)
+
+    def count(self, name: str, amount: int = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def report(self) -> dict:
+        with self.lock:
+            return {
+                "stages": {stage: stats.as_dict() for stage, stats in self.stages.items()},
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def table(self) -> str:
+        report = self.report()
+        lines = [f"  {'stage':<12} {'count':>7} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'total s':>9}"]
+        for stage, s in sorted(report["stages"].items(), key=lambda item: -item[1]["total_s"]):
+            lines.append(
+                f"  {stage:<12} {s['count']:>7} {s['errors']:>6} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f}"
+                f" {s['max_ms']:>9.1f} {s['total_s']:>9.2f}"
+            )
+        if report["counters"]:
+            lines.append("  " + ", ".join(f"{name}={value}" for name, value in report["counters"].items()))
+        return "\n".join(lines)
+
+recorder = Recorder()
+
+# Fields added to every span logged in the current context, e.g. the
+# candidate. Like llm_gateway's metered(), thread pools must run work via
+# contextvars.copy_context().run for them to follow; Fetcher.run and
+# asyncio.to_thread already do.
+_fields: contextvars.ContextVar[dict] = contextvars.ContextVar("pipeline_fields", default={})
+
+@contextmanager
+def tagged(**fields):
+    token = _fields.set({**_fields.get(), **fields})
+    try:
+        yield
+    finally:
+        _fields.reset(token)
+
+@contextmanager
+def span(stage: str, **fields):
+    started = time.perf_counter()
+    ok = True
+    try:
+        yield
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        recorder.record(stage, elapsed, ok)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                "stage": stage,
+                "ms": round(elapsed * 1000, 2),
+                "ok": ok,
+                "ts": time.time(),
+                **_fields.get(),
+                **fields,
+            }))
+
+def count(name: str, amount: int = 1):
+    recorder.count(name, amount)
+
+# gateway listener: every LLM call made from this process is an "llm" span
+# (cache hits only count), with its tokens
+def record_llm_call(record: dict):
+    if record["cache_hit"]:
+        recorder.count("llm.cache_hits")
+        return
+    recorder.record("llm", record["latency"], record["ok"])
+    recorder.count("llm.calls")
+    recorder.count("llm.prompt_tokens", record["prompt_tokens"])
+    recorder.count("llm.completion_tokens", record["completion_tokens"])
+
+# Sends span records, and llm_gateway's per-call records, to a JSON-lines
+# file ("-" for stderr)
+def configure_log(path: str):
+    handler = logging.StreamHandler() if path == "-" else logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    for name in ("pipeline", "llm_gateway"):
+        log = logging.getLogger(name)
+        log.addHandler(handler)
+        log.setLevel(logging.INFO)
+        log.propagate = False
+
+def write_report(path: str, **fields):
+    with open(path, "w") as f:
+        json.dump({**fields, **recorder.report()}, f, indent=2)
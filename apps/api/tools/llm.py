@@ -1,22 +1,17 @@
-import os
-from openai import OpenAI
-from dotenv import load_dotenv
+import sys
+from pathlib import Path
 
-# Load .env from parent folder
-load_dotenv()
+# The tools share the API's LLM gateway (pooling, rate limits, retries, metering)
+sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-client = OpenAI(
-    base_url=os.getenv("OPENAI_BASE_URL"),
-    api_key=os.getenv("OPENAI_API_KEY")
-)
+from llm_gateway import gateway
+from instrumentation import record_llm_call
 
-def call_llm(prompt: str) -> str:
-    response = client.chat.completions.create(
-        model="meta/llama-3.3-70b-instruct",
-        messages=[
-            {"role": "user", "content": prompt}
-        ],
+gateway.listeners.append(record_llm_call)
+
+def call_llm(prompt: str, max_tokens: int = 200) -> str:
+    return gateway.chat(
+        [{"role": "user", "content": prompt}],
         temperature=0.3,
-        max_tokens=200
+        max_tokens=max_tokens,
     )
-    return response.choices[0].message.content.strip()
@@ -0,0 +1,201 @@
+import json
+import re
+import threading
+from concurrent.futures import Future
+from contextlib import nullcontext
+from urllib.parse import urlparse
+
+from slugify import slugify
+
+from llm import call_llm
+
+# Hosts that are never a candidate's own site: references, social networks,
+# fundraising platforms and news/data aggregators
+NOT_OFFICIAL_DOMAINS = {
+    "ballotpedia.org", "wikipedia.org", "opensecrets.org", "votesmart.org", "govtrack.us",
+    "congress.gov", "fec.gov", "facebook.com", "twitter.com", "x.com", "instagram.com",
+    "youtube.com", "linkedin.com", "tiktok.com", "actblue.com", "winred.com", "gofundme.com",
+}
+CAMPAIGN_WORDS = ("vote", "elect", "reelect", "team", "friendsof", "campaign", "for", "4")
+NAME_SUFFIXES = {"jr", "sr", "ii", "iii", "iv"}
+
+# A site resolves without the LLM when it scores at least CONFIDENT and leads
+# the runner-up by MARGIN. Below NO_MATCH nothing resembles the candidate.
+CONFIDENT = 0.6
+MARGIN = 0.2
+NO_MATCH = 0.2
+# Results per candidate shown to the LLM for ambiguous cases
+LLM_SHORTLIST = 5
+
+def name_parts(candidate_name: str) -> tuple[str, str]:
+    tokens = [t for t in slugify(candidate_name).split("-") if t not in NAME_SUFFIXES]
+    if not tokens:
+        return "", ""
+    return tokens[0], tokens[-1]
+
+def site_domain(url: str) -> str:
+    return urlparse(url).netloc.lower().split(":")[0].removeprefix("www.")
+
+def is_not_official(domain: str) -> bool:
+    return any(domain == d or domain.endswith("." + d) for d in NOT_OFFICIAL_DOMAINS)
+
+# Heuristic 0..1 score of how likely a search result is the candidate's own site
+def score_result(result: dict, candidate_name: str) -> float:
+    parsed = urlparse(result["url"])
+    domain = site_domain(result["url"])
+    if result["label"] == "BALLOTPEDIA" or is_not_official(domain):
+        return 0.0
+
+    first, last = name_parts(candidate_name)
+    if not last:
+        return 0.0
+    labels = domain.split(".")
+    site = labels[-3] if domain.endswith(".gov") and len(labels) >= 3 else labels[0]
+    site = site.replace("-", "")
+
+    score = 0.0
+    if last in site:
+        score += 0.5
+        if first in site and first != last:
+            score += 0.2
+        # doe4congress.com, electjanedoe.com, teamdoe.org
+        rest = site.replace(first, "").replace(last, "")
+        if rest and any(word in rest for word in CAMPAIGN_WORDS):
+            score += 0.15
+        elif not rest:
+            score += 0.1
+    elif first and first in site:
+        score += 0.2
+
+    if domain.endswith(".gov"):
+        # The officeholder's government page, not a campaign site
+        score -= 0.1
+    if parsed.path.strip("/").count("/") >= 2:
+        # Deep article paths rarely belong to a candidate's own site
+        score -= 0.2
+    if last in (result.get("title") or "").lower() and "official" in (result.get("title") or "").lower():
+        score += 0.1
+    return max(0.0, min(1.0, score))
+
+# Returns (index of the official site or -1, whether the heuristics are sure)
+def score_official(results: list[dict], candidate_name: str) -> tuple[int, bool]:
+    if not results:
+        return -1, True
+    scores = [score_result(r, candidate_name) for r in results]
+    ranked = sorted(range(len(results)), key=lambda i: -scores[i])
+    best = ranked[0]
+    if scores[best] < NO_MATCH:
+        return -1, True
+
+    # Several pages on the same site are not competing answers
+    best_domain = site_domain(results[best]["url"])
+    rivals = [scores[i] for i in ranked[1:] if site_domain(results[i]["url"]) != best_domain]
+    runner_up = rivals[0] if rivals else 0.0
+    confident = scores[best] >= CONFIDENT and scores[best] - runner_up >= MARGIN
+    return best, confident
+
+def shortlist(results: list[dict], candidate_name: str) -> list[int]:
+    eligible = [
+        i for i, r in enumerate(results)
+        if r["label"] != "BALLOTPEDIA" and not is_not_official(site_domain(r["url"]))
+    ]
+    return sorted(eligible, key=lambda i: -score_result(results[i], candidate_name))[:LLM_SHORTLIST]
+
+# One structured prompt for many ambiguous candidates. Returns an index into
+# each candidate's results, or -1 when the model picks none or can't be parsed.
+def identify_official_batch(batch: list[tuple[list[dict], str]]) -> list[int]:
+    shortlists = [shortlist(results, name) for results, name in batch]
+    sections = []
+    for n, ((results, name), picks) in enumerate(zip(batch, shortlists), start=1):
+        lines = "\n".join(f"  {j}. {results[i]['label']} - {results[i]['url']}" for j, i in enumerate(picks, start=1))
+        sections.append(f"Candidate {n}: {name}\n{lines}")
+
+    prompt = (
+        "For each candidate below, pick the number of the website that is the candidate's "
+        "official campaign website, or 0 if none of them is.\n"
+        'Return ONLY a JSON object mapping each candidate number to your pick, e.g. {"1": 2, "2": 0}.\n\n'
+        + "\n\n".join(sections)
+    )
+    reply = call_llm(prompt, max_tokens=20 + 10 * len(batch))
+    try:
+        picks = json.loads(re.search(r"\{.*\}", reply, re.DOTALL).group(0))
+    except (AttributeError, json.JSONDecodeError):
+        print(f"⚠️ Could not parse official-site picks: {reply[:200]}")
+        return [-1] * len(batch)
+
+    resolved = []
+    for n, options in enumerate(shortlists, start=1):
+        try:
+            pick = int(picks.get(str(n), 0))
+        except (TypeError, ValueError):
+            pick = 0
+        resolved.append(options[pick - 1] if 1 <= pick <= len(options) else -1)
+    return resolved
+
+# Micro-batches ambiguous official-site lookups from many worker threads into
+# one LLM call. The first request of a batch waits up to max_wait for others
+# to join; a full batch is sent immediately. llm_gate is held around the call.
+class OfficialResolver:
+    def __init__(self, max_batch: int = 20, max_wait: float = 2.0, llm_gate=None):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.llm_gate = llm_gate or nullcontext()
+        self.pending: list[tuple[list[dict], str, Future]] = []
+        self.batch_id = 0
+        self.lock = threading.Lock()
+        self.stats = {"heuristic": 0, "unresolved": 0, "llm": 0, "llm_calls": 0}
+
+    # Index of the official site in results, or -1. With use_llm=False cases
+    # the heuristics are unsure about are left unresolved.
+    def resolve(self, results: list[dict], candidate_name: str, use_llm: bool = True) -> int:
+        idx, confident = score_official(results, candidate_name)
+        if confident or not use_llm:
+            with self.lock:
+                self.stats["heuristic" if confident else "unresolved"] += 1
+            return idx if confident else -1
+
+        future = Future()
+        with self.lock:
+            self.stats["llm"] += 1
+            self.pending.append((results, candidate_name, future))
+            if len(self.pending) >= self.max_batch:
+                batch = self._take()
+            else:
+                batch = None
+                if len(self.pending) == 1:
+                    timer = threading.Timer(self.max_wait, self.flush, args=(self.batch_id,))
+                    timer.daemon = True
+                    timer.start()
+        if batch:
+            self._send(batch)
+        return future.result()
+
+    # Timer callback; a no-op if that batch already went out full
+    def flush(self, batch_id: int):
+        with self.lock:
+            batch = self._take() if batch_id == self.batch_id else None
+        if batch:
+            self._send(batch)
+
+    def _take(self) -> list[tuple[list[dict], str, Future]]:
+        batch, self.pending = self.pending, []
+        self.batch_id += 1
+        return batch
+
+    def _send(self, batch: list[tuple[list[dict], str, Future]]):
+        try:
+            with self.llm_gate:
+                with self.lock:
+                    self.stats["llm_calls"] += 1
+                picks = identify_official_batch([(results, name) for results, name, _ in batch])
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, _, future), pick in zip(batch, picks):
+            future.set_result(pick)
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"{s['heuristic']} resolved by heuristics, {s['llm']} by LLM in {s['llm_calls']} calls, "
+                f"{s['unresolved']} unresolved")
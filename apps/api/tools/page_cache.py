@@ -0,0 +1,145 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+import httpx
+
+from url_utils import normalize_url
+
+DEFAULT_TTL = 12 * 60 * 60  # seconds a page is served without revalidating
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Disk-backed cache of fetched pages, keyed by normalized URL.
+#
+# Entries younger than the TTL are served without touching the network. Older
+# entries are revalidated with If-None-Match / If-Modified-Since, so an
+# unchanged page only costs a 304. When the cache grows past max_bytes the
+# least recently used entries are evicted.
+class PageCache:
+    def __init__(self, path: str = ".page_cache/pages.sqlite3", ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                content_type TEXT,
+                body TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at);
+        """)
+        self.total_bytes = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(normalize_url(url).encode()).hexdigest()
+
+    def get(self, url: str) -> Optional[sqlite3.Row]:
+        with self.lock:
+            return self.db.execute("SELECT * FROM pages WHERE key = ?", (self.key(url),)).fetchone()
+
+    def is_fresh(self, entry: sqlite3.Row) -> bool:
+        return time.time() - entry["fetched_at"] < self.ttl
+
+    def conditional_headers(self, entry: sqlite3.Row) -> dict:
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    # Fresh entry served from disk
+    def hit(self, entry: sqlite3.Row) -> httpx.Response:
+        self.stats["hits"] += 1
+        self._touch(entry, refetched=False)
+        return self.as_response(entry)
+
+    # Stale entry confirmed unchanged by a 304
+    def revalidated(self, entry: sqlite3.Row) -> httpx.Response:
+        self.stats["revalidated"] += 1
+        self._touch(entry, refetched=True)
+        return self.as_response(entry)
+
+    def store(self, url: str, response: httpx.Response):
+        self.stats["misses"] += 1
+        if not response.is_success:
+            return
+
+        body = response.text
+        size = len(body.encode())
+        now = time.time()
+        with self.lock:
+            old = self.db.execute("SELECT size FROM pages WHERE key = ?", (self.key(url),)).fetchone()
+            self.db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.key(url), url, response.status_code, response.headers.get("Content-Type"), body,
+                    response.headers.get("ETag"), response.headers.get("Last-Modified"), now, now, size,
+                ),
+            )
+            self.total_bytes += size - (old["size"] if old else 0)
+            self.stats["stored"] += 1
+            self._evict()
+            self.db.commit()
+
+    def _touch(self, entry: sqlite3.Row, refetched: bool):
+        now = time.time()
+        with self.lock:
+            if refetched:
+                self.db.execute("UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE key = ?", (now, now, entry["key"]))
+            else:
+                self.db.execute("UPDATE pages SET accessed_at = ? WHERE key = ?", (now, entry["key"]))
+            self.db.commit()
+
+    # Once over max_bytes, drop least recently used entries down to 90% of it
+    def _evict(self):
+        if self.total_bytes <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        while self.total_bytes > target:
+            victims = self.db.execute("SELECT key, size FROM pages ORDER BY accessed_at LIMIT 100").fetchall()
+            if not victims:
+                break
+            for victim in victims:
+                self.db.execute("DELETE FROM pages WHERE key = ?", (victim["key"],))
+                self.total_bytes -= victim["size"]
+                self.stats["evicted"] += 1
+                if self.total_bytes <= target:
+                    break
+
+    @staticmethod
+    def as_response(entry: sqlite3.Row) -> httpx.Response:
+        # The body is stored decoded, so re-encode it as UTF-8 whatever the original charset was
+        mime_type = (entry["content_type"] or "text/html").split(";")[0]
+        headers = {"Content-Type": f"{mime_type}; charset=utf-8"}
+        return httpx.Response(
+            status_code=entry["status"],
+            headers=headers,
+            content=entry["body"].encode(),
+            request=httpx.Request("GET", entry["url"]),
+        )
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"{s['hits']} fresh hits, {s['revalidated']} revalidated (304), "
+                f"{s['misses']} downloaded, {s['evicted']} evicted")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -1,44 +1,258 @@
 import argparse
+import csv
 import requests
 import json
-from candidate_scraper import scrape_candidate_sources
-from candidate_builder import CandidateBuilder
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from candidate_scraper import collect_sources, get_default_fetcher, scrape_candidate_sources, search_duckduckgo
+from candidate_builder import CandidateBuilder, state_from_office
+from fetcher import Fetcher
+from instrumentation import configure_log, count, recorder, span, tagged, write_report
+from page_cache import PageCache
+# On sys.path once llm is imported (via candidate_scraper above)
+from llm_gateway import metered
+from official_site import OfficialResolver
+from dedup import DedupStats
 
-def call_llm_generate_summary(name: str, office: str, sources: dict) -> dict:
+# LLM usage the API reports for each /generate-summary call
+USAGE_HEADERS = {
+    "calls": "X-LLM-Calls",
+    "cache_hits": "X-LLM-Cache-Hits",
+    "prompt_tokens": "X-LLM-Prompt-Tokens",
+    "completion_tokens": "X-LLM-Completion-Tokens",
+}
+
+# Source comparison the API reports for each /generate-summary/refresh call
+SOURCE_HEADERS = {
+    "new": "X-Sources-New",
+    "changed": "X-Sources-Changed",
+    "unchanged": "X-Sources-Unchanged",
+    "gone": "X-Sources-Gone",
+}
+
+# Returns (summary, llm usage reported by the API). With incremental, only
+# sources that are new or changed since this candidate's last incremental
+# run are summarized again; state must then be the one the candidate is
+# stored with, since the API finds the previous run's sources by it.
+def call_llm_generate_summary(name: str, office: str, sources: dict, run_id: str = None, incremental: bool = False, state: str = None) -> tuple[dict, dict]:
     print("🔁 Sending text to LLM for summarization...")
     clean_sources = {k: v for k, v in sources.items() if v is not None}
-    res = requests.post(
-        "http://localhost:8000/generate-summary",
-        json={
-            "name": name,
-            "office": office,
-            "sources": clean_sources
-        }
-    )
-    res.raise_for_status()
+    payload = {
+        "name": name,
+        "office": office,
+        "sources": clean_sources
+    }
+    headers = {"X-Pipeline-Run": run_id} if run_id else {}
+    with span("summarize"):
+        if incremental:
+            payload["state"] = state
+            res = requests.post("http://localhost:8000/generate-summary/refresh", headers=headers, json=payload)
+        else:
+            res = requests.post("http://localhost:8000/generate-summary", params={"mode": "map_reduce"}, headers=headers, json=payload)
+        res.raise_for_status()
+    if incremental:
+        print("🔎 Sources: " + ", ".join(f"{res.headers.get(h, 0)} {k}" for k, h in SOURCE_HEADERS.items()))
+    usage = {k: int(res.headers.get(h, 0)) for k, h in USAGE_HEADERS.items()}
+    # The API's LLM calls happen in its process, so only their totals are known here
+    for k, v in usage.items():
+        count(f"api.llm_{k}", v)
+    return res.json(), usage
+
+# Local gateway calls (official-site identification) plus the API's summary calls
+def combine_usage(local: dict, remote: dict) -> dict:
+    return {k: local.get(k, 0) + remote.get(k, 0) for k in USAGE_HEADERS}
+
+def format_usage(usage: dict) -> str:
+    return (f"{usage['calls']} calls, {usage['cache_hits']} cache hits, "
+            f"{usage['prompt_tokens']} prompt + {usage['completion_tokens']} completion tokens")
+
+def store_candidate(candidate: dict) -> dict:
+    # Upsert so re-running for the same candidate refreshes the existing
+    # row instead of creating a duplicate
+    with span("store"):
+        res = requests.post("http://localhost:8000/candidates/upsert", json=candidate)
+        res.raise_for_status()
     return res.json()
 
+# Per-stage timings for the whole run, printed and optionally saved as JSON
+def report_stages(args):
+    print("⏱️ Stage timings:")
+    print(recorder.table())
+    if args.report:
+        write_report(args.report, run=args.run_id)
+        print(f"📈 Stage report → {args.report}")
+
+# Per-stage concurrency limits shared by all batch workers. Page fetches
+# are limited by the shared Fetcher's connection pool and per-host gates.
+# Unsure official-site picks from all workers share batched LLM calls; a batch
+# goes out once every worker is waiting on one, or after a short wait.
+class StageGates:
+    def __init__(self, search: int, fetch: int, per_host: int, llm: int, workers: int):
+        self.search = threading.BoundedSemaphore(search)
+        self.fetcher = Fetcher(max_connections=fetch, per_host=per_host, cache=PageCache())
+        self.llm = threading.BoundedSemaphore(llm)
+        self.resolver = OfficialResolver(max_batch=workers, llm_gate=self.llm)
+        self.dedup = DedupStats()
+
+# Append-only JSONL record of finished candidates, used to resume batch runs
+class ProgressLog:
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def completed(self) -> set[str]:
+        done = set()
+        if not self.path.exists():
+            return done
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A run killed mid-write can leave a partial last line
+                    continue
+                if entry.get("status") == "done":
+                    done.add(entry["key"])
+        return done
+
+    def record(self, key: str, status: str, **fields):
+        entry = {"key": key, "status": status, "finished_at": datetime.utcnow().isoformat(), **fields}
+        with self.lock, open(self.path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+
+def batch_key(entry: dict) -> str:
+    return "|".join(" ".join((entry.get(k) or "").lower().split()) for k in ("name", "office", "state"))
+
+def load_batch(path: Path) -> list[dict]:
+    with open(path, newline="") as f:
+        if path.suffix == ".jsonl":
+            entries = [json.loads(line) for line in f if line.strip()]
+        else:
+            entries = list(csv.DictReader(f))
+    for i, entry in enumerate(entries):
+        if not entry.get("name") or not entry.get("office"):
+            raise ValueError(f"{path}: entry {i + 1} needs both 'name' and 'office'")
+    return entries
+
+def run_candidate(name: str, office: str, state: str, args, gates: StageGates) -> dict:
+    with tagged(candidate=name, run=args.run_id), span("candidate"):
+        return run_candidate_stages(name, office, state, args, gates)
+
+# state is the batch entry's, when it has one; otherwise guessed from the office
+def run_candidate_stages(name: str, office: str, state: str, args, gates: StageGates) -> dict:
+    state = state or state_from_office(office)
+    with metered(candidate=name, run=args.run_id) as local_usage:
+        with gates.search:
+            raw_results = search_duckduckgo(name, force_refresh=args.force_refresh)
+        sources = collect_sources(name, raw_results, use_llm=args.use_llm, fetcher=gates.fetcher, resolver=gates.resolver, dedup_stats=gates.dedup)
+
+    with gates.llm:
+        summary, remote_usage = call_llm_generate_summary(name, office, sources, run_id=args.run_id, incremental=args.incremental, state=state)
+    usage = combine_usage(local_usage.as_dict(), remote_usage)
+
+    candidate = CandidateBuilder(name, office, sources, summary, state).build()
+    if args.dry_run:
+        return {"status": "dry-run", "candidate": candidate, "llm": usage}
+    return {**store_candidate(candidate), "llm": usage}
+
+def run_batch(args):
+    batch_path = Path(args.batch)
+    entries = load_batch(batch_path)
+    progress = ProgressLog(Path(args.progress) if args.progress else batch_path.with_name(batch_path.name + ".progress.jsonl"))
+
+    done = progress.completed()
+    pending = [e for e in entries if batch_key(e) not in done]
+    print(f"📋 {len(entries)} candidates in batch, {len(entries) - len(pending)} already done, {len(pending)} to run")
+
+    gates = StageGates(
+        search=args.search_concurrency,
+        fetch=args.fetch_concurrency,
+        per_host=args.per_host_concurrency,
+        llm=args.llm_concurrency,
+        workers=args.workers,
+    )
+    failed = 0
+    run_usage = combine_usage({}, {})
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(run_candidate, e["name"], e["office"], e.get("state") or None, args, gates): e for e in pending}
+        for future in as_completed(futures):
+            entry = futures[future]
+            key = batch_key(entry)
+            try:
+                result = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"❌ {entry['name']} ({entry['office']}): {e}")
+                progress.record(key, "failed", error=str(e))
+                continue
+            run_usage = combine_usage(run_usage, result["llm"])
+            print(f"✅ {entry['name']} ({entry['office']}): {result.get('status')} — {format_usage(result['llm'])}")
+            if not args.dry_run:
+                progress.record(key, "done", id=result.get("id"), result=result.get("status"), run=args.run_id, llm=result["llm"])
+    print(f"💾 Page cache: {gates.fetcher.cache.summary()}")
+    print(f"🏛️ Official sites: {gates.resolver.summary()}")
+    print(f"🧹 Dedup: {gates.dedup.summary()}")
+    gates.fetcher.close()
+
+    print(f"🧠 LLM usage for run {args.run_id}: {format_usage(run_usage)}")
+    report_stages(args)
+    print(f"🏁 Batch finished: {len(pending) - failed} succeeded, {failed} failed → {progress.path}")
+
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--name", required=True, help="Candidate name")
-    parser.add_argument("--office", required=True, help="Office they're running for")
-    parser.add_argument("--use-llm", action="store_true")
+    parser.add_argument("--name", help="Candidate name")
+    parser.add_argument("--office", help="Office they're running for")
+    parser.add_argument("--state", help="Candidate's state (default: guessed from the office)")
+    parser.add_argument("--batch", help="CSV or JSONL file of candidates (name, office[, state])")
+    parser.add_argument("--progress", help="Progress file for resuming a batch (default: <batch>.progress.jsonl)")
+    parser.add_argument("--workers", type=int, default=8, help="Candidates processed at once in batch mode")
+    parser.add_argument("--search-concurrency", type=int, default=1, help="Parallel DuckDuckGo searches")
+    parser.add_argument("--fetch-concurrency", type=int, default=16, help="Parallel page fetches")
+    parser.add_argument("--per-host-concurrency", type=int, default=2, help="Parallel page fetches per host")
+    parser.add_argument("--llm-concurrency", type=int, default=2, help="Parallel LLM calls")
+    parser.add_argument("--use-llm", action="store_true", help="Ask the LLM when the official site is unclear")
     parser.add_argument("--dry-run", action="store_true")
     parser.add_argument("--force-refresh", action="store_true")
+    parser.add_argument("--incremental", action="store_true", help="Only re-summarize sources that changed since the last incremental run")
+    parser.add_argument("--run-id", default=uuid.uuid4().hex[:12], help="Tag for this run's LLM usage (default: random)")
+    parser.add_argument("--trace-log", default=os.getenv("PIPELINE_TRACE_LOG"), help="JSON-lines file for per-span and per-LLM-call records (\"-\" for stderr)")
+    parser.add_argument("--report", help="Write the run's per-stage timings and counters to this JSON file")
     args = parser.parse_args()
+    if args.trace_log:
+        configure_log(args.trace_log)
 
+    if args.batch:
+        run_batch(args)
+        return
+    if not args.name or not args.office:
+        parser.error("--name and --office are required unless --batch is given")
+
+    with tagged(candidate=args.name, run=args.run_id), span("candidate"):
+        run_single(args)
+    report_stages(args)
+
+def run_single(args):
     name = args.name
     office = args.office
+    state = args.state or state_from_office(office)
 
-    sources = scrape_candidate_sources(name, use_llm=args.use_llm, force_refresh=args.force_refresh)
+    with metered(candidate=name, run=args.run_id) as local_usage:
+        sources = scrape_candidate_sources(name, use_llm=args.use_llm, force_refresh=args.force_refresh)
+    print(f"💾 Page cache: {get_default_fetcher().cache.summary()}")
     print("🧾 Payload Sent to LLM API:")
     print(json.dumps({"name": name, "office": office, "sources": sources}, indent=2))
 
-    summary = call_llm_generate_summary(name, office, sources)
+    summary, remote_usage = call_llm_generate_summary(name, office, sources, run_id=args.run_id, incremental=args.incremental, state=state)
     print("✅ LLM Summary Result:")
     print(json.dumps(summary, indent=2))
+    print(f"🧠 LLM usage: {format_usage(combine_usage(local_usage.as_dict(), remote_usage))}")
 
-    candidate = CandidateBuilder(name, office, sources, summary).build()
+    candidate = CandidateBuilder(name, office, sources, summary, state).build()
 
     print("Debug Dump:")
     print(json.dumps(candidate, indent=2))
@@ -47,10 +261,8 @@ def main():
         print("🧪 [Dry Run] Candidate payload:")
         print(json.dumps(candidate, indent=2))
     else:
-        print("📤 Posting candidate to backend...")
-        res = requests.post("http://localhost:8000/candidates/", json=candidate)
-        res.raise_for_status()
-        print("✅ Candidate created:", res.json())
+        print("📤 Upserting candidate to backend...")
+        print("✅ Candidate stored:", store_candidate(candidate))
 
 if __name__ == "__main__":
     main()
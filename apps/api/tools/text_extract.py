@@ -0,0 +1,121 @@
+import os
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from instrumentation import span
+
+# Text extraction for scraped pages. Both engines return (text, links) where
+# text is the first MAX_LINES lines longer than MIN_LINE_CHARS.
+#
+#   bs4   builds a full html.parser tree; the original implementation
+#   lxml  streams the page through lxml's pull parser, skips nav/header/
+#         footer/aside/form boilerplate, and stops once it has enough lines
+#         (or, when links are wanted, stops collecting text)
+#
+# SCRAPER_EXTRACT_ENGINE picks the default.
+EXTRACT_ENGINE = os.getenv("SCRAPER_EXTRACT_ENGINE", "lxml")
+
+MAX_LINES = 20
+MIN_LINE_CHARS = 60
+SKIP_TAGS = {"script", "style", "noscript", "template"}
+BOILERPLATE_TAGS = {"nav", "header", "footer", "aside", "form"}
+BOILERPLATE_ROLES = {"navigation", "banner", "contentinfo"}
+FEED_CHUNK = 64 * 1024
+
+def qualifying_lines(text: str) -> list[str]:
+    return [line.strip() for line in text.splitlines() if len(line.strip()) > MIN_LINE_CHARS]
+
+def extract_clean_text(soup: BeautifulSoup) -> str:
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    text = soup.get_text(separator="\n")
+    return "\n".join(qualifying_lines(text)[:MAX_LINES])
+
+def parse_page_bs4(html: str, want_links: bool = True, strip_boilerplate: bool = False) -> tuple[str, list[str]]:
+    soup = BeautifulSoup(html, "html.parser")
+    links = [tag["href"] for tag in soup.find_all("a", href=True)] if want_links else []
+    if strip_boilerplate:
+        for tag in soup(list(BOILERPLATE_TAGS)):
+            tag.decompose()
+    return extract_clean_text(soup), links
+
+class _Open:
+    __slots__ = ("element", "skipped", "text_done", "last_child")
+
+    def __init__(self, element, skipped: bool):
+        self.element = element
+        self.skipped = skipped
+        self.text_done = False
+        self.last_child = None
+
+# Text nodes are emitted in document order as soon as they are complete: an
+# element's own text when its first child starts (or it ends), a child's tail
+# when the next sibling starts (or the parent ends). Finished children are
+# removed from the tree right away, so memory stays flat on long pages.
+def parse_page_lxml(html: str, want_links: bool = True, strip_boilerplate: bool = True) -> tuple[str, list[str]]:
+    parser = etree.HTMLPullParser(events=("start", "end", "comment", "pi"))
+    skip = SKIP_TAGS | BOILERPLATE_TAGS if strip_boilerplate else SKIP_TAGS
+    stack: list[_Open] = []
+    lines: list[str] = []
+    links: list[str] = []
+
+    def emit(text, skipped: bool):
+        if text and not skipped and len(lines) < MAX_LINES:
+            lines.extend(qualifying_lines(text))
+
+    def close_child(parent: _Open):
+        child = parent.last_child
+        if child is not None:
+            emit(child.tail, parent.skipped)
+            parent.element.remove(child)
+            parent.last_child = None
+
+    def open_child(parent: _Open, child):
+        if not parent.text_done:
+            emit(parent.element.text, parent.skipped)
+            parent.text_done = True
+        close_child(parent)
+        parent.last_child = child
+
+    def handle(events):
+        for event, element in events:
+            if event == "start":
+                if stack:
+                    open_child(stack[-1], element)
+                if element.tag == "a" and want_links and element.get("href") is not None:
+                    links.append(element.get("href"))
+                skipped = (bool(stack) and stack[-1].skipped) or element.tag in skip or (
+                    strip_boilerplate and element.get("role") in BOILERPLATE_ROLES
+                )
+                stack.append(_Open(element, skipped))
+            elif event == "end":
+                node = stack.pop()
+                if not node.text_done:
+                    emit(element.text, node.skipped)
+                close_child(node)
+                element.clear(keep_tail=True)
+            elif stack:
+                # Comments and processing instructions carry no text of their
+                # own but may be followed by a tail
+                open_child(stack[-1], element)
+
+    for start in range(0, len(html), FEED_CHUNK):
+        parser.feed(html[start:start + FEED_CHUNK])
+        handle(parser.read_events())
+        if len(lines) >= MAX_LINES and not want_links:
+            break
+    else:
+        try:
+            parser.close()
+        except etree.XMLSyntaxError:
+            # Raised for documents without a single element
+            pass
+        handle(parser.read_events())
+    return "\n".join(lines[:MAX_LINES]), links
+
+ENGINES = {"bs4": parse_page_bs4, "lxml": parse_page_lxml}
+
+def parse_page(html: str, want_links: bool = True, engine: str = None) -> tuple[str, list[str]]:
+    with span("extract"):
+        return ENGINES[engine or EXTRACT_ENGINE](html, want_links=want_links)
@@ -0,0 +1,176 @@
+# apps/api/versioning.py
+
+import json
+import os
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+import models
+
+# Stance history. Every write that changes a candidate's stances appends a
+# VersionSnapshot. Most rows hold a JSON-patch-style delta against the
+# previous version; a full keyframe is stored for the first version, every
+# KEYFRAME_INTERVAL versions, and whenever the delta would be larger than the
+# full state. Reconstructing any version therefore reads one keyframe plus at
+# most KEYFRAME_INTERVAL - 1 deltas. Writes that change nothing add nothing.
+#
+# A state is {issue key: {"issue", "issue_id", "position", "source_url",
+# "is_stale"}}, keyed like routes.candidates.sync_stances matches stances.
+KEYFRAME_INTERVAL = int(os.getenv("VERSION_KEYFRAME_INTERVAL", "20"))
+
+STANCE_FIELDS = ("issue", "issue_id", "position", "source_url", "is_stale")
+
+# Snapshots written before staleness was versioned have no is_stale
+FIELD_DEFAULTS = {"is_stale": False}
+
+# RFC 6901 pointer escaping, since issue keys may contain "/" or "~"
+def escape(key: str) -> str:
+    return key.replace("~", "~0").replace("/", "~1")
+
+def unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+def diff_states(old: dict, new: dict) -> list[dict]:
+    ops = []
+    for key in sorted(old.keys() - new.keys()):
+        ops.append({"op": "remove", "path": f"/{escape(key)}"})
+    for key in sorted(new.keys() - old.keys()):
+        ops.append({"op": "add", "path": f"/{escape(key)}", "value": new[key]})
+    for key in sorted(old.keys() & new.keys()):
+        for field in STANCE_FIELDS:
+            if old[key].get(field) != new[key].get(field):
+                ops.append({"op": "replace", "path": f"/{escape(key)}/{field}", "value": new[key].get(field)})
+    return ops
+
+def apply_patch(state: dict, ops: list[dict]) -> dict:
+    state = {key: dict(value) for key, value in state.items()}
+    for op in ops:
+        tokens = [unescape(t) for t in op["path"].split("/")[1:]]
+        if op["op"] == "remove":
+            state.pop(tokens[0], None)
+        elif len(tokens) == 1:
+            state[tokens[0]] = dict(op["value"])
+        else:
+            state[tokens[0]][tokens[1]] = op["value"]
+    return state
+
+# Issues added, removed and changed between two states, by their issue text
+def summarize(old: dict, new: dict) -> dict:
+    return {
+        "added": sorted(new[k]["issue"] for k in new.keys() - old.keys()),
+        "removed": sorted(old[k]["issue"] for k in old.keys() - new.keys()),
+        "changed": sorted(new[k]["issue"] for k in old.keys() & new.keys() if old[k] != new[k]),
+    }
+
+# Folds versions (ascending, starting at a keyframe) into the state after each
+def replay(versions: list[models.VersionSnapshot]) -> list[dict]:
+    states = []
+    state: dict = {}
+    for version in versions:
+        state = dict(version.stance_json) if version.is_keyframe else apply_patch(state, version.stance_json)
+        state = with_defaults(state)
+        states.append(state)
+    return states
+
+def with_defaults(state: dict) -> dict:
+    return {key: {**FIELD_DEFAULTS, **value} for key, value in state.items()}
+
+def keyframe_row(candidate_id, state: dict, now: datetime) -> dict:
+    return {"candidate_id": candidate_id, "version": 1, "is_keyframe": True, "stance_json": state, "created_at": now}
+
+# Versions from the last keyframe at or before `version` up to it (or up to
+# `through`, when given), ascending
+def chain_to(db: Session, candidate_id, version: int, through: Optional[int] = None) -> list[models.VersionSnapshot]:
+    keyframe = (
+        select(func.max(models.VersionSnapshot.version))
+        .where(
+            models.VersionSnapshot.candidate_id == candidate_id,
+            models.VersionSnapshot.is_keyframe,
+            models.VersionSnapshot.version <= version,
+        )
+        .scalar_subquery()
+    )
+    return db.scalars(
+        select(models.VersionSnapshot)
+        .where(
+            models.VersionSnapshot.candidate_id == candidate_id,
+            models.VersionSnapshot.version >= keyframe,
+            models.VersionSnapshot.version <= (through or version),
+        )
+        .order_by(models.VersionSnapshot.version)
+    ).all()
+
+# Appends a version if `state` differs from the latest one. Callers hold the
+# candidate row lock (the upsert's ON CONFLICT does), so version numbers do
+# not race. Returns the new version number, or None when nothing changed.
+def record_version(db: Session, candidate_id, state: dict, now: datetime) -> Optional[int]:
+    latest = db.scalar(
+        select(func.max(models.VersionSnapshot.version)).where(models.VersionSnapshot.candidate_id == candidate_id)
+    )
+    if latest is None:
+        db.add(models.VersionSnapshot(**keyframe_row(candidate_id, state, now)))
+        return 1
+
+    chain = chain_to(db, candidate_id, latest)
+    ops = diff_states(replay(chain)[-1], state)
+    if not ops:
+        return None
+    is_keyframe = len(chain) >= KEYFRAME_INTERVAL or len(json.dumps(ops)) >= len(json.dumps(state))
+    db.add(models.VersionSnapshot(
+        candidate_id=candidate_id,
+        version=latest + 1,
+        is_keyframe=is_keyframe,
+        stance_json=state if is_keyframe else ops,
+        created_at=now,
+    ))
+    return latest + 1
+
+# The latest version written at or before as_of, with its state
+def state_as_of(db: Session, candidate_id, as_of: datetime) -> Optional[tuple[models.VersionSnapshot, dict]]:
+    version = db.scalar(
+        select(func.max(models.VersionSnapshot.version)).where(
+            models.VersionSnapshot.candidate_id == candidate_id,
+            models.VersionSnapshot.created_at <= as_of,
+        )
+    )
+    if version is None:
+        return None
+    chain = chain_to(db, candidate_id, version)
+    return chain[-1], replay(chain)[-1]
+
+# Newest-first page of versions, each with what it changed. Replays from the
+# keyframe before the oldest version on the page so keyframes can be
+# summarized against their predecessor too.
+def history_page(db: Session, candidate_id, limit: int, offset: int) -> tuple[list[tuple[models.VersionSnapshot, dict]], bool]:
+    page = db.scalars(
+        select(models.VersionSnapshot.version)
+        .where(models.VersionSnapshot.candidate_id == candidate_id)
+        .order_by(models.VersionSnapshot.version.desc())
+        .offset(offset)
+        .limit(limit + 1)
+    ).all()
+    has_more = len(page) > limit
+    page = page[:limit]
+    if not page:
+        return [], False
+
+    oldest, newest = page[-1], page[0]
+    chain = chain_to(db, candidate_id, oldest, through=newest)
+    states = replay(chain)
+    start = next(i for i, v in enumerate(chain) if v.version == oldest)
+    if start > 0:
+        previous = states[start - 1]
+    elif oldest > 1:
+        # The oldest version on the page is a keyframe; its predecessor's
+        # state comes from the chain before it
+        previous = replay(chain_to(db, candidate_id, oldest - 1))[-1]
+    else:
+        previous = {}
+
+    entries = []
+    for i in range(start, len(chain)):
+        entries.append((chain[i], summarize(previous, states[i])))
+        previous = states[i]
+    return entries[::-1], has_more
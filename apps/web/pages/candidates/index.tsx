@@ -1,21 +1,98 @@
-import { useEffect, useState } from "react"
-import type { Candidate } from "@know/types"
+import { FormEvent, useEffect, useState } from "react"
+import Link from "next/link"
+import type { Candidate, CandidatePage, SearchHit, SearchPage } from "@know/types"
 import CandidateCard from "@/components/CandidateCard"
 
+type CandidateListItem = Pick<Candidate, "id" | "name" | "office" | "party" | "photo_url">
+
+const LIST_URL = "http://localhost:8000/candidates/?fields=id,name,office,party,photo_url&limit=60"
+const SEARCH_URL = "http://localhost:8000/search?limit=20"
+
 export default function CandidatesPage() {
-  const [candidates, setCandidates] = useState<Candidate[]>([])
+  const [candidates, setCandidates] = useState<CandidateListItem[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [query, setQuery] = useState("")
+  const [hits, setHits] = useState<SearchHit[] | null>(null)
+  const [nextOffset, setNextOffset] = useState<number | null>(null)
 
-  useEffect(() => {
-    fetch("http://localhost:8000/candidates/")
+  const loadPage = (cursor: string | null) => {
+    const url = cursor ? `${LIST_URL}&cursor=${encodeURIComponent(cursor)}` : LIST_URL
+    fetch(url)
       .then(res => res.json())
-      .then(setCandidates)
+      .then((page: CandidatePage<CandidateListItem>) => {
+        setCandidates(prev => (cursor ? [...prev, ...page.items] : page.items))
+        setNextCursor(page.next_cursor)
+      })
+  }
+
+  const loadHits = (offset: number) => {
+    fetch(`${SEARCH_URL}&q=${encodeURIComponent(query)}&offset=${offset}`)
+      .then(res => res.json())
+      .then((page: SearchPage) => {
+        setHits(prev => (offset && prev ? [...prev, ...page.items] : page.items))
+        setNextOffset(page.next_offset)
+      })
+  }
+
+  const onSearch = (e: FormEvent) => {
+    e.preventDefault()
+    if (query.trim()) {
+      loadHits(0)
+    } else {
+      setHits(null)
+    }
+  }
+
+  useEffect(() => {
+    loadPage(null)
   }, [])
 
   return (
     <div className="max-w-5xl mx-auto px-4 py-8">
       <h1 className="text-3xl font-bold mb-6 p-4">Candidate Directory</h1>
 
-      {candidates.length === 0 ? (
+      <form onSubmit={onSearch} className="mb-6 flex gap-2">
+        <input
+          value={query}
+          onChange={e => setQuery(e.target.value)}
+          placeholder="Search candidates and stances"
+          className="border rounded px-3 py-2 flex-1"
+        />
+        <button type="submit" className="border px-4 py-2 rounded hover:shadow-md transition duration-200">
+          Search
+        </button>
+      </form>
+
+      {hits !== null ? (
+        <div>
+          {hits.length === 0 && <p className="text-gray-500">No matches.</p>}
+          <ul className="space-y-4">
+            {hits.map(hit => (
+              <li key={hit.stance_id ?? hit.candidate_id} className="border rounded-md p-4">
+                <Link href={`/candidates/${hit.candidate_id}`} className="text-lg font-semibold">
+                  {hit.name}
+                </Link>
+                <p className="text-sm text-gray-600">
+                  {hit.office}
+                  {hit.issue && ` · ${hit.issue}`}
+                </p>
+                {/* headline is escaped server-side; only <mark> tags are added */}
+                <p className="text-sm mt-1" dangerouslySetInnerHTML={{ __html: hit.headline }} />
+              </li>
+            ))}
+          </ul>
+          {nextOffset !== null && (
+            <div className="text-center mt-8">
+              <button
+                onClick={() => loadHits(nextOffset)}
+                className="border px-4 py-2 rounded hover:shadow-md transition duration-200"
+              >
+                More results
+              </button>
+            </div>
+          )}
+        </div>
+      ) : candidates.length === 0 ? (
         <p className="text-gray-500">No candidates found.</p>
       ) : (
         <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-6">
@@ -31,6 +108,17 @@ export default function CandidatesPage() {
           ))}
         </div>
       )}
+
+      {hits === null && nextCursor && (
+        <div className="text-center mt-8">
+          <button
+            onClick={() => loadPage(nextCursor)}
+            className="border px-4 py-2 rounded hover:shadow-md transition duration-200"
+          >
+            Load more
+          </button>
+        </div>
+      )}
     </div>
   )
 }
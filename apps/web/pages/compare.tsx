@@ -1,6 +1,23 @@
 import { useRouter } from "next/router"
 import { useEffect, useState } from "react"
-import type { Candidate } from "@know/types"
+import type { Candidate, CandidatePage, Comparison } from "@know/types"
+
+type CandidateOption = Pick<Candidate, "id" | "name" | "office">
+
+const OPTIONS_URL = "http://localhost:8000/candidates/?fields=id,name,office&limit=500"
+
+// The dropdown only needs id/name, so walk the lean pages instead of pulling full candidates
+async function fetchCandidateOptions(): Promise<CandidateOption[]> {
+  const options: CandidateOption[] = []
+  let cursor: string | null = null
+  do {
+    const url: string = cursor ? `${OPTIONS_URL}&cursor=${encodeURIComponent(cursor)}` : OPTIONS_URL
+    const page: CandidatePage<CandidateOption> = await fetch(url).then(res => res.json())
+    options.push(...page.items)
+    cursor = page.next_cursor
+  } while (cursor)
+  return options
+}
 
 function getInitials(name: string): string {
   return name
@@ -13,25 +30,27 @@ function getInitials(name: string): string {
 export default function ComparePage() {
   const router = useRouter()
   const { c1, c2 } = router.query
-  const [candidates, setCandidates] = useState<(Candidate | null)[]>([null, null])
-  const [allCandidates, setAllCandidates] = useState<Candidate[]>([])
+  const [comparison, setComparison] = useState<Comparison | null>(null)
+  const [allCandidates, setAllCandidates] = useState<CandidateOption[]>([])
   const [loading, setLoading] = useState(true)
 
   useEffect(() => {
-    fetch("http://localhost:8000/candidates/")
-      .then(res => res.json())
+    fetchCandidateOptions()
       .then(setAllCandidates)
+      .catch(err => console.error("Error loading candidate list:", err))
   }, [])
 
   useEffect(() => {
     if (!c1 || !c2) return
 
+    // One round-trip: the API returns both candidates with stances already aligned by issue
     setLoading(true)
-    Promise.all([
-      fetch(`http://localhost:8000/candidates/${c1}`).then(res => res.json()),
-      fetch(`http://localhost:8000/candidates/${c2}`).then(res => res.json()),
-    ])
-      .then(([a, b]) => setCandidates([a, b]))
+    fetch(`http://localhost:8000/compare?ids=${encodeURIComponent(`${c1},${c2}`)}`)
+      .then(res => {
+        if (!res.ok) throw new Error(`HTTP ${res.status}`)
+        return res.json()
+      })
+      .then(setComparison)
       .catch(err => console.error("Error loading candidates:", err))
       .finally(() => setLoading(false))
   }, [c1, c2])
@@ -41,15 +60,7 @@ export default function ComparePage() {
     router.push({ pathname: "/compare", query })
   }
 
-  const allIssues = candidates[0] && candidates[1]
-    ? Array.from(new Set([
-        ...candidates[0].stance_summary.map(s => s.issue),
-        ...candidates[1].stance_summary.map(s => s.issue),
-      ]))
-    : []
-
-  const getPosition = (candidate: Candidate, issue: string) =>
-    candidate.stance_summary.find(s => s.issue === issue)?.position || "—"
+  const candidates = comparison?.candidates ?? [null, null]
 
   return (
     <div className="max-w-6xl mx-auto px-4 py-8 space-y-10">
@@ -107,16 +118,15 @@ export default function ComparePage() {
       </div>
 
       {/* Stance Comparison Cards */}
-      {!loading && candidates[0] && candidates[1] && (
+      {!loading && comparison && (
         <div className="space-y-6">
-          {allIssues.map((issue, idx) => {
-            const p1 = getPosition(candidates[0], issue)
-            const p2 = getPosition(candidates[1], issue)
+          {comparison.issues.map((row, idx) => {
+            const [p1, p2] = row.positions.map(p => p?.position || "—")
             const diff = p1 !== p2
 
             return (
               <div key={idx}>
-                <h3 className="text-lg font-semibold text-gray-800 mb-2">{issue}</h3>
+                <h3 className="text-lg font-semibold text-gray-800 mb-2">{row.label}</h3>
                 <div className="grid grid-cols-2 gap-4">
                   {[p1, p2].map((position, i) => (
                     <div
@@ -6,8 +6,11 @@ export type SourcedStr = {
 
 export type Stance = {
   issue: string
+  issue_id?: string | null
   position: string
   source_url?: string
+  // Only backed by sources that have since disappeared
+  is_stale?: boolean
   created_at?: string
 }
 
@@ -30,4 +33,106 @@ export type Candidate = {
   stance_summary: Stance[]
   created_at: string
   last_updated: string
-}
\ No newline at end of file
+}
+
+// GET /candidates/ returns one keyset page at a time
+export type CandidatePage<T = Candidate> = {
+  items: T[]
+  next_cursor: string | null
+}
+
+// GET /search hit; headline is escaped HTML with matches in <mark>
+export type SearchHit = {
+  kind: "candidate" | "stance"
+  candidate_id: string
+  name: string
+  office: string
+  state?: string
+  stance_id?: string
+  issue?: string
+  rank: number
+  headline: string
+}
+
+export type SearchPage = {
+  items: SearchHit[]
+  next_offset: number | null
+}
+
+export type Issue = {
+  id: string
+  label: string
+}
+
+// GET /issues/{issue}/stances: one row per candidate stance on the issue
+export type IssueStance = {
+  candidate_id: string
+  name: string
+  office: string
+  state?: string
+  district?: string
+  party?: SourcedStr
+  is_incumbent?: boolean
+  stance_id: string
+  issue: string
+  position: string
+  source_url?: string
+  is_stale: boolean
+}
+
+export type IssueStancesPage = {
+  issue: Issue
+  items: IssueStance[]
+  next_offset: number | null
+}
+
+// GET /compare and GET /races/{state}/{office}: issues[i].positions[j] is
+// candidates[j]'s position on that issue, or null when they have none
+export type ComparisonCandidate = Pick<
+  Candidate,
+  "id" | "name" | "office" | "party" | "district" | "state" | "is_incumbent" | "photo_url" | "last_updated"
+>
+
+export type ComparisonPosition = {
+  issue: string
+  position: string
+  source_url?: string | null
+  is_stale: boolean
+}
+
+export type ComparisonIssue = {
+  issue_id: string | null
+  label: string
+  positions: (ComparisonPosition | null)[]
+}
+
+export type Comparison = {
+  candidates: ComparisonCandidate[]
+  issues: ComparisonIssue[]
+}
+
+// GET /candidates/{id}/history: newest-first versions; added/removed/changed
+// list issue texts relative to the previous version
+export type VersionEntry = {
+  version: number
+  created_at: string
+  is_keyframe: boolean
+  added: string[]
+  removed: string[]
+  changed: string[]
+}
+
+export type HistoryPage = {
+  candidate_id: string
+  items: VersionEntry[]
+  next_offset: number | null
+}
+
+// GET /candidates/{id}/history?as_of=...
+export type StancesAsOf = {
+  candidate_id: string
+  as_of: string
+  version: number
+  versioned_at: string
+  stance_summary: Stance[]
+}